@@ -0,0 +1,114 @@
+# =====================================================
+# 이벤트 루프를 막지 않는 비동기 LLM 캐시 래퍼
+# =====================================================
+# - 체인을 ainvoke / astream 으로 돌리면 캐시 조회(alookup)와 저장(aupdate)도 이벤트 루프 위에서 불립니다.
+#   · 디스크 I/O 나 역직렬화를 루프 안에서 직접 하면 그동안 다른 코루틴이 모두 멈춥니다.
+#   · BaseCache 기본 구현은 run_in_executor(None, ...) 이라 루프는 안 막지만,
+#     호출마다 기본 스레드 풀을 오가며 다른 작업(동기 도구 등)과 스레드를 나눠 씁니다.
+# - AsyncIOCache 는 어떤 캐시든 감싸서 모든 I/O 를 "전용 I/O 스레드"에서 처리합니다.
+#   · 같은 루프 틱(tick)에 들어온 alookup 들을 모아 I/O 스레드에서 한 번에 조회
+#     (내부 캐시에 lookup_many 가 있으면 SELECT ... IN (...) 한 번으로 처리)
+#   · 역직렬화(loads)·압축 해제도 I/O 스레드에서 하므로 루프에는 결과만 전달됩니다.
+#   · aupdate 도 I/O 스레드에서 인코딩 후 내부 캐시에 넘깁니다.
+# - 동기 lookup / update 는 내부 캐시를 그대로 호출합니다.
+#
+# 사용 예)
+#   set_llm_cache(AsyncIOCache(WALSQLiteCache("cache/llm_cache_wal.db")))
+import asyncio
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+
+
+class AsyncIOCache(BaseCache):
+    """
+    전용 I/O 스레드에서 내부 캐시를 호출하는 비동기 캐시 래퍼
+
+    - inner: 감쌀 캐시 (WALSQLiteCache, CompressedSQLiteCache, SQLiteCache 등)
+    - io_threads: 전용 I/O 스레드 수
+    - max_batch: 한 번에 모아서 조회할 최대 alookup 수
+    """
+
+    def __init__(self, inner: BaseCache, *, io_threads: int = 1, max_batch: int = 256) -> None:
+        self.inner = inner
+        self._executor = ThreadPoolExecutor(max_workers=io_threads, thread_name_prefix="cache-io")
+        self._max_batch = max_batch
+        self._batched = callable(getattr(inner, "lookup_many", None))
+        # 루프별로 아직 보내지 않은 조회 요청: loop -> [((prompt, llm_string), asyncio.Future), ...]
+        self._reads: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self.read_batches = 0
+
+    # -------------------------------------------------
+    # 1) 동기 인터페이스: 내부 캐시에 그대로 위임
+    # -------------------------------------------------
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        return self.inner.lookup(prompt, llm_string)
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        self.inner.update(prompt, llm_string, return_val)
+
+    def clear(self, **kwargs: Any) -> None:
+        self.inner.clear(**kwargs)
+
+    # -------------------------------------------------
+    # 2) 비동기 인터페이스
+    # -------------------------------------------------
+    async def alookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        loop = asyncio.get_running_loop()
+        if not self._batched:
+            return await loop.run_in_executor(self._executor, self.inner.lookup, prompt, llm_string)
+
+        future = loop.create_future()
+        pending = self._reads.setdefault(loop, [])
+        pending.append(((prompt, llm_string), future))
+        if len(pending) == 1:
+            # 현재 틱에 준비된 코루틴들이 모두 요청을 넣은 뒤 한 번에 보냅니다.
+            loop.call_soon(self._flush_reads, loop)
+        return await future
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self.inner.update, prompt, llm_string, return_val)
+
+    async def aclear(self, **kwargs: Any) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, lambda: self.inner.clear(**kwargs))
+
+    # -------------------------------------------------
+    # 3) 조회 배치 처리
+    # -------------------------------------------------
+    def _flush_reads(self, loop: asyncio.AbstractEventLoop) -> None:
+        pending = self._reads.pop(loop, [])
+        for start in range(0, len(pending), self._max_batch):
+            chunk = pending[start:start + self._max_batch]
+            pairs = [pair for pair, _ in chunk]
+            futures = [future for _, future in chunk]
+            io_future = self._executor.submit(self.inner.lookup_many, pairs)
+            # I/O 스레드에서 끝나면 루프 스레드로 돌아와 결과를 나눠 줍니다.
+            io_future.add_done_callback(
+                lambda f, futures=futures: loop.call_soon_threadsafe(self._resolve, f, futures)
+            )
+            self.read_batches += 1
+
+    @staticmethod
+    def _resolve(io_future: Future, futures: list[asyncio.Future]) -> None:
+        error = io_future.exception()
+        results = io_future.result() if error is None else [None] * len(futures)
+        for future, result in zip(futures, results):
+            if future.done():   # 호출한 쪽이 이미 취소한 경우
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+    # -------------------------------------------------
+    # 4) 정리
+    # -------------------------------------------------
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        close_inner = getattr(self.inner, "close", None)
+        if callable(close_inner):
+            close_inner()
@@ -0,0 +1,117 @@
+# =====================================================
+# 비동기 캐시 이벤트 루프 지연(lag) 벤치마크
+# =====================================================
+# - 동시에 --calls 개(기본 500)의 chain.ainvoke 를 실행하면서,
+#   1ms 마다 깨어나는 감시 코루틴이 "예정보다 얼마나 늦게 깨어났는지"(= 루프 지연)를 기록합니다.
+# - 비교 구성
+#   · none     : 캐시 없음 (체인 자체가 루프를 점유하는 기준선)
+#   · blocking : alookup/aupdate 안에서 SQLite 를 직접 호출 (루프를 막는 구현)
+#   · executor : WALSQLiteCache 기본 동작 (BaseCache 의 run_in_executor(None, ...))
+#   · async    : AsyncIOCache(WALSQLiteCache) (전용 I/O 스레드 + 조회 배치)
+# - 키의 --hit-ratio 비율만큼 미리 캐시에 넣어 두어 적중/미스가 섞이게 합니다.
+#
+# 실행 예)
+#   python model/async_cache_benchmark.py --calls 500
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import warnings
+
+from langchain.globals import set_llm_cache
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import PromptTemplate
+
+from async_cache import AsyncIOCache
+from bench_utils import percentile
+from fake_llm import FakeLatencyChatModel
+from sqlite_wal_cache import WALSQLiteCache
+
+warnings.simplefilter("ignore")
+
+
+class BlockingCache(WALSQLiteCache):
+    """비교용: 비동기 메서드에서 동기 I/O 를 그대로 호출해 루프를 막는 캐시"""
+
+    async def alookup(self, prompt, llm_string):
+        return self.lookup(prompt, llm_string)
+
+    async def aupdate(self, prompt, llm_string, return_val):
+        self.update(prompt, llm_string, return_val)
+
+
+# =====================================================
+# 1) 루프 지연 감시
+# =====================================================
+async def monitor_lag(stop: asyncio.Event, samples: list[float], interval: float = 0.001) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - start - interval)
+
+
+# =====================================================
+# 2) 구성 하나 실행
+# =====================================================
+async def run(name: str, path: str, calls: int, hit_ratio: float, latency: float, words: int) -> dict:
+    base = BlockingCache(path) if name == "blocking" else WALSQLiteCache(path)
+    cache = AsyncIOCache(base) if name == "async" else base
+
+    llm = FakeLatencyChatModel(latency=latency, response_words=words)
+    chain = PromptTemplate.from_template("{country}에 대해서 200자 내외로 요약해줘") | llm | StrOutputParser()
+    countries = [f"나라{i}" for i in range(calls)]
+
+    # 적중시킬 키를 미리 채웁니다 (캐시 없이 생성 → 캐시 켜고 한 번 더 호출).
+    set_llm_cache(base)
+    await asyncio.gather(*(chain.ainvoke({"country": c}) for c in countries[: int(calls * hit_ratio)]))
+    base.flush()
+    # none: 캐시 없이 체인 자체의 루프 점유만 측정하는 기준선 (적중 없음)
+    set_llm_cache(cache if name != "none" else None)
+    llm.calls = 0
+
+    stop, samples = asyncio.Event(), []
+    monitor = asyncio.create_task(monitor_lag(stop, samples))
+    start = time.perf_counter()
+    await asyncio.gather(*(chain.ainvoke({"country": c}) for c in countries))
+    wall = time.perf_counter() - start
+    stop.set()
+    await monitor
+
+    cache.close()
+    return {
+        "name": name,
+        "wall": wall,
+        "llm_calls": llm.calls,
+        "lag_mean_ms": statistics.fmean(samples) * 1000 if samples else 0.0,
+        "lag_p99_ms": percentile(samples, 0.99) * 1000,
+        "lag_max_ms": max(samples) * 1000 if samples else 0.0,
+    }
+
+
+# =====================================================
+# 3) main
+# =====================================================
+def main():
+    parser = argparse.ArgumentParser(description="비동기 캐시 이벤트 루프 지연 벤치마크")
+    parser.add_argument("--calls", type=int, default=500, help="동시 ainvoke 수")
+    parser.add_argument("--hit-ratio", type=float, default=0.5)
+    parser.add_argument("--latency", type=float, default=0.05, help="가짜 LLM 응답 지연(초)")
+    parser.add_argument("--words", type=int, default=2000, help="응답 단어 수 (값이 클수록 역직렬화 비용↑)")
+    parser.add_argument("--configs", nargs="+", choices=["none", "blocking", "executor", "async"],
+                        default=["none", "blocking", "executor", "async"])
+    args = parser.parse_args()
+
+    print(f"동시 호출 {args.calls}개, 적중률 {args.hit_ratio:.0%}, LLM 지연 {args.latency * 1000:.0f}ms")
+    print(f"{'구성':<9} {'wall(s)':>8} {'LLM 호출':>8} {'lag 평균':>9} {'lag p99':>9} {'lag max':>9}  (ms)")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in args.configs:
+            path = os.path.join(tmp, f"{name}.db")
+            r = asyncio.run(run(name, path, args.calls, args.hit_ratio, args.latency, args.words))
+            print(f"{r['name']:<9} {r['wall']:>8.2f} {r['llm_calls']:>8} {r['lag_mean_ms']:>9.2f} "
+                  f"{r['lag_p99_ms']:>9.2f} {r['lag_max_ms']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# =====================================================
+# 벤치마크 공통 헬퍼 (지연시간 통계, 실행 환경, JSON 결과 저장)
+# =====================================================
+# - 여러 벤치마크 스크립트가 같은 방식으로 p50/p95/p99 를 계산하고
+#   같은 형식의 JSON 으로 결과를 남기도록 모아 둔 모듈입니다.
+# - JSON 결과에는 실행 환경(파이썬·패키지 버전, CPU 수, git 커밋 등)을 함께 기록해
+#   버전이나 장비가 바뀐 뒤에도 결과를 비교할 수 있게 합니다.
+# - tutorial/ 의 벤치마크도 이 모듈을 씁니다. (model 디렉터리를 sys.path 에 더해서 import)
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from importlib import metadata
+from typing import Any, Iterable
+
+
+# =====================================================
+# 1) 지연시간 통계
+# =====================================================
+def percentile(values: list[float], q: float) -> float:
+    """q(0~1) 분위수. 정렬 후 가장 가까운 순위(nearest-rank) 값을 사용합니다."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def summarize_latencies(seconds: list[float]) -> dict[str, float]:
+    """초 단위 지연시간 목록 → ms 단위 평균 / p50 / p95 / p99 / 최대"""
+    if not seconds:
+        return {"mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    return {
+        "mean_ms": statistics.fmean(seconds) * 1000,
+        "p50_ms": percentile(seconds, 0.50) * 1000,
+        "p95_ms": percentile(seconds, 0.95) * 1000,
+        "p99_ms": percentile(seconds, 0.99) * 1000,
+        "max_ms": max(seconds) * 1000,
+    }
+
+
+# =====================================================
+# 2) 실행 환경 / JSON 저장
+# =====================================================
+def git_commit() -> str | None:
+    """이 저장소의 현재 커밋 (git 이 없거나 저장소 밖이면 None)"""
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return out.stdout.strip() or None
+
+
+def environment_info(packages: Iterable[str] = ("langchain-core", "langchain-community", "langgraph")) -> dict[str, Any]:
+    versions = {}
+    for name in packages:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "git_commit": git_commit(),
+        "packages": versions,
+    }
+
+
+def write_json_report(path: str, benchmark: str, params: dict[str, Any], results: list[dict[str, Any]], *,
+                      environment: dict[str, Any] | None = None, **extra: Any) -> str:
+    """
+    {"benchmark", "environment", "params", "results"} 형식으로 저장하고 경로를 반환합니다.
+    - environment: 미리 구한 environment_info() (생략하면 지금 구함)
+    - extra: 벤치마크별로 덧붙일 최상위 항목 (예: comparison=...)
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    report = {
+        "benchmark": benchmark,
+        "environment": environment or environment_info(),
+        "params": params,
+        "results": results,
+        **extra,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def default_report_path(benchmark: str) -> str:
+    """benchmark_results/<이름>-<시각>.json"""
+    return os.path.join("benchmark_results", f"{benchmark}-{time.strftime('%Y%m%d-%H%M%S')}.json")
@@ -0,0 +1,226 @@
+# =====================================================
+# 크기·바이트 제한이 있는 LRU/TTL 인메모리 LLM 캐시
+# =====================================================
+# - langchain_core 의 InMemoryCache 는 maxsize 를 주지 않으면 무한정 커지고,
+#   maxsize 를 줘도 "가장 먼저 들어온" 항목을 지울 뿐 최근 사용 여부는 보지 않습니다.
+# - 오래 떠 있는 워커에서는 캐시가 계속 쌓여 결국 스왑까지 밀려나므로
+#   항목 수(maxsize) + 총 바이트(max_bytes) 두 가지 한도를 두고
+#   LRU(가장 오래 사용되지 않은 항목) 순서로 내보냅니다.
+# - OrderedDict 를 사용해 조회/갱신/퇴출이 모두 O(1) 입니다.
+# - 항목마다 TTL(만료 시간)을 줄 수 있고, 만료된 항목은 조회 시점에 지워집니다.
+# - hit / miss / eviction / expiration 카운터를 stats() 로 노출해
+#   실제 트래픽 기준으로 캐시 크기를 조정할 수 있게 합니다.
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+
+
+# =====================================================
+# 1) 캐시 통계
+# =====================================================
+@dataclass
+class CacheStats:
+    """캐시 동작을 집계한 카운터 스냅샷"""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_ratio(self) -> float:
+        # 조회가 한 번도 없었다면 0.0
+        return self.hits / self.lookups if self.lookups else 0.0
+
+
+# =====================================================
+# 2) 항목 크기 추정
+# =====================================================
+def estimate_size(prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> int:
+    """
+    캐시 항목 하나가 차지하는 대략적인 바이트 수를 계산합니다.
+    - 키(prompt, llm_string)와 생성 결과 텍스트의 UTF-8 길이를 더합니다.
+    - 한글은 글자당 3바이트라 len() 대신 encode() 길이를 사용합니다.
+    """
+    size = len(prompt.encode("utf-8")) + len(llm_string.encode("utf-8"))
+    for generation in return_val:
+        size += len(generation.text.encode("utf-8"))
+    return size
+
+
+# =====================================================
+# 3) BoundedInMemoryCache 정의
+# =====================================================
+class BoundedInMemoryCache(BaseCache):
+    """
+    항목 수·총 바이트 한도와 TTL 을 지원하는 LRU 인메모리 캐시
+
+    - maxsize: 최대 항목 수 (None 이면 제한 없음)
+    - max_bytes: estimate_size 기준 최대 총 바이트 (None 이면 제한 없음)
+    - ttl: 기본 만료 시간(초). update(..., ttl=...) 로 항목별로 덮어쓸 수 있음
+    - size_of: 항목 크기 계산 함수 (기본값 estimate_size)
+    - timer: 현재 시각 함수 (기본값 time.monotonic)
+    """
+
+    def __init__(
+        self,
+        *,
+        maxsize: int | None = 1024,
+        max_bytes: int | None = None,
+        ttl: float | None = None,
+        size_of: Callable[[str, str, RETURN_VAL_TYPE], int] = estimate_size,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if maxsize is not None and maxsize <= 0:
+            raise ValueError("maxsize 는 0보다 커야 합니다.")
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError("max_bytes 는 0보다 커야 합니다.")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl 은 0보다 커야 합니다.")
+
+        self._maxsize = maxsize
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._size_of = size_of
+        self._timer = timer
+
+        # key -> (return_val, 만료 시각 또는 None, 바이트 수)
+        # OrderedDict 의 앞쪽이 가장 오래 사용되지 않은 항목(LRU)
+        self._data: OrderedDict[tuple[str, str], tuple[RETURN_VAL_TYPE, float | None, int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+
+    # -------------------------------------------------
+    # 3-1) 내부 헬퍼
+    # -------------------------------------------------
+    def _remove(self, key: tuple[str, str]) -> None:
+        _, _, nbytes = self._data.pop(key)
+        self._bytes -= nbytes
+
+    def _evict_overflow(self) -> None:
+        # 한도를 넘는 동안 LRU 쪽(맨 앞)부터 내보냅니다.
+        while self._data and (
+            (self._maxsize is not None and len(self._data) > self._maxsize)
+            or (self._max_bytes is not None and self._bytes > self._max_bytes)
+        ):
+            self._remove(next(iter(self._data)))
+            self._stats.evictions += 1
+
+    # -------------------------------------------------
+    # 3-2) BaseCache 인터페이스 구현
+    # -------------------------------------------------
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        key = (prompt, llm_string)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._stats.misses += 1
+                return None
+
+            return_val, expires_at, _ = entry
+            if expires_at is not None and expires_at <= self._timer():
+                # 만료된 항목은 조회 시점에 제거 → miss 로 집계
+                self._remove(key)
+                self._stats.expirations += 1
+                self._stats.misses += 1
+                return None
+
+            # 최근 사용 항목으로 표시 (맨 뒤로 이동)
+            self._data.move_to_end(key)
+            self._stats.hits += 1
+            return return_val
+
+    def update(
+        self,
+        prompt: str,
+        llm_string: str,
+        return_val: RETURN_VAL_TYPE,
+        *,
+        ttl: float | None = None,
+    ) -> None:
+        key = (prompt, llm_string)
+        nbytes = self._size_of(prompt, llm_string, return_val)
+        ttl = ttl if ttl is not None else self._ttl
+        expires_at = self._timer() + ttl if ttl is not None else None
+
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            # 한 항목이 max_bytes 보다 크면 넣는 즉시 밀려나므로 저장하지 않습니다.
+            if self._max_bytes is not None and nbytes > self._max_bytes:
+                return
+            self._data[key] = (return_val, expires_at, nbytes)
+            self._bytes += nbytes
+            self._evict_overflow()
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    async def alookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        # 메모리 연산뿐이라 executor 로 넘기지 않고 바로 실행합니다.
+        return self.lookup(prompt, llm_string)
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        self.update(prompt, llm_string, return_val)
+
+    async def aclear(self, **kwargs: Any) -> None:
+        self.clear()
+
+    # -------------------------------------------------
+    # 3-3) 운영용 헬퍼
+    # -------------------------------------------------
+    def purge_expired(self) -> int:
+        """만료된 항목을 한꺼번에 정리하고 지운 개수를 반환합니다."""
+        now = self._timer()
+        with self._lock:
+            expired = [k for k, (_, exp, _) in self._data.items() if exp is not None and exp <= now]
+            for key in expired:
+                self._remove(key)
+            self._stats.expirations += len(expired)
+        return len(expired)
+
+    def stats(self) -> CacheStats:
+        """현재 카운터와 항목 수/바이트를 담은 스냅샷을 반환합니다."""
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                expirations=self._stats.expirations,
+                entries=len(self._data),
+                bytes=self._bytes,
+            )
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats = CacheStats()
+
+    # 주의: __len__ 을 정의하면 비어 있는 캐시가 False 로 평가되어
+    # langchain 이 "if llm_cache:" 검사에서 캐시를 건너뜁니다. 항목 수는 stats().entries 로 확인하세요.
+
+
+# =====================================================
+# 4) 간단 실행 예제 (API 키 없이 동작)
+# =====================================================
+if __name__ == "__main__":
+    from langchain_core.outputs import Generation
+
+    cache = BoundedInMemoryCache(maxsize=2, ttl=60)
+    cache.update("한국", "llm", [Generation(text="대한민국은 동아시아에 있는 나라입니다.")])
+    cache.update("일본", "llm", [Generation(text="일본은 섬나라입니다.")])
+    cache.lookup("한국", "llm")                                        # hit → 한국이 최근 사용
+    cache.update("미국", "llm", [Generation(text="미국은 북미에 있습니다.")])  # 일본이 LRU 로 퇴출
+    print("일본 조회:", cache.lookup("일본", "llm"))                  # None (miss)
+    print("통계:", cache.stats(), f"hit_ratio={cache.stats().hit_ratio:.2f}")
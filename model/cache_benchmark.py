@@ -0,0 +1,205 @@
+# =====================================================
+# LLM 캐시 벤치마크 스위트
+# =====================================================
+# - caching.py 처럼 호출 한두 번을 perf_counter 로 재는 대신,
+#   지연시간을 조절할 수 있는 가짜 LLM(FakeLatencyChatModel)으로 체인을 여러 번 돌려
+#   캐시 구성별 p50/p95/p99 지연시간, 처리량, 메모리를 측정합니다.
+# - 측정 축
+#   · 캐시 구성: none, in_memory(InMemoryCache), sqlite(SQLiteCache), bounded, wal_sqlite,
+#                compressed_sqlite, tiered, sharded, semantic
+#   · 키 공간 크기(--key-spaces): 미리 캐시에 넣어 둔 서로 다른 입력 수
+#   · 적중률(--hit-ratios): 요청 중 미리 넣어 둔 입력을 다시 묻는 비율
+# - 결과는 표로 출력하고 JSON 으로 저장합니다(bench_utils.write_json_report).
+#   같은 --seed 면 요청 순서가 같으므로 버전별 결과를 그대로 비교할 수 있습니다.
+#
+# 실행 예)
+#   python model/cache_benchmark.py
+#   python model/cache_benchmark.py --backends none in_memory wal_sqlite --hit-ratios 0.9 --output result.json
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from langchain.globals import set_llm_cache
+from langchain_core.caches import BaseCache, InMemoryCache
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import PromptTemplate
+
+from bench_utils import default_report_path, summarize_latencies, write_json_report
+from fake_llm import FakeLatencyChatModel
+
+warnings.simplefilter("ignore")
+
+
+# =====================================================
+# 1) 캐시 구성
+# =====================================================
+def _sqlite(tmp: str) -> BaseCache:
+    from langchain_community.cache import SQLiteCache
+    return SQLiteCache(database_path=os.path.join(tmp, "sqlite.db"))
+
+
+def _bounded(tmp: str) -> BaseCache:
+    from bounded_cache import BoundedInMemoryCache
+    return BoundedInMemoryCache(maxsize=100_000)
+
+
+def _wal(tmp: str) -> BaseCache:
+    from sqlite_wal_cache import WALSQLiteCache
+    return WALSQLiteCache(os.path.join(tmp, "wal.db"))
+
+
+def _compressed(tmp: str) -> BaseCache:
+    from compressed_cache import CompressedSQLiteCache
+    return CompressedSQLiteCache(os.path.join(tmp, "compressed.db"))
+
+
+def _tiered(tmp: str) -> BaseCache:
+    from bounded_cache import BoundedInMemoryCache
+    from sqlite_wal_cache import WALSQLiteCache
+    from tiered_cache import TieredCache
+    return TieredCache(WALSQLiteCache(os.path.join(tmp, "tiered.db")), l1=BoundedInMemoryCache(maxsize=256))
+
+
+def _sharded(tmp: str) -> BaseCache:
+    from sharded_cache import ShardedSQLiteCache
+    return ShardedSQLiteCache(os.path.join(tmp, "shards"), n_shards=4)
+
+
+def _semantic(tmp: str) -> BaseCache:
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+    from semantic_cache import SemanticCache
+    return SemanticCache(DeterministicFakeEmbedding(size=256), maxsize=100_000)
+
+
+BACKENDS: dict[str, Callable[[str], BaseCache | None]] = {
+    "none": lambda tmp: None,
+    "in_memory": lambda tmp: InMemoryCache(),
+    "sqlite": _sqlite,
+    "bounded": _bounded,
+    "wal_sqlite": _wal,
+    "compressed_sqlite": _compressed,
+    "tiered": _tiered,
+    "sharded": _sharded,
+    "semantic": _semantic,
+}
+
+
+def _call_if_exists(cache: BaseCache | None, name: str) -> None:
+    method = getattr(cache, name, None)
+    if callable(method):
+        method()
+
+
+# =====================================================
+# 2) 요청 시나리오
+# =====================================================
+def make_requests(key_space: int, hit_ratio: float, requests: int, seed: int) -> list[str]:
+    """
+    요청 목록을 만듭니다.
+    - hit_ratio 확률로 미리 캐시에 넣어 둔 key_space 개 중 하나를,
+      나머지는 한 번도 나온 적 없는 새 입력을 고릅니다.
+    """
+    rng = random.Random(seed)
+    fresh = 0
+    result = []
+    for _ in range(requests):
+        if rng.random() < hit_ratio:
+            result.append(f"warm-{rng.randrange(key_space)}")
+        else:
+            result.append(f"cold-{fresh}")
+            fresh += 1
+    return result
+
+
+# =====================================================
+# 3) 한 조합 실행
+# =====================================================
+def run_case(backend: str, key_space: int, hit_ratio: float, args) -> dict:
+    llm = FakeLatencyChatModel(latency=args.latency, response_words=args.words)
+    chain = PromptTemplate.from_template("{country}에 대해서 200자 내외로 요약해줘") | llm | StrOutputParser()
+    requests = make_requests(key_space, hit_ratio, args.requests, args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tracemalloc.start()
+        cache = BACKENDS[backend](tmp)
+        set_llm_cache(cache)
+
+        # 예열: 키 공간 전체를 캐시에 넣어 둡니다.
+        if cache is not None:
+            for k in range(key_space):
+                chain.invoke({"country": f"warm-{k}"})
+            _call_if_exists(cache, "flush")
+        warm_bytes, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()   # 지연시간 측정 중에는 추적 오버헤드를 빼기 위해 멈춥니다.
+        llm.calls = 0
+
+        def timed(country: str) -> float:
+            start = time.perf_counter()
+            chain.invoke({"country": country})
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        if args.concurrency > 1:
+            with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+                latencies = list(pool.map(timed, requests))
+        else:
+            latencies = [timed(country) for country in requests]
+        wall = time.perf_counter() - start
+
+        _call_if_exists(cache, "close")
+        set_llm_cache(None)
+
+    return {
+        "backend": backend,
+        "key_space": key_space,
+        "hit_ratio": hit_ratio,
+        "requests": len(requests),
+        "llm_calls": llm.calls,
+        "throughput_rps": len(requests) / wall,
+        "latency": summarize_latencies(latencies),
+        "warm_memory_bytes": warm_bytes,   # 예열 후 파이썬 힙에 남아 있는 바이트 (tracemalloc 기준)
+    }
+
+
+# =====================================================
+# 4) main
+# =====================================================
+def main():
+    parser = argparse.ArgumentParser(description="LLM 캐시 벤치마크 스위트")
+    parser.add_argument("--backends", nargs="+", choices=list(BACKENDS), default=list(BACKENDS))
+    parser.add_argument("--key-spaces", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--hit-ratios", type=float, nargs="+", default=[0.0, 0.5, 0.9])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.005, help="가짜 LLM 응답 지연(초)")
+    parser.add_argument("--words", type=int, default=60, help="가짜 LLM 응답 단어 수")
+    parser.add_argument("--concurrency", type=int, default=1, help="동시 호출 스레드 수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="JSON 결과 경로 (기본: benchmark_results/...)")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'backend':<18} {'keys':>5} {'hit':>5} {'rps':>8} {'p50':>7} {'p95':>7} {'p99':>7} "
+          f"{'LLM호출':>7} {'mem(KB)':>9}")
+    for key_space in args.key_spaces:
+        for hit_ratio in args.hit_ratios:
+            for backend in args.backends:
+                r = run_case(backend, key_space, hit_ratio, args)
+                results.append(r)
+                lat = r["latency"]
+                print(f"{backend:<18} {key_space:>5} {hit_ratio:>5.0%} {r['throughput_rps']:>8.0f} "
+                      f"{lat['p50_ms']:>7.2f} {lat['p95_ms']:>7.2f} {lat['p99_ms']:>7.2f} "
+                      f"{r['llm_calls']:>7} {r['warm_memory_bytes'] / 1024:>9.0f}")
+
+    params = {k: v for k, v in vars(args).items() if k != "output"}
+    path = write_json_report(args.output or default_report_path("cache_benchmark"), "cache_benchmark", params, results)
+    print("JSON 결과:", path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+# =====================================================
+# 캐시 키 정규화(canonicalization) 계층
+# =====================================================
+# - LLM 캐시 키는 "렌더링된 프롬프트 그대로" + "LLM 파라미터 문자열" 입니다.
+#   아래처럼 의미는 같은데 문자열이 달라서 생기는 불필요한 미스가 많습니다.
+#   · 공백 차이: "한국에 대해서  200자" vs "한국에 대해서 200자 "
+#   · 유니코드 정규형 차이: macOS 에서 붙여 넣은 한글은 NFD(자모 분리), 보통은 NFC(완성형)
+#   · 파라미터 순서 차이: llm_string 안의 중첩 dict(도구 스키마 등) 키 순서
+# - CanonicalKeyCache 는 어떤 BaseCache 든 감싸서, 조회/저장 전에 키를 정규화합니다.
+#   · 규칙(rule)은 str → str 함수 목록이라 원하는 대로 바꿔 끼울 수 있습니다.
+#   · Chat 모델 프롬프트(메시지 JSON)는 파싱해서 content 문자열에만 규칙을 적용합니다.
+#   · hash_keys=True 면 정규화된 키를 sha256 으로 바꿔 넘겨 저장 공간을 줄입니다.
+#     (SemanticCache 처럼 프롬프트 원문이 필요한 캐시에는 False 로 두세요)
+# - report_hit_rate() 로 샘플 로그에서 정규화 전/후 적중률을 비교할 수 있습니다.
+#
+# 실행 예)
+#   python model/cache_key.py                 # 내장 샘플로 리포트
+#   python model/cache_key.py prompts.jsonl   # {"prompt": ..., "llm_string": ...} 줄 단위 로그
+import ast
+import hashlib
+import json
+import re
+import unicodedata
+from typing import Any, Callable, Iterable
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+
+Rule = Callable[[str], str]
+
+
+# =====================================================
+# 1) 정규화 규칙
+# =====================================================
+def nfc(text: str) -> str:
+    """유니코드 NFC(완성형)로 통일합니다. NFD 한글 '한' = 'ᄒ'+'ᅡ'+'ᆫ' → '한'"""
+    return unicodedata.normalize("NFC", text)
+
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def collapse_whitespace(text: str) -> str:
+    """연속 공백·줄바꿈·탭을 공백 하나로 줄이고 앞뒤 공백을 지웁니다."""
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def casefold(text: str) -> str:
+    """대소문자를 구분하지 않습니다. (응답이 달라질 수 있어 기본 규칙에는 넣지 않음)"""
+    return text.casefold()
+
+
+DEFAULT_RULES: tuple[Rule, ...] = (nfc, collapse_whitespace)
+
+
+# =====================================================
+# 2) 키 정규화
+# =====================================================
+class KeyCanonicalizer:
+    """
+    (prompt, llm_string) 을 정규화된 키로 바꿉니다.
+
+    - rules: 텍스트에 차례로 적용할 규칙 목록
+    - hash_keys: True 면 (sha256(prompt), sha256(llm_string)) 형태로 반환
+    """
+
+    def __init__(self, rules: Iterable[Rule] = DEFAULT_RULES, *, hash_keys: bool = False) -> None:
+        self.rules = tuple(rules)
+        self.hash_keys = hash_keys
+
+    def text(self, text: str) -> str:
+        for rule in self.rules:
+            text = rule(text)
+        return text
+
+    def prompt(self, prompt: str) -> str:
+        # Chat 모델 프롬프트는 dumps(messages) JSON → content 만 정규화하고 키 순서를 고정
+        if prompt.startswith("[{"):
+            try:
+                messages = json.loads(prompt)
+            except ValueError:
+                return self.text(prompt)
+            return json.dumps(self._normalize_json(messages), sort_keys=True, ensure_ascii=False)
+        return self.text(prompt)
+
+    def _normalize_json(self, value: Any, key: str | None = None) -> Any:
+        if isinstance(value, dict):
+            return {k: self._normalize_json(v, k) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._normalize_json(v, key) for v in value]
+        if isinstance(value, str) and key in ("content", "text"):
+            return self.text(value)
+        return value
+
+    @staticmethod
+    def llm_string(llm_string: str) -> str:
+        """
+        llm_string 의 파라미터 부분을 키 순서와 무관하게 만듭니다.
+        - Chat 모델: "<모델 JSON>---<str(sorted(params.items()))>"
+        - LLM: "<str(sorted(params.items()))>"
+        파싱할 수 없는 형식이면 원문을 그대로 씁니다.
+        """
+        head, sep, params = llm_string.rpartition("---")
+        try:
+            parsed = ast.literal_eval(params)
+        except (ValueError, SyntaxError):
+            return llm_string
+        canonical_params = json.dumps(parsed, sort_keys=True, ensure_ascii=False, default=repr)
+        if sep:
+            try:
+                head = json.dumps(json.loads(head), sort_keys=True, ensure_ascii=False)
+            except ValueError:
+                pass
+        return head + sep + canonical_params
+
+    def __call__(self, prompt: str, llm_string: str) -> tuple[str, str]:
+        prompt, llm_string = self.prompt(prompt), self.llm_string(llm_string)
+        if self.hash_keys:
+            prompt = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+            llm_string = hashlib.sha256(llm_string.encode("utf-8")).hexdigest()
+        return prompt, llm_string
+
+
+# =====================================================
+# 3) CanonicalKeyCache 정의
+# =====================================================
+class CanonicalKeyCache(BaseCache):
+    """
+    키를 정규화한 뒤 내부 캐시(inner)에 위임하는 캐시
+
+    사용 예)
+        set_llm_cache(CanonicalKeyCache(WALSQLiteCache("cache/llm_cache_wal.db")))
+    """
+
+    def __init__(self, inner: BaseCache, canonicalizer: KeyCanonicalizer | None = None) -> None:
+        self.inner = inner
+        self.canonicalizer = canonicalizer or KeyCanonicalizer()
+
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        return self.inner.lookup(*self.canonicalizer(prompt, llm_string))
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        self.inner.update(*self.canonicalizer(prompt, llm_string), return_val)
+
+    def clear(self, **kwargs: Any) -> None:
+        self.inner.clear(**kwargs)
+
+    async def alookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        return await self.inner.alookup(*self.canonicalizer(prompt, llm_string))
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        await self.inner.aupdate(*self.canonicalizer(prompt, llm_string), return_val)
+
+    async def aclear(self, **kwargs: Any) -> None:
+        await self.inner.aclear(**kwargs)
+
+
+# =====================================================
+# 4) 적중률 비교 리포트
+# =====================================================
+def report_hit_rate(records: Iterable[tuple[str, str]], canonicalizer: KeyCanonicalizer | None = None) -> dict:
+    """
+    (prompt, llm_string) 나열을 크기 제한 없는 캐시에 차례로 넣는다고 가정하고
+    정규화 전/후의 적중률(이미 본 키가 다시 나온 비율)을 계산합니다.
+    """
+    canonicalizer = canonicalizer or KeyCanonicalizer()
+    raw_seen, canonical_seen = set(), set()
+    total = raw_hits = canonical_hits = 0
+    for prompt, llm_string in records:
+        total += 1
+        raw_key = (prompt, llm_string)
+        canonical_key = canonicalizer(prompt, llm_string)
+        raw_hits += raw_key in raw_seen
+        canonical_hits += canonical_key in canonical_seen
+        raw_seen.add(raw_key)
+        canonical_seen.add(canonical_key)
+    return {
+        "requests": total,
+        "raw_unique": len(raw_seen),
+        "canonical_unique": len(canonical_seen),
+        "raw_hit_rate": raw_hits / total if total else 0.0,
+        "canonical_hit_rate": canonical_hits / total if total else 0.0,
+    }
+
+
+def _sample_records() -> list[tuple[str, str]]:
+    # 같은 질문이 공백·정규형·파라미터 순서만 달라진 채 반복되는 샘플 로그
+    params_a = "[('response_format', {'type': 'text', 'strict': True}), ('stop', None)]"
+    params_b = "[('response_format', {'strict': True, 'type': 'text'}), ('stop', None)]"
+    records = []
+    for country in ["한국", "일본", "미국", "프랑스"]:
+        base = f"{country}에 대해서 200자 내외로 요약해줘"
+        records += [
+            (base, params_a),
+            (base + " ", params_a),
+            (base.replace(" ", "  "), params_a),
+            (unicodedata.normalize("NFD", base), params_a),
+            (base, params_b),
+            (base, params_a),
+        ]
+    return records
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "r", encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f if line.strip()]
+        sample = [(r["prompt"], r.get("llm_string", "")) for r in lines]
+    else:
+        sample = _sample_records()
+
+    result = report_hit_rate(sample)
+    print(f"요청 {result['requests']}건")
+    print(f"정규화 전: 고유 키 {result['raw_unique']}개, 적중률 {result['raw_hit_rate']:.1%}")
+    print(f"정규화 후: 고유 키 {result['canonical_unique']}개, 적중률 {result['canonical_hit_rate']:.1%}")
@@ -0,0 +1,219 @@
+# =====================================================
+# mmap 으로 공유하는 읽기 전용 캐시 스냅샷
+# =====================================================
+# - 워커 프로세스마다 캐시를 따로 읽거나 예열하면, 워커 수만큼 메모리와 시작 시간이 듭니다.
+# - 스냅샷은 "해시 인덱스 + 값 블롭" 으로 된 불변(immutable) 파일입니다.
+#   · 모든 워커가 같은 파일을 mmap 하므로 실제 메모리는 OS 페이지 캐시 한 벌만 사용
+#   · 시작할 때 전체를 역직렬화하지 않고, 조회할 때 해당 슬롯과 값만 읽음
+#     → 워커 RSS 가 스냅샷 크기와 관계없이 거의 일정
+# - SnapshotCache 는 스냅샷을 읽기 전용 계층으로 앞에 두고, 없으면 쓰기 가능한 캐시(fallback)로 넘깁니다.
+#
+# 파일 구조 (정수는 모두 little-endian)
+#   [헤더 64B]  magic(8) | version(4) | n_slots(4) | n_entries(8) | index_off(8) | dict_off(8) | blob_off(8) | 예약
+#   [인덱스]    n_slots × 슬롯(44B) = key(32, sha256) | value_off(8) | value_len(4)   ※ value_off == 0 이면 빈 슬롯
+#   [사전]      개수(4) | (id(4) | len(4) | data) ...  : CompressedSQLiteCache 공유 사전
+#   [값 블롭]   WALSQLiteCache / CompressedSQLiteCache 에 저장된 값 bytes 를 그대로 이어 붙임
+#
+# 실행 예)
+#   python model/cache_snapshot.py build cache/llm_cache_wal.db cache/llm_cache.snap
+#   python model/cache_snapshot.py info cache/llm_cache.snap
+import mmap
+import os
+import sqlite3
+import struct
+import tempfile
+from typing import Any
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+
+from compressed_cache import ValueCodec
+from sqlite_wal_cache import load_generations, make_key
+
+MAGIC = b"LLMSNAP1"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQQQQ16x")
+SLOT = struct.Struct("<32sQI")
+DICT_ENTRY = struct.Struct("<II")
+LOAD_FACTOR = 0.5
+
+
+def _slot_of(key: bytes, mask: int) -> int:
+    # key 는 이미 sha256 이므로 앞 8바이트를 그대로 해시값으로 사용합니다.
+    return int.from_bytes(key[:8], "little") & mask
+
+
+# =====================================================
+# 1) 스냅샷 만들기
+# =====================================================
+def build_snapshot(source_db: str, snapshot_path: str) -> dict[str, int]:
+    """
+    WALSQLiteCache / CompressedSQLiteCache DB 로부터 스냅샷 파일을 만듭니다.
+    - 임시 파일에 쓴 뒤 os.replace 로 교체하므로, 이미 예전 스냅샷을 mmap 한 워커는
+      기존 파일을 계속 안전하게 읽고, 새로 여는 워커부터 새 스냅샷을 봅니다.
+    """
+    # COUNT(*) 와 SELECT 사이에 다른 프로세스가 커밋하면 슬롯 수와 실제 행 수가 어긋나므로
+    # 읽기 트랜잭션 하나 안에서 같은 시점의 스냅샷을 읽습니다. (WAL 모드라 쓰는 쪽을 막지 않습니다)
+    conn = sqlite3.connect(f"file:{source_db}?mode=ro", uri=True, isolation_level=None)
+    conn.execute("BEGIN")
+    n_entries = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    dicts = conn.execute("SELECT id, data FROM cache_dicts").fetchall() if "cache_dicts" in tables else []
+
+    # 적재율 50% 이하가 되도록 2의 거듭제곱 슬롯 수를 정합니다.
+    n_slots = 1
+    while n_slots * LOAD_FACTOR < max(n_entries, 1):
+        n_slots *= 2
+    mask = n_slots - 1
+
+    index_off = HEADER.size
+    dict_off = index_off + n_slots * SLOT.size
+    dict_section = struct.pack("<I", len(dicts)) + b"".join(
+        DICT_ENTRY.pack(dict_id, len(data)) + data for dict_id, data in dicts
+    )
+    blob_off = dict_off + len(dict_section)
+
+    index = bytearray(n_slots * SLOT.size)
+    directory = os.path.dirname(os.path.abspath(snapshot_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            # 값 블롭을 먼저 흘려 쓰고, 인덱스는 메모리에서 채운 뒤 마지막에 앞쪽에 씁니다.
+            f.seek(blob_off)
+            offset = blob_off
+            written = 0
+            for key, value in conn.execute("SELECT key, value FROM llm_cache"):
+                slot = _slot_of(key, mask)
+                for _ in range(n_slots):
+                    if SLOT.unpack_from(index, slot * SLOT.size)[1] == 0:
+                        break
+                    slot = (slot + 1) & mask   # 선형 탐사
+                else:
+                    raise RuntimeError(f"스냅샷 인덱스가 가득 찼습니다 (슬롯 {n_slots}개)")
+                SLOT.pack_into(index, slot * SLOT.size, key, offset, len(value))
+                f.write(value)
+                offset += len(value)
+                written += 1
+            conn.execute("COMMIT")
+            n_entries = written
+
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, VERSION, n_slots, n_entries, index_off, dict_off, blob_off))
+            f.write(index)
+            f.write(dict_section)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, snapshot_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    finally:
+        conn.close()
+    return {"entries": n_entries, "slots": n_slots, "bytes": os.path.getsize(snapshot_path)}
+
+
+# =====================================================
+# 2) 스냅샷 읽기
+# =====================================================
+class CacheSnapshot:
+    """
+    mmap 으로 연 스냅샷 파일. 조회 시 필요한 슬롯과 값 페이지만 읽습니다.
+    """
+
+    def __init__(self, snapshot_path: str) -> None:
+        self.path = snapshot_path
+        with open(snapshot_path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n_slots, n_entries, index_off, dict_off, blob_off = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError(f"캐시 스냅샷 파일이 아닙니다: {snapshot_path}")
+        self.n_slots = n_slots
+        self.n_entries = n_entries
+        self._mask = n_slots - 1
+        self._index_off = index_off
+
+        # 압축 사전은 작으므로 열 때 한 번만 읽어 둡니다.
+        self.codec = ValueCodec()
+        (count,) = struct.unpack_from("<I", self._mm, dict_off)
+        pos = dict_off + 4
+        for _ in range(count):
+            dict_id, length = DICT_ENTRY.unpack_from(self._mm, pos)
+            pos += DICT_ENTRY.size
+            self.codec.add_dictionary(dict_id, self._mm[pos:pos + length], activate=False)
+            pos += length
+
+    def get(self, key: bytes) -> bytes | None:
+        """key 에 해당하는 값 bytes (없으면 None)"""
+        slot = _slot_of(key, self._mask)
+        for _ in range(self.n_slots):
+            slot_key, offset, length = SLOT.unpack_from(self._mm, self._index_off + slot * SLOT.size)
+            if offset == 0:
+                return None
+            if slot_key == key:
+                return self._mm[offset:offset + length]
+            slot = (slot + 1) & self._mask
+        return None
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def __len__(self) -> int:
+        return self.n_entries
+
+
+# =====================================================
+# 3) SnapshotCache: 스냅샷(읽기 전용) + 쓰기 가능한 캐시
+# =====================================================
+class SnapshotCache(BaseCache):
+    """
+    스냅샷을 먼저 조회하고, 없으면 fallback 캐시를 조회하는 캐시
+
+    - snapshot_path: build_snapshot 으로 만든 파일
+    - fallback: 새 응답을 저장할 쓰기 가능한 캐시 (WALSQLiteCache 등, None 이면 저장하지 않음)
+    - update 는 항상 fallback 으로 가며 스냅샷은 바뀌지 않습니다.
+    """
+
+    def __init__(self, snapshot_path: str, fallback: BaseCache | None = None) -> None:
+        self.snapshot = CacheSnapshot(snapshot_path)
+        self.fallback = fallback
+        self.snapshot_hits = 0
+
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        data = self.snapshot.get(make_key(prompt, llm_string))
+        if data is not None:
+            self.snapshot_hits += 1
+            return load_generations(self.snapshot.codec.decompress(data))
+        return self.fallback.lookup(prompt, llm_string) if self.fallback is not None else None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        if self.fallback is not None:
+            self.fallback.update(prompt, llm_string, return_val)
+
+    def clear(self, **kwargs: Any) -> None:
+        # 스냅샷은 불변이므로 쓰기 가능한 캐시만 비웁니다.
+        if self.fallback is not None:
+            self.fallback.clear(**kwargs)
+
+    def close(self) -> None:
+        self.snapshot.close()
+        close_fallback = getattr(self.fallback, "close", None)
+        if callable(close_fallback):
+            close_fallback()
+
+
+# =====================================================
+# 4) main: 스냅샷 생성 / 정보 확인
+# =====================================================
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) == 4 and sys.argv[1] == "build":
+        print("스냅샷 생성:", build_snapshot(sys.argv[2], sys.argv[3]))
+    elif len(sys.argv) == 3 and sys.argv[1] == "info":
+        snap = CacheSnapshot(sys.argv[2])
+        print(f"항목 {len(snap)}개, 슬롯 {snap.n_slots}개, 파일 {os.path.getsize(snap.path):,} bytes")
+        snap.close()
+    else:
+        print("사용법:")
+        print("  python model/cache_snapshot.py build <캐시 DB> <스냅샷 파일>")
+        print("  python model/cache_snapshot.py info <스냅샷 파일>")
@@ -0,0 +1,222 @@
+# =====================================================
+# 쿼리 로그 기반 LLM 캐시 예열(warm-up)
+# =====================================================
+# - 배포 직후에는 캐시가 비어 있어 처음 몇 분의 트래픽이 모두 LLM 지연시간을 그대로 겪습니다.
+# - 이 도구는 워커가 트래픽을 받기 전에 캐시를 채웁니다.
+#   1) 과거 체인 입력이 한 줄에 하나씩 담긴 JSONL 로그를 읽고
+#      (예: {"country": "한국"}) 같은 입력은 하나로 합쳐 자주 나온 순서로 정렬
+#   2) 동시 실행 수(concurrency)와 초당 요청 수(rps)를 제한하며 chain.ainvoke 로 재생
+#      → set_llm_cache 로 설정한 캐시에 응답이 저장됨
+#   3) 미리 만들어 둔 캐시 DB 스냅샷이 있으면 재생 대신 그대로 복사해 사용 (restore_snapshot)
+# - 끝나면 로그 트래픽 중 몇 %가 캐시로 커버되는지(coverage)와 소요 시간을 보고합니다.
+#
+# 실행 예)
+#   python model/cache_warmup.py queries.jsonl --concurrency 8 --rps 5
+#   python model/cache_warmup.py --snapshot prebuilt/llm_cache_wal.db
+import argparse
+import asyncio
+import json
+import sqlite3
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+from langchain_core.runnables import Runnable
+
+
+# =====================================================
+# 1) 쿼리 로그 읽기
+# =====================================================
+def load_query_log(path: str, *, limit: int | None = None) -> tuple[list[dict], Counter]:
+    """
+    JSONL 로그를 읽어 (자주 나온 순으로 정렬된 고유 입력 목록, 입력별 등장 횟수) 를 반환합니다.
+    - 빈 줄과 JSON 이 아닌 줄은 건너뜁니다.
+    - limit 를 주면 상위 limit 개 입력만 반환합니다.
+    """
+    counts: Counter = Counter()
+    inputs: dict[str, dict] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            # 같은 입력이면 키 순서가 달라도 하나로 셉니다.
+            key = json.dumps(record, sort_keys=True, ensure_ascii=False)
+            counts[key] += 1
+            inputs.setdefault(key, record)
+
+    ordered = [inputs[key] for key, _ in counts.most_common(limit)]
+    return ordered, counts
+
+
+# =====================================================
+# 2) 초당 요청 수 제한기 (토큰 버킷)
+# =====================================================
+class RateLimiter:
+    """
+    초당 rate 개까지 요청을 허용하는 비동기 토큰 버킷
+    - burst: 한 번에 몰아서 보낼 수 있는 최대 요청 수
+    """
+
+    def __init__(self, rate: float, *, burst: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError("rate 는 0보다 커야 합니다.")
+        self._rate = rate
+        self._capacity = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+
+# =====================================================
+# 3) 예열 결과
+# =====================================================
+@dataclass
+class WarmupReport:
+    """예열 결과 요약"""
+    unique_inputs: int = 0
+    total_requests: int = 0     # 로그 전체 줄 수 (중복 포함)
+    warmed: int = 0             # 성공한 고유 입력 수
+    failed: int = 0
+    covered_requests: int = 0   # 예열된 입력이 로그에서 차지하는 줄 수
+    seconds: float = 0.0
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def coverage(self) -> float:
+        """로그 트래픽 중 캐시로 응답할 수 있는 비율"""
+        return self.covered_requests / self.total_requests if self.total_requests else 0.0
+
+    def __str__(self) -> str:
+        return (f"고유 입력 {self.unique_inputs}개 중 {self.warmed}개 예열 (실패 {self.failed}개), "
+                f"트래픽 커버리지 {self.coverage:.1%}, 소요 {self.seconds:.1f}초")
+
+
+# =====================================================
+# 4) 로그 재생
+# =====================================================
+async def warm_up(
+    chain: Runnable,
+    inputs: list[dict],
+    counts: Counter | None = None,
+    *,
+    concurrency: int = 8,
+    rps: float | None = None,
+) -> WarmupReport:
+    """
+    inputs 를 chain.ainvoke 로 재생해 캐시를 채웁니다.
+    - concurrency: 동시에 진행할 최대 호출 수
+    - rps: 초당 최대 호출 수 (None 이면 제한 없음)
+    - counts: load_query_log 가 반환한 등장 횟수 (커버리지 계산용)
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(rps, burst=concurrency) if rps else None
+    report = WarmupReport(
+        unique_inputs=len(inputs),
+        total_requests=sum(counts.values()) if counts else len(inputs),
+    )
+
+    async def replay(record: dict) -> None:
+        async with semaphore:
+            if limiter is not None:
+                await limiter.acquire()
+            try:
+                await chain.ainvoke(record)
+            except Exception as exc:
+                report.failed += 1
+                report.errors.append(f"{record}: {exc!r}")
+                return
+        report.warmed += 1
+        key = json.dumps(record, sort_keys=True, ensure_ascii=False)
+        report.covered_requests += counts[key] if counts else 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(replay(record) for record in inputs))
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+# =====================================================
+# 5) 스냅샷 복원
+# =====================================================
+def restore_snapshot(snapshot_path: str, database_path: str) -> float:
+    """
+    미리 만들어 둔 SQLite 캐시 DB(WALSQLiteCache / CompressedSQLiteCache 형식)를
+    database_path 로 복사합니다. sqlite backup API 를 써서 WAL 파일까지 일관되게 복사하며,
+    소요 시간(초)을 반환합니다.
+    """
+    start = time.perf_counter()
+    source = sqlite3.connect(f"file:{snapshot_path}?mode=ro", uri=True)
+    target = sqlite3.connect(database_path)
+    with target:
+        source.backup(target)
+    source.close()
+    target.close()
+    return time.perf_counter() - start
+
+
+# =====================================================
+# 6) main: caching.py 와 같은 체인으로 예열
+# =====================================================
+def main():
+    import os
+
+    from dotenv import load_dotenv
+    from langchain.globals import set_llm_cache
+    from langchain_core.output_parsers import StrOutputParser
+    from langchain_core.prompts import PromptTemplate
+    from langchain_openai import ChatOpenAI
+
+    from sqlite_wal_cache import WALSQLiteCache
+
+    parser = argparse.ArgumentParser(description="쿼리 로그로 LLM 캐시 예열")
+    parser.add_argument("log", nargs="?", help="체인 입력이 한 줄에 하나씩 있는 JSONL 파일")
+    parser.add_argument("--db", default="cache/llm_cache_wal.db", help="채울 캐시 DB 경로")
+    parser.add_argument("--snapshot", help="재생 대신 복사할 캐시 DB 스냅샷")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rps", type=float, default=None, help="초당 최대 요청 수")
+    parser.add_argument("--limit", type=int, default=None, help="자주 나온 상위 N개 입력만 예열")
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(args.db) or ".", exist_ok=True)
+    if args.snapshot:
+        seconds = restore_snapshot(args.snapshot, args.db)
+        print(f"스냅샷 복원 완료: {args.snapshot} → {args.db} ({seconds:.2f}초)")
+        return
+    if not args.log:
+        parser.error("log 또는 --snapshot 중 하나는 필요합니다.")
+
+    load_dotenv()
+    if not os.getenv("OPENAI_API_KEY"):
+        raise RuntimeError("❌ OPENAI_API_KEY가 설정되지 않았습니다.")
+
+    cache = WALSQLiteCache(args.db)
+    set_llm_cache(cache)
+    prompt = PromptTemplate(template="{country}에 대해서 200자 내외로 요약해줘", input_variables=["country"])
+    chain = prompt | ChatOpenAI(model="gpt-4.1-mini") | StrOutputParser()
+
+    inputs, counts = load_query_log(args.log, limit=args.limit)
+    report = asyncio.run(warm_up(chain, inputs, counts, concurrency=args.concurrency, rps=args.rps))
+    cache.close()
+    print(report)
+    for error in report.errors[:5]:
+        print("  실패:", error)
+
+
+if __name__ == "__main__":
+    main()
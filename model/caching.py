@@ -10,6 +10,7 @@ from langchain_core.output_parsers import StrOutputParser
 from langchain.globals import set_llm_cache
 from langchain_core.caches import InMemoryCache
 from langchain_community.cache import SQLiteCache
+from bounded_cache import BoundedInMemoryCache
 
 # =====================================================
 # 2) 환경 변수 로딩 & API 키 검증
@@ -39,6 +40,9 @@ chain = prompt | llm | StrOutputParser()
 # =====================================================
 # 5) 1) 단순 모델 호출 예제
 # =====================================================
+# ※ 아래 perf_counter 측정은 호출 1~2번만 보는 간단한 예시입니다.
+#   캐시 구성별 p50/p95/p99·처리량·메모리 비교는 cache_benchmark.py 를 사용하세요.
+# =====================================================
 print("\n--- 1) 단순 모델 호출 ---")
 response = chain.invoke({"country": "한국"})
 print("응답:", response)
@@ -48,7 +52,11 @@ print("응답:", response)
 # =====================================================
 print("\n--- 2) InMemoryCache 테스트 ---")
 # 전역 캐시로 InMemoryCache 설정
-set_llm_cache(InMemoryCache())
+# - InMemoryCache() 는 크기 제한이 없어 오래 떠 있는 워커에서는 메모리가 계속 늘어납니다.
+# - 운영 환경에서는 항목 수·바이트·TTL 한도가 있는 BoundedInMemoryCache 를 사용합니다.
+#   (InMemoryCache 로 비교하려면 아래 줄을 set_llm_cache(InMemoryCache()) 로 바꾸세요)
+memory_cache = BoundedInMemoryCache(maxsize=1000, max_bytes=64 * 1024 * 1024, ttl=60 * 60)
+set_llm_cache(memory_cache)
 
 # 첫 번째 호출 (캐시 미스)
 start = time.perf_counter()
@@ -63,6 +71,8 @@ resp2 = chain.invoke({"country": "한국"})
 t2 = time.perf_counter() - start
 print("두 번째 호출 응답:", resp2)
 print(f"두 번째 호출 소요 시간: {t2:.3f}초")
+# hit / miss / eviction 카운터 확인
+print("캐시 통계:", memory_cache.stats())
 
 # =====================================================
 # 7) 3) SQLiteCache 테스트
@@ -71,6 +81,8 @@ print("\n--- 3) SQLiteCache 테스트 ---")
 # 캐시 파일 저장 디렉토리 생성
 os.makedirs("cache", exist_ok=True)
 # 전역 캐시로 SQLiteCache 설정
+# - 여러 워커 프로세스가 같은 DB 를 공유한다면 WAL 모드·배치 쓰기를 쓰는
+#   sqlite_wal_cache.WALSQLiteCache 를 사용하세요. (비교: sqlite_cache_benchmark.py)
 set_llm_cache(SQLiteCache(database_path="cache/llm_cache.db"))
 
 # 첫 번째 호출 (DB에 캐시 없음 → 느림)
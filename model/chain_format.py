@@ -0,0 +1,171 @@
+# =====================================================
+# 체인 바이너리 직렬화 포맷 (msgpack + 콘텐츠 해시)
+# =====================================================
+# - serialization.py 는 dumpd 결과를 pickle 또는 indent=2 JSON 으로 저장합니다.
+#   · JSON 은 들여쓰기·키 이름이 그대로 남아 크고, 파싱도 느립니다.
+#   · pickle 은 파이썬 전용이고 신뢰할 수 없는 파일을 읽으면 임의 코드가 실행될 수 있습니다.
+# - 이 모듈은 같은 dumpd dict 를 msgpack 바이너리로 저장합니다.
+#   · msgpack 인코딩은 ormsgpack(langgraph-checkpoint 의존성)을 사용하고,
+#     없으면 msgpack 패키지로 대체합니다.
+#   · 키를 정렬해 인코딩하므로 같은 체인은 항상 같은 바이트 → sha256 이 곧 "콘텐츠 해시"
+#   · 헤더에 해시를 기록해 두고 읽을 때 검증하므로 깨진/변조된 파일을 바로 알 수 있습니다.
+#   · compress=True 면 compressed_cache.ValueCodec(zstd/zlib)로 본문을 한 번 더 압축합니다.
+# - 복원은 dumpd/load 와 동일합니다. decode_chain() 결과는 dumpd(chain) 과 같은 dict 이고,
+#   load_chain() 은 그 dict 를 langchain_core.load.load 에 넘깁니다.
+#
+# 파일 포맷: [b"LCCB"][버전 1바이트][플래그 1바이트][sha256 32바이트][본문]
+#   - 플래그 bit0: 본문이 ValueCodec 으로 압축되어 있음
+#   - sha256 은 압축 전 msgpack 바이트 기준
+import hashlib
+import os
+from typing import Any
+
+from langchain_core.load import dumpd, load
+
+from compressed_cache import ValueCodec
+
+try:
+    import ormsgpack
+except ImportError:  # langgraph 없이 쓰는 경우: pip install msgpack
+    ormsgpack = None
+    try:
+        import msgpack
+    except ImportError:
+        msgpack = None
+
+MAGIC = b"LCCB"
+VERSION = 1
+FLAG_COMPRESSED = 0x01
+HEADER_SIZE = len(MAGIC) + 2 + 32
+
+
+# =====================================================
+# 1) msgpack 인코딩 / 콘텐츠 해시
+# =====================================================
+def packb(obj: Any) -> bytes:
+    if ormsgpack is not None:
+        return ormsgpack.packb(obj, option=ormsgpack.OPT_SORT_KEYS)
+    if msgpack is None:
+        raise ImportError("바이너리 체인 포맷에는 ormsgpack 또는 msgpack 패키지가 필요합니다.")
+    return msgpack.packb(_sorted(obj), use_bin_type=True)
+
+
+def unpackb(data: bytes) -> Any:
+    if ormsgpack is not None:
+        return ormsgpack.unpackb(data)
+    if msgpack is None:
+        raise ImportError("바이너리 체인 포맷에는 ormsgpack 또는 msgpack 패키지가 필요합니다.")
+    return msgpack.unpackb(data, raw=False)
+
+
+def _sorted(obj: Any) -> Any:
+    # msgpack 패키지에는 키 정렬 옵션이 없어 직접 정렬합니다.
+    if isinstance(obj, dict):
+        return {k: _sorted(obj[k]) for k in sorted(obj)}
+    if isinstance(obj, (list, tuple)):
+        return [_sorted(v) for v in obj]
+    return obj
+
+
+def _as_dict(chain_or_dict: Any) -> dict:
+    return chain_or_dict if isinstance(chain_or_dict, dict) else dumpd(chain_or_dict)
+
+
+def content_hash(chain_or_dict: Any) -> str:
+    """체인(또는 dumpd dict)의 sha256 콘텐츠 해시(hex). 같은 구성이면 항상 같은 값입니다."""
+    return hashlib.sha256(packb(_as_dict(chain_or_dict))).hexdigest()
+
+
+# =====================================================
+# 2) bytes 변환
+# =====================================================
+def encode_chain(chain_or_dict: Any, *, compress: bool = False, codec: ValueCodec | None = None) -> bytes:
+    """체인 또는 dumpd dict → 바이너리 포맷 bytes"""
+    payload = packb(_as_dict(chain_or_dict))
+    digest = hashlib.sha256(payload).digest()
+    flags = 0
+    if compress:
+        payload = (codec or ValueCodec()).compress(payload)
+        flags |= FLAG_COMPRESSED
+    return MAGIC + bytes([VERSION, flags]) + digest + payload
+
+
+def decode_chain(data: bytes, *, verify: bool = True, codec: ValueCodec | None = None) -> dict:
+    """바이너리 포맷 bytes → dumpd 와 같은 구조의 dict"""
+    if data[:len(MAGIC)] != MAGIC or len(data) < HEADER_SIZE:
+        raise ValueError("체인 바이너리 포맷이 아닙니다.")
+    version, flags = data[len(MAGIC)], data[len(MAGIC) + 1]
+    if version != VERSION:
+        raise ValueError(f"지원하지 않는 포맷 버전입니다: {version}")
+
+    digest = data[len(MAGIC) + 2:HEADER_SIZE]
+    payload = data[HEADER_SIZE:]
+    if flags & FLAG_COMPRESSED:
+        payload = (codec or ValueCodec()).decompress(payload)
+    if verify and hashlib.sha256(payload).digest() != digest:
+        raise ValueError("콘텐츠 해시가 일치하지 않습니다. 파일이 손상되었을 수 있습니다.")
+    return unpackb(payload)
+
+
+def header_hash(data: bytes) -> str:
+    """본문을 풀지 않고 헤더에 기록된 콘텐츠 해시만 읽습니다."""
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("체인 바이너리 포맷이 아닙니다.")
+    return data[len(MAGIC) + 2:HEADER_SIZE].hex()
+
+
+# =====================================================
+# 3) 파일 저장 / 복원
+# =====================================================
+def save_chain(chain_or_dict: Any, path: str, *, compress: bool = False) -> str:
+    """체인을 path 에 저장하고 콘텐츠 해시(hex)를 반환합니다."""
+    data = encode_chain(chain_or_dict, compress=compress)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # 임시 파일에 쓴 뒤 교체해, 읽는 쪽이 반쯤 쓰인 파일을 보지 않게 합니다.
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return header_hash(data)
+
+
+def read_chain_dict(path: str, *, verify: bool = True) -> dict:
+    """파일 → dumpd dict (객체 생성 없이 구조만 읽음)"""
+    with open(path, "rb") as f:
+        return decode_chain(f.read(), verify=verify)
+
+
+def load_chain(path: str, *, verify: bool = True, **load_kwargs: Any) -> Any:
+    """
+    파일 → 체인 객체
+    - load_kwargs 는 langchain_core.load.load 에 그대로 전달됩니다.
+      예) secrets_map={"OPENAI_API_KEY": ...}, allowed_objects="all"
+    """
+    return load(read_chain_dict(path, verify=verify), **load_kwargs)
+
+
+# =====================================================
+# 4) 실행 예제 (API 키 없이 동작, 실제 호출은 하지 않음)
+# =====================================================
+if __name__ == "__main__":
+    import tempfile
+    import warnings
+
+    from langchain_core.prompts import PromptTemplate
+    from langchain_openai import ChatOpenAI
+
+    warnings.simplefilter("ignore")
+
+    prompt = PromptTemplate(template="{fruit}의 색상이 무엇입니까?", input_variables=["fruit"])
+    chain = prompt | ChatOpenAI(model="gpt-4.1-mini", api_key="sk-placeholder")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "fruit_chain.lccb")
+        digest = save_chain(chain, path)
+        print("콘텐츠 해시:", digest, f"({os.path.getsize(path)} bytes)")
+        print("dumpd 와 동일:", read_chain_dict(path) == dumpd(chain))
+
+        restored = load_chain(path, secrets_map={"OPENAI_API_KEY": "sk-placeholder"}, allowed_objects="all")
+        print("복원된 체인:", type(restored).__name__, "→", [type(step).__name__ for step in restored.steps])
@@ -0,0 +1,133 @@
+# =====================================================
+# 체인 저장 포맷 벤치마크: pickle / JSON / 바이너리(chain_format)
+# =====================================================
+# - serialization.py 와 같은 "prompt | ChatOpenAI" 체인을 --chains 개 변형(템플릿·모델·temperature)으로 만들고
+#   포맷별로 파일에 저장한 뒤 다음을 비교합니다.
+#   · 파일 크기 합계
+#   · 읽기(파일 → dumpd dict) 시간
+#   · 복원(파일 → dict → load() 로 체인 객체) 시간
+# - --branches 를 늘리면 RunnableParallel 로 체인 하나에 prompt | llm 가지를 여러 개 달아
+#   큰 체인에서의 차이를 볼 수 있습니다.
+# - 비율/배율은 serialization.py 가 쓰는 json(indent=2) 기준입니다.
+# - API 키는 필요 없습니다 (가짜 키로 객체만 만들고 호출하지 않음).
+#
+# 실행 예)
+#   python model/chain_format_benchmark.py --chains 300 --branches 1 4
+import argparse
+import json
+import os
+import pickle
+import tempfile
+import time
+import warnings
+
+from langchain_core.load import dumpd, load
+from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import RunnableParallel
+from langchain_openai import ChatOpenAI
+
+from chain_format import decode_chain, encode_chain
+
+warnings.simplefilter("ignore")
+
+FAKE_KEY = "sk-placeholder"
+LOAD_KWARGS = {"secrets_map": {"OPENAI_API_KEY": FAKE_KEY}, "allowed_objects": "all"}
+
+
+def make_chain(i: int, branches: int):
+    def branch(j: int):
+        prompt = PromptTemplate(template=f"[{i}-{j}] {{fruit}}의 색상이 무엇입니까?", input_variables=["fruit"])
+        llm = ChatOpenAI(model=["gpt-4.1-mini", "gpt-4.1"][i % 2], temperature=(i % 5) / 10, api_key=FAKE_KEY)
+        return prompt | llm
+
+    if branches == 1:
+        return branch(0)
+    return RunnableParallel({f"b{j}": branch(j) for j in range(branches)})
+
+
+# 포맷 이름 → (확장자, dict → bytes, bytes → dict)
+FORMATS = {
+    "pickle": (
+        "pkl",
+        lambda d: pickle.dumps(d),
+        lambda b: pickle.loads(b),
+    ),
+    "json(indent=2)": (
+        "json",
+        lambda d: json.dumps(d, ensure_ascii=False, indent=2).encode("utf-8"),
+        lambda b: json.loads(b),
+    ),
+    "json(compact)": (
+        "json",
+        lambda d: json.dumps(d, ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+        lambda b: json.loads(b),
+    ),
+    "binary": (
+        "lccb",
+        lambda d: encode_chain(d),
+        lambda b: decode_chain(b),
+    ),
+    "binary+compress": (
+        "lccb",
+        lambda d: encode_chain(d, compress=True),
+        lambda b: decode_chain(b),
+    ),
+}
+
+
+def _best_of(repeat: int, fn) -> float:
+    # 단일 측정은 디스크 캐시·GC 에 흔들리므로 repeat 번 중 최솟값을 씁니다.
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_format(name: str, dicts: list[dict], tmp: str, repeat: int) -> dict:
+    ext, encode, decode = FORMATS[name]
+    paths = []
+    for i, d in enumerate(dicts):
+        path = os.path.join(tmp, f"{name}-{i}.{ext}")
+        with open(path, "wb") as f:
+            f.write(encode(d))
+        paths.append(path)
+    size = sum(os.path.getsize(p) for p in paths)
+
+    def read_all() -> list[dict]:
+        parsed = []
+        for path in paths:
+            with open(path, "rb") as f:
+                parsed.append(decode(f.read()))
+        return parsed
+
+    assert read_all() == dicts, f"{name}: 왕복 결과가 dumpd 와 다릅니다."
+    return {
+        "size": size,
+        "read": _best_of(repeat, read_all),
+        "restore": _best_of(repeat, lambda: [load(d, **LOAD_KWARGS) for d in read_all()]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="체인 저장 포맷별 크기·읽기·복원 시간 비교")
+    parser.add_argument("--chains", type=int, default=300, help="저장할 체인 변형 수")
+    parser.add_argument("--branches", type=int, nargs="+", default=[1, 8], help="체인당 prompt | llm 가지 수")
+    parser.add_argument("--repeat", type=int, default=5, help="측정 반복 횟수 (최솟값 사용)")
+    args = parser.parse_args()
+
+    for branches in args.branches:
+        dicts = [dumpd(make_chain(i, branches)) for i in range(args.chains)]
+        print(f"\n체인 {args.chains}개, 체인당 가지 {branches}개")
+        print(f"{'format':<16} {'size(KB)':>9} {'read(ms)':>9} {'restore(ms)':>12} {'size 비율':>9} {'read 배율':>9}")
+        with tempfile.TemporaryDirectory() as tmp:
+            results = {name: bench_format(name, dicts, tmp, args.repeat) for name in FORMATS}
+            baseline = results["json(indent=2)"]
+            for name, r in results.items():
+                print(f"{name:<16} {r['size'] / 1024:>9.1f} {r['read'] * 1000:>9.1f} {r['restore'] * 1000:>12.1f} "
+                      f"{r['size'] / baseline['size']:>9.2f} {baseline['read'] / r['read']:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+# =====================================================
+# 콘텐츠 주소 기반 체인 레지스트리 (구성 요소 중복 제거 저장)
+# =====================================================
+# - serialization.py 처럼 체인마다 dumpd 결과를 통째로 저장하면,
+#   같은 ChatOpenAI 설정·같은 파서가 체인 수만큼 반복해서 저장되고 복원될 때도 매번 새로 만들어집니다.
+# - ChainRegistry 는 체인을 구성 요소(constructor 노드) 단위로 쪼개 저장합니다.
+#   · 각 노드의 자식 구성 요소는 {"lc": 1, "type": "ref", "hash": <sha256 32바이트>} 참조로 바꾼 뒤
+#     msgpack(chain_format.packb) 으로 인코딩하고, 그 sha256 을 주소로 씁니다. (머클 트리)
+#   · 같은 설정의 구성 요소는 같은 해시 → components 테이블에 한 번만 저장됩니다.
+#   · 체인은 (name, version) → 루트 해시 한 줄만 chains 테이블에 기록합니다.
+# - 복원할 때는 해시별로 만든 객체를 프로세스 안 인스턴스 캐시에 보관하므로,
+#   여러 체인이 공유하는 구성 요소(예: 같은 설정의 ChatOpenAI)는 한 번만 만들어집니다.
+#   · Runnable 은 실행 중 상태를 갖지 않으므로 같은 인스턴스를 여러 체인이 함께 써도 됩니다.
+# - 비밀 값(secret)은 dumpd 와 마찬가지로 참조만 저장하고, 복원 시 load_kwargs 의 secrets_map 으로 채웁니다.
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from langchain_core.load import dumpd, load
+
+from chain_format import packb, unpackb
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS components (
+    hash BLOB PRIMARY KEY,
+    data BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS chains (
+    name       TEXT    NOT NULL,
+    version    INTEGER NOT NULL,
+    root       BLOB    NOT NULL,
+    created_at REAL    NOT NULL,
+    PRIMARY KEY (name, version)
+) WITHOUT ROWID;
+"""
+
+
+def _is_constructor(obj: Any) -> bool:
+    return isinstance(obj, dict) and obj.get("type") == "constructor"
+
+
+def _is_ref(obj: Any) -> bool:
+    return isinstance(obj, dict) and obj.get("type") == "ref" and "hash" in obj
+
+
+# =====================================================
+# 1) ChainRegistry 정의
+# =====================================================
+class ChainRegistry:
+    """
+    (name, version) 으로 체인을 저장/복원하는 콘텐츠 주소 레지스트리
+
+    - database_path: SQLite 파일 경로
+    - load_kwargs: 복원 시 langchain_core.load.load 에 넘길 인자
+      예) secrets_map={"OPENAI_API_KEY": ...}, allowed_objects="all"
+    - instances_built: 지금까지 실제로 생성한 구성 요소 수 (인스턴스 캐시 효과 확인용)
+    """
+
+    def __init__(self, database_path: str = "cache/chain_registry.db", **load_kwargs: Any) -> None:
+        directory = os.path.dirname(database_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.database_path = database_path
+        self._load_kwargs = load_kwargs
+        self._conn = sqlite3.connect(database_path, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.RLock()
+
+        # 해시 → 디코딩된 노드 / 생성된 객체
+        self._nodes: dict[bytes, dict] = {}
+        self._instances: dict[bytes, Any] = {}
+        self.instances_built = 0
+
+    # -------------------------------------------------
+    # 1-1) 저장
+    # -------------------------------------------------
+    def _store(self, node: Any, pending: dict[bytes, bytes]) -> Any:
+        """자식부터 저장하며 constructor 노드를 ref 로 바꾼 구조를 반환합니다."""
+        if isinstance(node, list):
+            return [self._store(item, pending) for item in node]
+        if not isinstance(node, dict):
+            return node
+
+        replaced = {key: self._store(value, pending) for key, value in node.items()}
+        if not _is_constructor(node):
+            return replaced
+        data = packb(replaced)
+        digest = hashlib.sha256(data).digest()
+        pending[digest] = data
+        return {"lc": 1, "type": "ref", "hash": digest}
+
+    def register(self, name: str, chain_or_dict: Any) -> tuple[int, str]:
+        """
+        체인을 name 의 새 버전으로 저장하고 (version, 루트 해시) 를 반환합니다.
+        - 최신 버전과 내용이 같으면 새 버전을 만들지 않고 기존 버전을 돌려줍니다.
+        """
+        serialized = chain_or_dict if isinstance(chain_or_dict, dict) else dumpd(chain_or_dict)
+        if not _is_constructor(serialized):
+            raise ValueError("constructor 타입의 dumpd dict 만 등록할 수 있습니다.")
+        pending: dict[bytes, bytes] = {}
+        root = self._store(serialized, pending)["hash"]
+
+        with self._lock:
+            latest = self._conn.execute(
+                "SELECT version, root FROM chains WHERE name = ? ORDER BY version DESC LIMIT 1", (name,)
+            ).fetchone()
+            if latest is not None and latest[1] == root:
+                return latest[0], root.hex()
+            version = latest[0] + 1 if latest is not None else 1
+
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # 이미 있는 구성 요소는 INSERT OR IGNORE 로 건너뜁니다 (중복 제거)
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO components (hash, data) VALUES (?, ?)", pending.items()
+                )
+                self._conn.execute(
+                    "INSERT INTO chains (name, version, root, created_at) VALUES (?, ?, ?, ?)",
+                    (name, version, root, time.time()),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return version, root.hex()
+
+    # -------------------------------------------------
+    # 1-2) 조회
+    # -------------------------------------------------
+    def _root(self, name: str, version: int | None) -> bytes:
+        with self._lock:
+            if version is None:
+                row = self._conn.execute(
+                    "SELECT root FROM chains WHERE name = ? ORDER BY version DESC LIMIT 1", (name,)
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT root FROM chains WHERE name = ? AND version = ?", (name, version)
+                ).fetchone()
+        if row is None:
+            raise KeyError(f"등록되지 않은 체인입니다: {name} (version={version})")
+        return row[0]
+
+    def _node(self, digest: bytes) -> dict:
+        node = self._nodes.get(digest)
+        if node is None:
+            with self._lock:
+                row = self._conn.execute("SELECT data FROM components WHERE hash = ?", (digest,)).fetchone()
+            if row is None:
+                raise KeyError(f"구성 요소를 찾을 수 없습니다: {digest.hex()}")
+            node = unpackb(row[0])
+            self._nodes[digest] = node
+        return node
+
+    def _expand(self, node: Any) -> Any:
+        # ref 를 원래 dumpd 구조로 되돌립니다.
+        if isinstance(node, list):
+            return [self._expand(item) for item in node]
+        if not isinstance(node, dict):
+            return node
+        if _is_ref(node):
+            return self._expand(self._node(node["hash"]))
+        return {key: self._expand(value) for key, value in node.items()}
+
+    def get_dict(self, name: str, version: int | None = None) -> dict:
+        """dumpd(chain) 과 같은 dict 로 복원합니다 (객체는 만들지 않음)."""
+        return self._expand(self._node(self._root(name, version)))
+
+    def versions(self, name: str) -> list[int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT version FROM chains WHERE name = ? ORDER BY version", (name,))
+            return [row[0] for row in rows]
+
+    def names(self) -> list[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT name FROM chains ORDER BY name")]
+
+    # -------------------------------------------------
+    # 1-3) 복원 (인스턴스 캐시)
+    # -------------------------------------------------
+    def _with_instances(self, node: Any) -> Any:
+        # ref 자리에 이미 만든 객체를 넣어 두면 load() 는 그 값을 그대로 생성자 인자로 씁니다.
+        if isinstance(node, list):
+            return [self._with_instances(item) for item in node]
+        if not isinstance(node, dict):
+            return node
+        if _is_ref(node):
+            return self._instance(node["hash"])
+        return {key: self._with_instances(value) for key, value in node.items()}
+
+    def _instance(self, digest: bytes) -> Any:
+        instance = self._instances.get(digest)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(digest)
+                if instance is None:
+                    instance = load(self._with_instances(self._node(digest)), **self._load_kwargs)
+                    self._instances[digest] = instance
+                    self.instances_built += 1
+        return instance
+
+    def load(self, name: str, version: int | None = None) -> Any:
+        """체인 객체를 복원합니다. version 을 생략하면 최신 버전입니다."""
+        return self._instance(self._root(name, version))
+
+    def clear_instances(self) -> None:
+        """인스턴스 캐시를 비웁니다 (secrets_map 을 바꾼 뒤 등)."""
+        with self._lock:
+            self._instances.clear()
+
+    # -------------------------------------------------
+    # 1-4) 통계 / 정리
+    # -------------------------------------------------
+    def storage_stats(self) -> dict[str, int]:
+        with self._lock:
+            components, component_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM components"
+            ).fetchone()
+            (chains,) = self._conn.execute("SELECT COUNT(*) FROM chains").fetchone()
+        return {"chains": chains, "components": components, "component_bytes": component_bytes}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# =====================================================
+# 2) 실행 예제 (API 키 없이 동작, 실제 호출은 하지 않음)
+# =====================================================
+if __name__ == "__main__":
+    import tempfile
+    import warnings
+
+    from langchain_core.output_parsers import StrOutputParser
+    from langchain_core.prompts import PromptTemplate
+    from langchain_openai import ChatOpenAI
+
+    warnings.simplefilter("ignore")
+
+    llm = ChatOpenAI(model="gpt-4.1-mini", api_key="sk-placeholder")
+    with tempfile.TemporaryDirectory() as tmp:
+        registry = ChainRegistry(
+            os.path.join(tmp, "registry.db"),
+            secrets_map={"OPENAI_API_KEY": "sk-placeholder"},
+            allowed_objects="all",
+        )
+        for fruit_prompt in ["{fruit}의 색상이 무엇입니까?", "{fruit}의 맛은 어떤가요?"]:
+            chain = PromptTemplate(template=fruit_prompt, input_variables=["fruit"]) | llm | StrOutputParser()
+            print("등록:", registry.register(f"fruit-{len(registry.names())}", chain))
+        print("같은 내용 재등록 → 기존 버전:", registry.register("fruit-0", registry.get_dict("fruit-0")))
+        print("저장 통계:", registry.storage_stats())
+
+        first, second = registry.load("fruit-0"), registry.load("fruit-1")
+        print("ChatOpenAI 인스턴스 공유:", first.steps[1] is second.steps[1], "/ 생성한 구성 요소 수:", registry.instances_built)
+        registry.close()
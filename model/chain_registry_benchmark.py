@@ -0,0 +1,108 @@
+# =====================================================
+# 체인 레지스트리 벤치마크: 체인별 파일 저장 vs 콘텐츠 주소 레지스트리
+# =====================================================
+# - 서로 비슷한 체인 --chains 개를 만듭니다.
+#   · 프롬프트는 --prompts 종류, ChatOpenAI 설정은 --llm-configs 종류, 파서는 모두 같음
+#   · 즉 체인마다 다르지만 구성 요소는 대부분 공유하는 "변형" 체인들입니다.
+# - 비교 대상
+#   · json      : serialization.py 처럼 체인마다 dumpd → indent=2 JSON 파일, load() 로 복원
+#   · binary    : chain_format 바이너리 파일, load() 로 복원
+#   · registry  : ChainRegistry (구성 요소 중복 제거 저장 + 인스턴스 캐시)
+# - 저장 크기와 "전체 체인 복원" 시간을 봅니다. 레지스트리는 매번 새로 열어 인스턴스 캐시가 빈 상태에서 잽니다.
+# - "생성 객체 수" 는 체인 하나당 RunnableSequence + 프롬프트 + LLM + 파서 4개 기준입니다.
+#
+# 실행 예)
+#   python model/chain_registry_benchmark.py --chains 1000
+import argparse
+import json
+import os
+import tempfile
+import time
+import warnings
+
+from langchain_core.load import dumpd, load
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import PromptTemplate
+from langchain_openai import ChatOpenAI
+
+from chain_format import read_chain_dict, save_chain
+from chain_registry import ChainRegistry
+
+warnings.simplefilter("ignore")
+
+FAKE_KEY = "sk-placeholder"
+LOAD_KWARGS = {"secrets_map": {"OPENAI_API_KEY": FAKE_KEY}, "allowed_objects": "all"}
+
+
+def make_chains(n: int, prompts: int, llm_configs: int) -> dict[str, dict]:
+    llms = [ChatOpenAI(model="gpt-4.1-mini", temperature=i / 10, max_tokens=256, api_key=FAKE_KEY)
+            for i in range(llm_configs)]
+    parser = StrOutputParser()
+    chains = {}
+    for i in range(n):
+        prompt = PromptTemplate(template=f"[주제 {i % prompts}] {{fruit}}의 색상이 무엇입니까?", input_variables=["fruit"])
+        chains[f"chain-{i}"] = dumpd(prompt | llms[(i // prompts) % llm_configs] | parser)
+    return chains
+
+
+def dir_size(directory: str) -> int:
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="체인 레지스트리 저장 크기·복원 시간 비교")
+    parser.add_argument("--chains", type=int, default=1000)
+    parser.add_argument("--prompts", type=int, default=250, help="서로 다른 프롬프트 수")
+    parser.add_argument("--llm-configs", type=int, default=4, help="서로 다른 ChatOpenAI 설정 수")
+    args = parser.parse_args()
+
+    chains = make_chains(args.chains, args.prompts, args.llm_configs)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        # ---- json ----
+        json_dir = os.path.join(tmp, "json")
+        os.makedirs(json_dir)
+        for name, d in chains.items():
+            with open(os.path.join(json_dir, f"{name}.json"), "w", encoding="utf-8") as f:
+                json.dump(d, f, ensure_ascii=False, indent=2)
+        start = time.perf_counter()
+        for name in chains:
+            with open(os.path.join(json_dir, f"{name}.json"), encoding="utf-8") as f:
+                load(json.load(f), **LOAD_KWARGS)
+        results["json"] = (dir_size(json_dir), time.perf_counter() - start, 4 * len(chains))
+
+        # ---- binary ----
+        bin_dir = os.path.join(tmp, "binary")
+        for name, d in chains.items():
+            save_chain(d, os.path.join(bin_dir, f"{name}.lccb"))
+        start = time.perf_counter()
+        for name in chains:
+            load(read_chain_dict(os.path.join(bin_dir, f"{name}.lccb")), **LOAD_KWARGS)
+        results["binary"] = (dir_size(bin_dir), time.perf_counter() - start, 4 * len(chains))
+
+        # ---- registry ----
+        db_path = os.path.join(tmp, "registry.db")
+        registry = ChainRegistry(db_path)
+        for name, d in chains.items():
+            registry.register(name, d)
+        stats = registry.storage_stats()
+        registry.close()
+
+        registry = ChainRegistry(db_path, **LOAD_KWARGS)
+        start = time.perf_counter()
+        for name in chains:
+            registry.load(name)
+        results["registry"] = (os.path.getsize(db_path), time.perf_counter() - start, registry.instances_built)
+        registry.close()
+
+    print(f"체인 {args.chains}개 (프롬프트 {args.prompts}종 × LLM 설정 {args.llm_configs}종, 파서 1종)")
+    print(f"레지스트리 구성 요소 {stats['components']}개, 본문 {stats['component_bytes'] / 1024:.1f} KB")
+    print(f"{'storage':<9} {'size(KB)':>9} {'전체 복원(ms)':>13} {'생성 객체 수':>11} {'size 비율':>9} {'복원 배율':>9}")
+    base_size, base_time, _ = results["json"]
+    for name, (size, seconds, built) in results.items():
+        print(f"{name:<9} {size / 1024:>9.1f} {seconds * 1000:>13.1f} {built:>11} "
+              f"{size / base_size:>9.2f} {base_time / seconds:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
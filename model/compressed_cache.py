@@ -0,0 +1,349 @@
+# =====================================================
+# 값 압축 SQLite LLM 캐시 (zstd / zlib + 공유 사전)
+# =====================================================
+# - SQLiteCache 는 Generation 을 dumps 한 JSON 문자열을 그대로 저장합니다.
+#   {"lc": 1, "type": "constructor", "id": [...], "kwargs": {...}} 같은 구조가
+#   항목마다 반복되어 DB 가 수 GB 까지 커집니다.
+# - CompressedSQLiteCache 는 WALSQLiteCache 의 값 인코딩만 바꿔 투명하게 압축합니다.
+#   · zstandard 패키지가 설치되어 있으면 zstd, 없으면 표준 라이브러리 zlib 사용
+#   · train_dictionary() 로 캐시에 쌓인 응답들로 "공유 사전"을 만들면
+#     짧은 응답에서도 반복 구조를 사전이 대신 기억해 압축률이 크게 올라갑니다.
+#   · 사전은 같은 DB 의 cache_dicts 테이블에 저장되고, 각 값은 자기가 쓴 사전 id 를 기록합니다.
+# - 기존 DB 는 migrate() 로 변환합니다.
+#   · WALSQLiteCache DB(llm_cache 테이블): 값만 압축해서 다시 기록
+#   · langchain SQLiteCache DB(full_llm_cache 테이블): 새 스키마로 옮겨 담음
+#
+# 값 포맷: [codec 1바이트][사전 id 4바이트, 사전 사용 시][압축된 본문]
+#   - 압축하지 않은 기존 값은 JSON 이라 '[' 로 시작하므로 그대로 읽을 수 있습니다.
+import itertools
+import sqlite3
+import struct
+import threading
+import zlib
+from typing import Any
+
+from langchain_core.caches import RETURN_VAL_TYPE
+
+from sqlite_wal_cache import WALSQLiteCache, dump_generations, load_generations, make_key
+
+try:
+    import zstandard
+except ImportError:  # 선택 의존성: pip install zstandard
+    zstandard = None
+
+CODEC_ZLIB = 1
+CODEC_ZLIB_DICT = 2
+CODEC_ZSTD = 3
+CODEC_ZSTD_DICT = 4
+
+DICT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_dicts (
+    id    INTEGER PRIMARY KEY,
+    codec TEXT NOT NULL,
+    data  BLOB NOT NULL
+)
+"""
+
+
+# =====================================================
+# 1) 압축기
+# =====================================================
+class ValueCodec:
+    """
+    캐시 값 압축/해제기
+
+    - codec: "zstd" 또는 "zlib" ("auto" 면 zstandard 설치 여부로 결정)
+    - level: 압축 레벨 (zstd 기본 3, zlib 기본 6)
+    - 사전은 id → bytes 로 보관하며, 모르는 id 는 loader 콜백으로 DB 에서 읽어옵니다.
+    """
+
+    def __init__(self, codec: str = "auto", *, level: int | None = None, loader=None) -> None:
+        if codec == "auto":
+            codec = "zstd" if zstandard is not None else "zlib"
+        if codec == "zstd" and zstandard is None:
+            raise ImportError("zstd 압축에는 zstandard 패키지가 필요합니다. (pip install zstandard)")
+        if codec not in ("zstd", "zlib"):
+            raise ValueError(f"지원하지 않는 codec 입니다: {codec}")
+
+        self.codec = codec
+        self.level = level if level is not None else (3 if codec == "zstd" else 6)
+        self._loader = loader
+        self._dicts: dict[int, bytes] = {}
+        self._active_dict: int | None = None
+        # zstd 압축기/해제기는 사전마다 만들어 두고 재사용 (스레드마다 따로)
+        self._local = threading.local()
+
+    # -------------------------------------------------
+    # 1-1) 사전 관리
+    # -------------------------------------------------
+    def add_dictionary(self, dict_id: int, data: bytes, *, activate: bool = True) -> None:
+        self._dicts[dict_id] = data
+        if activate:
+            self._active_dict = dict_id
+
+    def _dictionary(self, dict_id: int) -> bytes:
+        data = self._dicts.get(dict_id)
+        if data is None and self._loader is not None:
+            data = self._loader(dict_id)
+            if data is not None:
+                self._dicts[dict_id] = data
+        if data is None:
+            raise KeyError(f"압축 사전 {dict_id} 를 찾을 수 없습니다.")
+        return data
+
+    def _zstd(self, kind: str, dict_id: int | None):
+        cache = self._local.__dict__.setdefault("zstd", {})
+        key = (kind, dict_id)
+        obj = cache.get(key)
+        if obj is None:
+            dict_data = zstandard.ZstdCompressionDict(self._dictionary(dict_id)) if dict_id is not None else None
+            if kind == "c":
+                obj = zstandard.ZstdCompressor(level=self.level, dict_data=dict_data)
+            else:
+                obj = zstandard.ZstdDecompressor(dict_data=dict_data)
+            cache[key] = obj
+        return obj
+
+    # -------------------------------------------------
+    # 1-2) 압축 / 해제
+    # -------------------------------------------------
+    def compress(self, raw: bytes) -> bytes:
+        dict_id = self._active_dict
+        if self.codec == "zstd":
+            body = self._zstd("c", dict_id).compress(raw)
+            codec = CODEC_ZSTD if dict_id is None else CODEC_ZSTD_DICT
+        else:
+            if dict_id is None:
+                body = zlib.compress(raw, self.level)
+            else:
+                compressor = zlib.compressobj(self.level, zdict=self._dictionary(dict_id))
+                body = compressor.compress(raw) + compressor.flush()
+            codec = CODEC_ZLIB if dict_id is None else CODEC_ZLIB_DICT
+        header = bytes([codec]) if dict_id is None else bytes([codec]) + struct.pack(">I", dict_id)
+        return header + body
+
+    def decompress(self, data: bytes) -> bytes:
+        codec = data[0]
+        if codec == CODEC_ZLIB:
+            return zlib.decompress(data[1:])
+        if codec == CODEC_ZSTD:
+            return self._zstd("d", None).decompress(data[1:])
+        if codec in (CODEC_ZLIB_DICT, CODEC_ZSTD_DICT):
+            (dict_id,) = struct.unpack(">I", data[1:5])
+            if codec == CODEC_ZSTD_DICT:
+                return self._zstd("d", dict_id).decompress(data[5:])
+            decompressor = zlib.decompressobj(zdict=self._dictionary(dict_id))
+            return decompressor.decompress(data[5:]) + decompressor.flush()
+        # 압축되지 않은 기존 값 (JSON 텍스트)
+        return data
+
+
+def build_dictionary(codec: str, samples: list[bytes], dict_size: int) -> bytes:
+    """
+    샘플 값들로 공유 사전을 만듭니다.
+    - zstd: zstandard.train_dictionary 로 학습
+    - zlib: zlib 은 학습 기능이 없으므로, 자주 나오는 구조가 뒤쪽에 오도록
+      샘플을 이어 붙여 dict_size(최대 32KB) 만큼 잘라 사용합니다.
+    """
+    if not samples:
+        raise ValueError("사전을 만들 샘플이 없습니다.")
+    if codec == "zstd":
+        try:
+            return zstandard.train_dictionary(dict_size, samples).as_bytes()
+        except zstandard.ZstdError as exc:
+            raise ValueError(f"zstd 사전 학습 실패 (샘플 {len(samples)}개): {exc}") from exc
+    dict_size = min(dict_size, 32 * 1024)   # zlib 윈도우 크기 제한
+    return b"".join(samples)[-dict_size:]
+
+
+# =====================================================
+# 2) CompressedSQLiteCache 정의
+# =====================================================
+class CompressedSQLiteCache(WALSQLiteCache):
+    """
+    값을 압축해서 저장하는 WALSQLiteCache
+
+    - codec: "auto" / "zstd" / "zlib"
+    - level: 압축 레벨
+    - 나머지 인자는 WALSQLiteCache 와 같습니다.
+    - DB 에 사전이 있으면 가장 최근 사전을 자동으로 사용합니다.
+    """
+
+    def __init__(
+        self,
+        database_path: str = "cache/llm_cache_zstd.db",
+        *,
+        codec: str = "auto",
+        level: int | None = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(database_path, **kwargs)
+        self.codec = ValueCodec(codec, level=level, loader=self._load_dictionary)
+        with self._pool.connection() as conn:
+            conn.execute(DICT_SCHEMA)
+            row = conn.execute(
+                "SELECT id, data FROM cache_dicts WHERE codec = ? ORDER BY id DESC LIMIT 1",
+                (self.codec.codec,),
+            ).fetchone()
+        if row is not None:
+            self.codec.add_dictionary(row[0], row[1])
+
+    def _load_dictionary(self, dict_id: int) -> bytes | None:
+        with self._pool.connection() as conn:
+            row = conn.execute("SELECT data FROM cache_dicts WHERE id = ?", (dict_id,)).fetchone()
+        return row[0] if row else None
+
+    def _encode(self, return_val: RETURN_VAL_TYPE) -> bytes:
+        return self.codec.compress(dump_generations(return_val))
+
+    def _decode(self, data: bytes) -> RETURN_VAL_TYPE:
+        return load_generations(self.codec.decompress(data))
+
+    # -------------------------------------------------
+    # 2-1) 공유 사전 학습
+    # -------------------------------------------------
+    def train_dictionary(self, *, samples: int = 2000, dict_size: int = 64 * 1024) -> int:
+        """
+        캐시에 저장된 값 중 최근 samples 개로 사전을 만들고 이후 쓰기부터 사용합니다.
+        기존 값은 예전 사전(또는 사전 없음)으로 그대로 읽히며, 새 사전 id 를 반환합니다.
+        """
+        self.flush()
+        with self._pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT value FROM llm_cache ORDER BY created_at DESC LIMIT ?", (samples,)
+            ).fetchall()
+        raw_samples = [self.codec.decompress(row[0]) for row in rows]
+        data = build_dictionary(self.codec.codec, raw_samples, dict_size)
+        with self._pool.connection() as conn:
+            cursor = conn.execute(
+                "INSERT INTO cache_dicts (codec, data) VALUES (?, ?)", (self.codec.codec, data)
+            )
+            dict_id = cursor.lastrowid
+        self.codec.add_dictionary(dict_id, data)
+        return dict_id
+
+
+# =====================================================
+# 3) 기존 DB 마이그레이션
+# =====================================================
+def _read_sqlitecache_rows(source: sqlite3.Connection):
+    """langchain SQLiteCache(full_llm_cache) 행을 (key, 압축 전 bytes, created_at) 로 읽습니다."""
+    # 응답 하나가 여러 행(idx)으로 나뉘어 있으므로 (prompt, llm) 별로 모아 리스트 JSON 으로 만듭니다.
+    cursor = source.execute("SELECT prompt, llm, response FROM full_llm_cache ORDER BY prompt, llm, idx")
+    current, parts = None, []
+    for prompt, llm, response in cursor:
+        if current is not None and current != (prompt, llm):
+            yield make_key(*current), ("[" + ",".join(parts) + "]").encode("utf-8"), 0.0
+            parts = []
+        current = (prompt, llm)
+        parts.append(response)
+    if current is not None:
+        yield make_key(*current), ("[" + ",".join(parts) + "]").encode("utf-8"), 0.0
+
+
+def _read_llm_cache_rows(source: sqlite3.Connection, reader: ValueCodec, batch_size: int):
+    """WALSQLiteCache(llm_cache) 행을 키 순서로 batch_size 개씩 끊어 읽습니다."""
+    # 커서를 열어 둔 채 같은 테이블을 고쳐 쓰지 않도록, 마지막 키 이후를 매번 새로 조회합니다.
+    last_key = b""
+    while True:
+        rows = source.execute(
+            "SELECT key, value, created_at FROM llm_cache WHERE key > ? ORDER BY key LIMIT ?",
+            (last_key, batch_size),
+        ).fetchall()
+        if not rows:
+            return
+        for key, value, created_at in rows:
+            yield key, reader.decompress(value), created_at
+        last_key = rows[-1][0]
+
+
+def migrate(
+    source_path: str,
+    target_path: str | None = None,
+    *,
+    codec: str = "auto",
+    train_dict: bool = True,
+    dict_samples: int = 2000,
+    batch_size: int = 1000,
+) -> dict[str, int]:
+    """
+    기존 캐시 DB 를 압축 포맷으로 변환합니다.
+
+    - source_path 가 langchain SQLiteCache DB(full_llm_cache) 면 target_path 에 새로 만들고,
+      WALSQLiteCache DB(llm_cache) 면 target_path 를 생략해 제자리에서 재압축할 수 있습니다.
+    - train_dict=True 면 원본 값 dict_samples 개로 사전을 먼저 학습한 뒤 압축합니다.
+    - batch_size 행씩 읽고 써서 DB 가 커도 메모리 사용량이 일정합니다.
+    - 끝나면 VACUUM 으로 파일 크기를 실제로 줄이고, 옮긴 행 수를 반환합니다.
+    """
+    target_path = target_path or source_path
+    source = sqlite3.connect(source_path)
+    tables = {row[0] for row in source.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+    if "full_llm_cache" in tables:
+        if target_path == source_path:
+            raise ValueError("SQLiteCache DB 는 target_path 를 따로 지정해야 합니다.")
+        read_rows = lambda: _read_sqlitecache_rows(source)
+    elif "llm_cache" in tables:
+        reader = ValueCodec(codec)
+        if "cache_dicts" in tables:
+            for dict_id, data in source.execute("SELECT id, data FROM cache_dicts"):
+                reader.add_dictionary(dict_id, data, activate=False)
+        read_rows = lambda: _read_llm_cache_rows(source, reader, batch_size)
+    else:
+        source.close()
+        raise ValueError(f"캐시 테이블을 찾을 수 없습니다: {source_path}")
+
+    cache = CompressedSQLiteCache(target_path, codec=codec)
+    if train_dict:
+        samples = [raw for _, raw, _ in itertools.islice(read_rows(), dict_samples)]
+        try:
+            data = build_dictionary(cache.codec.codec, samples, 64 * 1024)
+        except ValueError:
+            data = None   # 샘플이 너무 적으면 사전 없이 압축합니다.
+        if data:
+            with cache._pool.connection() as conn:
+                dict_id = conn.execute(
+                    "INSERT INTO cache_dicts (codec, data) VALUES (?, ?)", (cache.codec.codec, data)
+                ).lastrowid
+            cache.codec.add_dictionary(dict_id, data)
+
+    count = 0
+    rows = read_rows()
+    with cache._pool.connection() as conn:
+        while True:
+            batch = [
+                (key, cache.codec.compress(raw), created_at)
+                for key, raw, created_at in itertools.islice(rows, batch_size)
+            ]
+            if not batch:
+                break
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at) VALUES (?, ?, ?)",
+                batch,
+            )
+            conn.execute("COMMIT")
+            count += len(batch)
+        source.close()
+        conn.execute("VACUUM")
+    cache.close()
+    return {"rows": count}
+
+
+# =====================================================
+# 4) 실행 예제: python model/compressed_cache.py <기존 DB> [<새 DB>]
+# =====================================================
+if __name__ == "__main__":
+    import os
+    import sys
+
+    if len(sys.argv) < 2:
+        print("사용법: python model/compressed_cache.py cache/llm_cache.db cache/llm_cache_zstd.db")
+        sys.exit(1)
+
+    src = sys.argv[1]
+    dst = sys.argv[2] if len(sys.argv) > 2 else None
+    before = os.path.getsize(src)
+    result = migrate(src, dst)
+    after = os.path.getsize(dst or src)
+    print(f"{result['rows']}건 변환: {before:,} bytes → {after:,} bytes ({after / before:.1%})")
@@ -0,0 +1,136 @@
+# =====================================================
+# 캐시 값 압축 벤치마크 (DB 크기 / 읽기 / 쓰기 지연시간)
+# =====================================================
+# - ChatOpenAI 응답과 비슷한 모양의 ChatGeneration 을 만들어 아래 구성에 같은 양을 저장합니다.
+#   · raw        : WALSQLiteCache (압축 없음)
+#   · zlib       : CompressedSQLiteCache(codec="zlib")
+#   · zlib+dict  : zlib + 공유 사전
+#   · zstd       : CompressedSQLiteCache(codec="zstd")   (zstandard 설치 시)
+#   · zstd+dict  : zstd + 공유 사전                       (zstandard 설치 시)
+# - 사전 구성은 앞쪽 절반으로 사전을 학습한 뒤, 나머지 절반을 새로 써서 측정합니다.
+#
+# 실행 예)
+#   python model/compression_benchmark.py --entries 5000
+import argparse
+import os
+import random
+import tempfile
+import time
+import warnings
+
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+
+from compressed_cache import CompressedSQLiteCache, zstandard
+from sqlite_wal_cache import WALSQLiteCache
+
+warnings.simplefilter("ignore")
+
+LLM_STRING = "gpt-4.1-mini"
+COUNTRIES = ["한국", "일본", "미국", "프랑스", "독일", "브라질", "인도", "캐나다", "호주", "이집트"]
+SENTENCES = [
+    "{c}은(는) 오랜 역사와 독자적인 문화를 가진 나라입니다.",
+    "{c}의 경제는 제조업과 서비스업이 중심이며 수출 비중이 높습니다.",
+    "{c}은(는) 다양한 자연환경과 관광 명소로 많은 사람이 찾습니다.",
+    "최근 {c}은(는) 기술 산업과 문화 콘텐츠 분야에서 주목받고 있습니다.",
+    "{c}의 수도는 정치·경제의 중심지 역할을 하고 있습니다.",
+]
+
+
+# =====================================================
+# 1) 가짜 응답 생성
+# =====================================================
+def make_generation(i: int, rng: random.Random) -> list[ChatGeneration]:
+    country = COUNTRIES[i % len(COUNTRIES)]
+    text = " ".join(rng.choice(SENTENCES).format(c=country) for _ in range(4))
+    message = AIMessage(
+        content=text,
+        response_metadata={
+            "token_usage": {"completion_tokens": 180, "prompt_tokens": 25, "total_tokens": 205},
+            "model_name": "gpt-4.1-mini-2025-04-14",
+            "finish_reason": "stop",
+        },
+        id=f"run-{i:08d}",
+    )
+    return [ChatGeneration(message=message)]
+
+
+def db_size(path: str) -> int:
+    # WAL 파일이 남아 있으면 합쳐서 계산합니다.
+    return sum(os.path.getsize(p) for p in (path, path + "-wal") if os.path.exists(p))
+
+
+# =====================================================
+# 2) 구성 하나 측정
+# =====================================================
+def bench(name: str, path: str, values: list, *, codec: str | None, use_dict: bool) -> dict:
+    cache = WALSQLiteCache(path) if codec is None else CompressedSQLiteCache(path, codec=codec)
+    half = len(values) // 2
+    measured = values
+    if use_dict:
+        # 앞쪽 절반으로 사전을 학습하고, 뒤쪽 절반만 측정 대상에 씁니다.
+        for i, value in enumerate(values[:half]):
+            cache.update(f"warm-{i}", LLM_STRING, value)
+        cache.flush()
+        cache.train_dictionary()
+        cache.clear()
+        measured = values[half:]
+
+    start = time.perf_counter()
+    for i, value in enumerate(measured):
+        cache.update(f"q-{i}", LLM_STRING, value)
+    cache.flush()
+    write_us = (time.perf_counter() - start) / len(measured) * 1e6
+
+    start = time.perf_counter()
+    for i in range(len(measured)):
+        cache.lookup(f"q-{i}", LLM_STRING)
+    read_us = (time.perf_counter() - start) / len(measured) * 1e6
+
+    with cache._pool.connection() as conn:
+        value_bytes = conn.execute("SELECT SUM(LENGTH(value)) FROM llm_cache").fetchone()[0]
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("VACUUM")
+    cache.close()
+    return {
+        "name": name,
+        "entries": len(measured),
+        "bytes_per_value": value_bytes / len(measured),
+        "db_bytes": db_size(path),
+        "write_us": write_us,
+        "read_us": read_us,
+    }
+
+
+# =====================================================
+# 3) main
+# =====================================================
+def main():
+    parser = argparse.ArgumentParser(description="캐시 값 압축 벤치마크")
+    parser.add_argument("--entries", type=int, default=4000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    values = [make_generation(i, rng) for i in range(args.entries)]
+
+    configs = [("raw", None, False), ("zlib", "zlib", False), ("zlib+dict", "zlib", True)]
+    if zstandard is not None:
+        configs += [("zstd", "zstd", False), ("zstd+dict", "zstd", True)]
+    else:
+        print("(zstandard 미설치: zstd 구성은 건너뜁니다)")
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, codec, use_dict in configs:
+            results.append(bench(name, os.path.join(tmp, f"{name}.db"), values, codec=codec, use_dict=use_dict))
+
+    raw = results[0]["bytes_per_value"]
+    print(f"{'구성':<10} {'값 평균(B)':>10} {'비율':>7} {'DB(KB)':>9} {'쓰기(us)':>9} {'읽기(us)':>9}")
+    for r in results:
+        print(f"{r['name']:<10} {r['bytes_per_value']:>10.0f} {r['bytes_per_value'] / raw:>7.1%} "
+              f"{r['db_bytes'] / 1024:>9.0f} {r['write_us']:>9.1f} {r['read_us']:>9.1f}")
+    print("※ +dict 구성의 DB 크기는 측정 항목 수가 절반이므로 값 평균(B)으로 비교하세요.")
+
+
+if __name__ == "__main__":
+    main()
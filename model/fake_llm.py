@@ -0,0 +1,85 @@
+# =====================================================
+# 지연시간을 조절할 수 있는 결정적(deterministic) 가짜 Chat 모델
+# =====================================================
+# - 캐시·동시성 벤치마크를 API 키와 비용 없이, 매번 같은 결과로 돌리기 위한 모델입니다.
+# - 같은 입력에는 항상 같은 응답을 돌려주고, 호출마다 latency 초만큼 기다립니다.
+#   · invoke 는 time.sleep, ainvoke 는 asyncio.sleep 으로 기다리므로
+#     비동기 벤치마크에서 이벤트 루프를 막지 않습니다.
+# - ChatOpenAI 와 같은 BaseChatModel 이라 set_llm_cache 캐시도 그대로 동작합니다.
+# - dumpd/load 로 직렬화할 수 있습니다. 복원할 때는 이 모듈 이름을 허용 네임스페이스로,
+#   이 클래스를 허용 목록에 넘겨야 합니다.
+#   예) load(data, valid_namespaces=["fake_llm"], allowed_objects=[PromptTemplate, RunnableSequence, FakeLatencyChatModel])
+import asyncio
+import hashlib
+import time
+from typing import Any, AsyncIterator, Iterator
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+WORDS = ["대한민국은", "동아시아의", "반도", "국가로", "수도는", "서울이며", "경제와", "문화가",
+         "빠르게", "발전했습니다.", "역사가", "깊고", "기술", "산업이", "강합니다."]
+
+
+class FakeLatencyChatModel(BaseChatModel):
+    """
+    입력에 따라 정해진 응답을 latency 초 뒤에 돌려주는 가짜 Chat 모델
+
+    - latency: 호출 1회당 대기 시간(초)
+    - response_words: 응답 단어 수
+    - token_latency: 스트리밍 시 토큰(단어) 하나당 대기 시간(초)
+    - calls: 실제로 "생성"이 일어난 횟수 (캐시 적중은 세지 않음)
+    """
+
+    latency: float = 0.05
+    response_words: int = 40
+    token_latency: float = 0.0
+    calls: int = 0
+
+    @classmethod
+    def is_lc_serializable(cls) -> bool:
+        return True
+
+    @classmethod
+    def get_lc_namespace(cls) -> list[str]:
+        return ["fake_llm"]
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-latency-chat-model"
+
+    @property
+    def _identifying_params(self) -> dict[str, Any]:
+        return {"latency": self.latency, "response_words": self.response_words}
+
+    def _words(self, messages: list[BaseMessage]) -> list[str]:
+        # 마지막 메시지 내용의 해시로 단어를 골라 항상 같은 응답을 만듭니다.
+        seed = hashlib.sha256(str(messages[-1].content).encode("utf-8")).digest()
+        return [WORDS[seed[i % len(seed)] % len(WORDS)] for i in range(self.response_words)]
+
+    def _generate(self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        self.calls += 1
+        time.sleep(self.latency)
+        text = " ".join(self._words(messages))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    async def _agenerate(self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        text = " ".join(self._words(messages))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _stream(self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        self.calls += 1
+        time.sleep(self.latency)
+        for i, word in enumerate(self._words(messages)):
+            time.sleep(self.token_latency)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word if i == 0 else " " + word))
+
+    async def _astream(self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        for i, word in enumerate(self._words(messages)):
+            await asyncio.sleep(self.token_latency)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word if i == 0 else " " + word))
@@ -0,0 +1,377 @@
+# =====================================================
+# HuggingFaceEndpoint 동적 요청 배치(micro-batching)
+# =====================================================
+# - huggingface_endpoints.py 의 Phi-3 호출은 프롬프트 하나당 HTTP 요청 하나입니다.
+#   GPU 서버는 여러 프롬프트를 한 번의 forward 로 처리해도 시간이 거의 늘지 않으므로,
+#   동시에 들어온 요청을 모아 보내면 같은 GPU 로 처리량이 크게 늘어납니다.
+# - MicroBatcher / AsyncMicroBatcher
+#   · 첫 요청이 들어온 뒤 max_wait 초 동안(또는 max_batch_size 개가 찰 때까지) 요청을 모아
+#     batch_fn(항목 목록) 을 한 번 호출하고, 결과를 순서대로 각 호출자에게 돌려줍니다.
+#   · 같은 배치로 묶을 수 있는 요청끼리만 모으도록 key 를 받습니다.
+#     (텍스트 생성은 max_new_tokens·temperature 등 parameters 가 같아야 한 요청으로 보낼 수 있음)
+#   · batch_fn 이 실패하면 그 배치의 모든 호출자에게 같은 예외가 전달됩니다.
+# - BatchingTextGenerationClient / AsyncBatchingTextGenerationClient 는 hf_transport 의 클라이언트와
+#   같은 인터페이스(text_generation)라 HuggingFaceEndpoint 의 client / async_client 자리에 그대로 들어갑니다.
+#   배치는 {"inputs": [...], "parameters": {...}} 를 batch_url(기본값 url + "/generate_batch")로 보냅니다.
+#   · 이 배치 경로는 tgi_stub_server 같은 자체 서버용입니다. TGI / Inference Endpoints 에는 없으며,
+#     이들은 서버 안에서 동시 요청을 이어 붙여(continuous batching) 처리하므로 요청을 따로 보내도 됩니다.
+#   · 그래서 배치 경로가 404 / 405 를 돌려주면 경고를 한 번 남기고, 그 뒤로는 url 로 요청을 하나씩 보냅니다.
+#   · stream=True 는 배치하지 않고 url 로 바로 보냅니다. (hf_transport 의 공유 풀 클라이언트에 위임)
+#
+# 사용 예)
+#   transport = PooledHTTPTransport(pool_size=16)
+#   attach_batching(llm, transport, url="http://127.0.0.1:8080", max_wait=0.005)
+import asyncio
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Hashable
+
+import aiohttp
+import requests
+
+from hf_transport import (
+    AsyncPooledTextGenerationClient,
+    PooledHTTPTransport,
+    PooledTextGenerationClient,
+    build_payload,
+    parse_generated_text,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchStats:
+    batches: int = 0
+    items: int = 0
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.items / self.batches if self.batches else 0.0
+
+
+# =====================================================
+# 1) 동기 배처 (스레드)
+# =====================================================
+class MicroBatcher:
+    """
+    여러 스레드의 submit() 을 모아 batch_fn 을 한 번에 호출하는 배처
+
+    - batch_fn(key, items) → items 와 같은 길이의 결과 목록
+    - max_batch_size: 한 배치의 최대 항목 수
+    - max_wait: 첫 항목이 들어온 뒤 배치를 보내기까지 기다리는 최대 시간(초)
+    - max_inflight: 동시에 보내는 배치 수 (배치 호출은 이 크기의 스레드 풀에서 실행)
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[Hashable, list[Any]], list[Any]],
+        *,
+        max_batch_size: int = 16,
+        max_wait: float = 0.005,
+        max_inflight: int = 8,
+    ) -> None:
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size 는 0보다 커야 합니다.")
+        self._batch_fn = batch_fn
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait
+        self._executor = ThreadPoolExecutor(max_workers=max_inflight, thread_name_prefix="micro-batch")
+        # key → (첫 항목 도착 시각, [(item, Future), ...])
+        self._pending: dict[Hashable, tuple[float, list[tuple[Any, Future]]]] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        self.stats = BatchStats()
+        self._thread = threading.Thread(target=self._dispatch_loop, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, key: Hashable, item: Any) -> Future:
+        future: Future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("이미 닫힌 배처입니다.")
+            started, items = self._pending.setdefault(key, (time.monotonic(), []))
+            items.append((item, future))
+            # 첫 항목이거나 배치가 가득 찼을 때만 디스패처를 깨웁니다.
+            if len(items) == 1 or len(items) >= self._max_batch_size:
+                self._cond.notify()
+        return future
+
+    def call(self, key: Hashable, item: Any) -> Any:
+        return self.submit(key, item).result()
+
+    def _take_ready(self) -> tuple[list[tuple[Hashable, list]], float | None]:
+        # 보낼 배치를 꺼내고, 아직 기다려야 하는 배치가 있으면 가장 이른 마감까지 남은 시간을 돌려줍니다.
+        now = time.monotonic()
+        ready, next_deadline = [], None
+        for key in list(self._pending):
+            started, items = self._pending[key]
+            deadline = started + self._max_wait
+            if len(items) >= self._max_batch_size or deadline <= now or self._closed:
+                batch, rest = items[:self._max_batch_size], items[self._max_batch_size:]
+                ready.append((key, batch))
+                if rest:
+                    self._pending[key] = (now, rest)
+                else:
+                    del self._pending[key]
+            else:
+                next_deadline = deadline if next_deadline is None else min(next_deadline, deadline)
+        return ready, None if next_deadline is None else max(0.0, next_deadline - now)
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            with self._cond:
+                while True:
+                    ready, timeout = self._take_ready()
+                    if ready or (self._closed and not self._pending):
+                        break
+                    self._cond.wait(timeout)
+            for key, batch in ready:
+                self.stats.batches += 1
+                self.stats.items += len(batch)
+                self._executor.submit(self._run_batch, key, batch)
+            if self._closed and not self._pending:
+                return
+
+    def _run_batch(self, key: Hashable, batch: list[tuple[Any, Future]]) -> None:
+        # 호출자가 이미 취소한 항목은 빼고, 나머지는 실행 중으로 바꿔 이후의 cancel() 이 통하지 않게 합니다.
+        # (취소된 Future 에 set_result 를 하면 InvalidStateError 로 같은 배치의 다른 호출자가 영영 기다리게 됨)
+        batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            results = self._batch_fn(key, [item for item, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"배치 결과 수가 다릅니다: 요청 {len(batch)}개, 결과 {len(results)}개")
+        except BaseException as exc:
+            for _, future in batch:
+                future.set_exception(exc)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def close(self) -> None:
+        """남은 요청을 모두 보낸 뒤 종료합니다."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+
+
+# =====================================================
+# 2) 비동기 배처 (asyncio)
+# =====================================================
+class AsyncMicroBatcher:
+    """
+    같은 이벤트 루프의 코루틴 호출을 모아 batch_fn 을 한 번에 await 하는 배처
+
+    - batch_fn(key, items) → items 와 같은 길이의 결과 목록을 돌려주는 코루틴 함수
+    - max_batch_size / max_wait: MicroBatcher 와 같음
+    - 루프마다 대기열을 따로 둡니다.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[Hashable, list[Any]], Awaitable[list[Any]]],
+        *,
+        max_batch_size: int = 16,
+        max_wait: float = 0.005,
+    ) -> None:
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size 는 0보다 커야 합니다.")
+        self._batch_fn = batch_fn
+        self._max_batch_size = max_batch_size
+        self._max_wait = max_wait
+        # (loop, key) → ([(item, asyncio.Future), ...], 마감 타이머)
+        self._pending: dict[tuple[Any, Hashable], tuple[list, asyncio.TimerHandle | None]] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self.stats = BatchStats()
+
+    async def call(self, key: Hashable, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        slot = (loop, key)
+        future = loop.create_future()
+        items, timer = self._pending.get(slot, ([], None))
+        items.append((item, future))
+        if timer is None:
+            timer = loop.call_later(self._max_wait, self._flush, slot)
+        self._pending[slot] = (items, timer)
+        if len(items) >= self._max_batch_size:
+            self._flush(slot)
+        return await future
+
+    def _flush(self, slot: tuple[Any, Hashable]) -> None:
+        entry = self._pending.pop(slot, None)
+        if entry is None:
+            return
+        items, timer = entry
+        if timer is not None:
+            timer.cancel()
+        self.stats.batches += 1
+        self.stats.items += len(items)
+        task = slot[0].create_task(self._run_batch(slot[1], items))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, key: Hashable, batch: list[tuple[Any, asyncio.Future]]) -> None:
+        try:
+            results = await self._batch_fn(key, [item for item, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"배치 결과 수가 다릅니다: 요청 {len(batch)}개, 결과 {len(results)}개")
+        except BaseException as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), result in zip(batch, results):
+            # 호출자가 취소된 경우는 결과를 버립니다.
+            if not future.done():
+                future.set_result(result)
+
+
+# =====================================================
+# 3) 배치 텍스트 생성 클라이언트
+# =====================================================
+def _batch_key(parameters: dict[str, Any]) -> str:
+    # parameters 가 같은 요청끼리만 한 배치로 묶습니다.
+    return json.dumps(parameters, sort_keys=True)
+
+
+def _batch_payload(key: str, prompts: list[str]) -> dict:
+    return {"inputs": prompts, "parameters": json.loads(key)}
+
+
+def _batch_route_missing(exc: BaseException) -> bool:
+    # 배치 경로가 없는 서버(TGI 등)는 404 또는 405 를 돌려줍니다.
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        return exc.response.status_code in (404, 405)
+    if isinstance(exc, aiohttp.ClientResponseError):
+        return exc.status in (404, 405)
+    return False
+
+
+class BatchingTextGenerationClient:
+    """
+    HuggingFaceEndpoint.client 자리에 넣는 동기 배치 클라이언트
+
+    - transport: 공유 PooledHTTPTransport
+    - url: 요청 하나를 보내는 텍스트 생성 엔드포인트 URL (스트리밍 · 배치 경로가 없을 때 사용)
+    - batch_url: 배치 생성 엔드포인트 URL (기본값 url + "/generate_batch")
+    - max_batch_size / max_wait / max_inflight: MicroBatcher 설정
+    - batch_supported: 서버가 배치 경로를 거절하면 False 가 되고 이후 요청은 배치하지 않습니다.
+    """
+
+    def __init__(self, transport: PooledHTTPTransport, url: str, *, batch_url: str | None = None,
+                 max_batch_size: int = 16, max_wait: float = 0.005, max_inflight: int = 8) -> None:
+        self.transport = transport
+        self.batch_url = batch_url or url.rstrip("/") + "/generate_batch"
+        self.single = PooledTextGenerationClient(transport, url)
+        self.batch_supported = True
+        self.batcher = MicroBatcher(self._send, max_batch_size=max_batch_size, max_wait=max_wait,
+                                    max_inflight=max_inflight)
+
+    def _send(self, key: str, prompts: list[str]) -> list[str]:
+        if self.batch_supported:
+            try:
+                body = self.transport.post_json(self.batch_url, _batch_payload(key, prompts))
+                return [parse_generated_text(item) for item in body]
+            except requests.HTTPError as exc:
+                if not _batch_route_missing(exc):
+                    raise
+                self.batch_supported = False
+                logger.warning("배치 경로가 없습니다(%s). 요청을 하나씩 보냅니다: %s", exc.response.status_code, self.batch_url)
+        # 이미 모인 배치는 이 스레드에서 하나씩 보냅니다.
+        return [self.single.text_generation(prompt, **json.loads(key)) for prompt in prompts]
+
+    def text_generation(self, prompt: str, *, stream: bool = False, details: bool = False,
+                        model: str | None = None, **parameters: Any) -> Any:
+        if stream or not self.batch_supported:
+            return self.single.text_generation(prompt, stream=stream, **parameters)
+        payload = build_payload(prompt, parameters)
+        return self.batcher.call(_batch_key(payload["parameters"]), prompt)
+
+    def close(self) -> None:
+        self.batcher.close()
+
+
+class AsyncBatchingTextGenerationClient:
+    """HuggingFaceEndpoint.async_client 자리에 넣는 비동기 배치 클라이언트 (인자는 동기 클라이언트와 같음)"""
+
+    def __init__(self, transport: PooledHTTPTransport, url: str, *, batch_url: str | None = None,
+                 max_batch_size: int = 16, max_wait: float = 0.005) -> None:
+        self.transport = transport
+        self.batch_url = batch_url or url.rstrip("/") + "/generate_batch"
+        self.single = AsyncPooledTextGenerationClient(transport, url)
+        self.batch_supported = True
+        self.batcher = AsyncMicroBatcher(self._send, max_batch_size=max_batch_size, max_wait=max_wait)
+
+    async def _send(self, key: str, prompts: list[str]) -> list[str]:
+        if self.batch_supported:
+            try:
+                body = await self.transport.apost_json(self.batch_url, _batch_payload(key, prompts))
+                return [parse_generated_text(item) for item in body]
+            except aiohttp.ClientResponseError as exc:
+                if not _batch_route_missing(exc):
+                    raise
+                self.batch_supported = False
+                logger.warning("배치 경로가 없습니다(%s). 요청을 하나씩 보냅니다: %s", exc.status, self.batch_url)
+        parameters = json.loads(key)
+        return list(await asyncio.gather(*(self.single.text_generation(prompt, **parameters) for prompt in prompts)))
+
+    async def text_generation(self, prompt: str, *, stream: bool = False, details: bool = False,
+                              model: str | None = None, **parameters: Any) -> Any:
+        if stream or not self.batch_supported:
+            return await self.single.text_generation(prompt, stream=stream, **parameters)
+        payload = build_payload(prompt, parameters)
+        return await self.batcher.call(_batch_key(payload["parameters"]), prompt)
+
+
+def attach_batching(llm: Any, transport: PooledHTTPTransport, *, url: str | None = None,
+                    batch_url: str | None = None, **batch_kwargs: Any) -> Any:
+    """
+    HuggingFaceEndpoint 의 client / async_client 를 배치 클라이언트로 바꿉니다.
+    - url 을 생략하면 llm.endpoint_url 을 씁니다. batch_url 을 생략하면 url + "/generate_batch"
+    """
+    url = url or getattr(llm, "endpoint_url", None)
+    if not url:
+        raise ValueError("엔드포인트 URL 을 알 수 없습니다. url= 로 직접 넘겨주세요.")
+    inflight = batch_kwargs.pop("max_inflight", 8)
+    llm.client = BatchingTextGenerationClient(transport, url, batch_url=batch_url, max_inflight=inflight,
+                                              **batch_kwargs)
+    llm.async_client = AsyncBatchingTextGenerationClient(transport, url, batch_url=batch_url, **batch_kwargs)
+    return llm
+
+
+# =====================================================
+# 4) 실행 예제 (로컬 스텁 서버 사용)
+# =====================================================
+if __name__ == "__main__":
+    from tgi_stub_server import StubConfig, start_in_thread
+
+    # 취소된 호출이 섞여도 같은 배치의 다른 호출자는 결과를 받아야 합니다.
+    batcher = MicroBatcher(lambda key, items: [item.upper() for item in items], max_wait=0.05)
+    cancelled, other = batcher.submit("k", "a"), batcher.submit("k", "b")
+    cancelled.cancel()
+    assert other.result(timeout=2) == "B"
+    batcher.close()
+
+    server, base_url, stop = start_in_thread(StubConfig(latency=0.02))
+    transport = PooledHTTPTransport(pool_size=8)
+
+    async def demo() -> None:
+        client = AsyncBatchingTextGenerationClient(transport, base_url, max_wait=0.005)
+        answers = await asyncio.gather(*(
+            client.text_generation(f"question {i}", max_new_tokens=4) for i in range(20)
+        ))
+        print(answers[:3], "...")
+        print("배치 통계:", client.batcher.stats, f"평균 배치 크기 {client.batcher.stats.mean_batch_size:.1f}")
+        await transport.aclose()
+
+    asyncio.run(demo())
+    print("서버 통계:", server.stats)
+    stop()
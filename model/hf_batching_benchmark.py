@@ -0,0 +1,83 @@
+# =====================================================
+# 동적 요청 배치 벤치마크: 배치 창(max_wait) 별 처리량·지연시간
+# =====================================================
+# - tgi_stub_server 를 "동시에 --gpu-slots 개 요청만 처리하는 GPU 서버"로 띄웁니다.
+#   · 요청(또는 배치) 하나당 --latency 초, 배치 항목 하나당 --item-latency 초가 더해집니다.
+# - --concurrency 개의 호출자가 계속 text_generation 을 부르는 상황에서 (호출자 수별로 따로 측정)
+#   · window=0      : 배치 없이 요청마다 보냄 (hf_transport 의 공유 풀 클라이언트)
+#   · window=N ms   : AsyncBatchingTextGenerationClient(max_wait=N ms, max_batch_size=--max-batch)
+#   처리량(rps), p50/p99 지연시간, 평균 배치 크기, 서버가 받은 HTTP 요청 수를 비교합니다.
+# - 호출자가 많으면 창이 짧아도 배치가 금방 차고, 호출자가 적으면 창이 길수록 배치는 커지지만
+#   첫 요청이 창만큼 더 기다리므로 지연시간이 늘어납니다.
+#
+# 실행 예)
+#   python model/hf_batching_benchmark.py --windows 0 1 2 5 10 20 --concurrency 64
+import argparse
+import asyncio
+import time
+
+from bench_utils import summarize_latencies
+from hf_batching import AsyncBatchingTextGenerationClient
+from hf_transport import AsyncPooledTextGenerationClient, PooledHTTPTransport
+from tgi_stub_server import StubConfig, start_in_thread
+
+
+async def run(base_url: str, window_ms: float, concurrency: int, args) -> tuple[list[float], float, float]:
+    transport = PooledHTTPTransport(pool_size=concurrency)
+    if window_ms <= 0:
+        client = AsyncPooledTextGenerationClient(transport, base_url)
+    else:
+        client = AsyncBatchingTextGenerationClient(
+            transport, base_url, max_batch_size=args.max_batch, max_wait=window_ms / 1000
+        )
+
+    counter = iter(range(args.requests))
+    latencies: list[float] = []
+
+    async def worker() -> None:
+        for i in counter:
+            start = time.perf_counter()
+            await client.text_generation(f"question {i}", max_new_tokens=args.max_new_tokens)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+    await transport.aclose()
+    batch_size = client.batcher.stats.mean_batch_size if window_ms > 0 else 1.0
+    return latencies, wall, batch_size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HuggingFaceEndpoint 동적 배치 창별 처리량 비교 (로컬 스텁 서버)")
+    parser.add_argument("--windows", type=float, nargs="+", default=[0, 1, 2, 5, 10, 20], help="배치 창(ms), 0 = 배치 안 함")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 64], help="동시 호출자 수")
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--max-new-tokens", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.04, help="요청(배치) 하나의 서버 처리 시간(초)")
+    parser.add_argument("--item-latency", type=float, default=0.001, help="배치 항목당 추가 처리 시간(초)")
+    parser.add_argument("--gpu-slots", type=int, default=4, help="서버가 동시에 처리하는 요청 수")
+    args = parser.parse_args()
+
+    config = StubConfig(latency=args.latency, batch_item_latency=args.item_latency, max_concurrency=args.gpu_slots)
+    server, base_url, stop = start_in_thread(config)
+    print(f"요청 {args.requests}건, 서버: {args.latency * 1000:.0f}ms/요청 "
+          f"+ {args.item_latency * 1000:.1f}ms/항목, 동시 처리 {args.gpu_slots}")
+    try:
+        for concurrency in args.concurrency:
+            print(f"\n호출자 {concurrency}")
+            print(f"{'window':>8} {'rps':>8} {'p50(ms)':>8} {'p99(ms)':>8} {'평균 배치':>9} {'HTTP 요청':>9}")
+            for window in args.windows:
+                server.reset_stats()
+                latencies, wall, batch_size = asyncio.run(run(base_url, window, concurrency, args))
+                lat = summarize_latencies(latencies)
+                label = "없음" if window <= 0 else f"{window:g}ms"
+                print(f"{label:>8} {len(latencies) / wall:>8.0f} {lat['p50_ms']:>8.1f} {lat['p99_ms']:>8.1f} "
+                      f"{batch_size:>9.1f} {server.stats.requests:>9}")
+    finally:
+        stop()
+
+
+if __name__ == "__main__":
+    main()
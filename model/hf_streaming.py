@@ -0,0 +1,346 @@
+# =====================================================
+# HuggingFaceEndpoint 토큰 스트리밍 (버퍼 상한 · 역압 · 연결 끊김 시 취소 · TTFT 측정)
+# =====================================================
+# - huggingface_endpoints.py 의 chain.invoke 는 max_new_tokens=256 개를 모두 만든 뒤에야 첫 글자를 돌려줍니다.
+#   사용자가 체감하는 지연은 첫 토큰까지의 시간(TTFT, time-to-first-token)이므로
+#   chain.stream / chain.astream 으로 토큰이 만들어지는 대로 흘려보내는 편이 훨씬 빠르게 느껴집니다.
+# - 스트림을 그대로 흘려보낼 때의 문제
+#   · 소비자(웹소켓·SSE 로 받는 브라우저 등)가 느리면 토큰이 메모리에 무한정 쌓이고,
+#   · 소비자가 연결을 끊어도 서버는 남은 토큰을 끝까지 생성해 GPU 시간을 낭비합니다.
+# - BufferedAsyncStream / BufferedStream
+#   · 생산자(체인 스트림을 읽는 태스크/스레드)와 소비자 사이에 maxsize 크기의 큐를 둡니다.
+#     큐가 가득 차면 생산자는 더 읽지 않고 기다립니다 → 소켓을 읽지 않으므로 TCP 흐름 제어로 서버까지 역압이 전달됩니다.
+#   · 소비자가 close()/aclose() 하거나(연결 끊김) consumer_timeout 초 동안 하나도 가져가지 않으면
+#     생산자를 멈추고 체인 스트림을 닫습니다 → hf_transport 가 HTTP 응답을 닫아 서버 쪽 생성도 멈춥니다.
+#   · StreamMetrics 에 TTFT · 전체 시간 · 토큰 수 · 토큰 간격 p50/p95 · 최대 버퍼 점유 · 취소 여부를 기록합니다.
+# - make_streaming_llm() 은 hf_transport.make_endpoint 로 공유 풀에 연결한 HuggingFaceEndpoint 를 만듭니다.
+#   langchain_huggingface 0.2.x 는 스트림도 client.text_generation(..., stream=True) 로 부르므로
+#   소비자가 스트림을 닫으면 hf_transport 가 HTTP 응답을 닫습니다.
+#
+# 사용 예)
+#   llm = make_streaming_llm("http://127.0.0.1:8080", transport, max_new_tokens=256)
+#   chain = prompt | llm | StrOutputParser()
+#   async with BufferedAsyncStream(chain.astream({"question": "..."}), maxsize=32) as stream:
+#       async for text in stream:
+#           await websocket.send_text(text)
+#   print(stream.metrics.ttft)
+import asyncio
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Iterator
+
+from bench_utils import percentile
+from hf_transport import PooledHTTPTransport, make_endpoint, stream_cancel_event
+
+
+# =====================================================
+# 1) 스트림 지표
+# =====================================================
+@dataclass
+class StreamMetrics:
+    """
+    소비자 쪽에서 본 스트림 하나의 지표 (시각은 time.perf_counter 기준, 초)
+
+    - ttft: 시작부터 첫 (비어 있지 않은) 청크를 받기까지
+    - total: 시작부터 스트림이 끝나거나 닫히기까지
+    - gaps: 연속한 청크 사이 간격 목록
+    - max_buffered: 큐에 동시에 쌓였던 최대 청크 수
+    - cancelled: 끝까지 읽기 전에 닫혔는지 / cancel_reason: "closed" 또는 "consumer_timeout"
+    """
+
+    started: float = field(default_factory=time.perf_counter)
+    first_token_at: float | None = None
+    finished_at: float | None = None
+    tokens: int = 0
+    gaps: list[float] = field(default_factory=list)
+    max_buffered: int = 0
+    cancelled: bool = False
+    cancel_reason: str | None = None
+    _last_at: float | None = None
+
+    def record(self, chunk: Any) -> None:
+        now = time.perf_counter()
+        if not chunk:
+            return
+        if self.first_token_at is None:
+            self.first_token_at = now
+        else:
+            self.gaps.append(now - self._last_at)
+        self._last_at = now
+        self.tokens += 1
+
+    def finish(self, reason: str | None = None) -> None:
+        if self.finished_at is None:
+            self.finished_at = time.perf_counter()
+            if reason is not None:
+                self.cancelled, self.cancel_reason = True, reason
+
+    @property
+    def ttft(self) -> float | None:
+        return None if self.first_token_at is None else self.first_token_at - self.started
+
+    @property
+    def total(self) -> float | None:
+        return None if self.finished_at is None else self.finished_at - self.started
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "ttft_ms": None if self.ttft is None else self.ttft * 1000,
+            "total_ms": None if self.total is None else self.total * 1000,
+            "tokens": self.tokens,
+            "gap_p50_ms": percentile(self.gaps, 0.50) * 1000,
+            "gap_p95_ms": percentile(self.gaps, 0.95) * 1000,
+            "max_buffered": self.max_buffered,
+            "cancelled": self.cancelled,
+            "cancel_reason": self.cancel_reason,
+        }
+
+
+class _Failure:
+    # 생산자에서 난 예외를 큐로 소비자에게 넘길 때 씁니다.
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+_DONE = object()
+
+
+# =====================================================
+# 2) 비동기 버퍼 스트림
+# =====================================================
+class BufferedAsyncStream:
+    """
+    async 이터레이터(예: chain.astream(...))를 크기 제한 큐를 거쳐 읽는 래퍼
+
+    - maxsize: 큐에 쌓아 둘 최대 청크 수 (가득 차면 생산자가 읽기를 멈춤)
+    - consumer_timeout: 큐가 가득 찬 채 이 시간(초) 동안 소비자가 가져가지 않으면 연결이 끊긴 것으로 보고 취소
+    - async with 로 쓰면 블록을 벗어날 때(예외·return 포함) aclose() 가 불립니다.
+    """
+
+    def __init__(self, source: AsyncIterator[Any], *, maxsize: int = 32, consumer_timeout: float | None = None) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize 는 0보다 커야 합니다.")
+        self._source = source
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self._consumer_timeout = consumer_timeout
+        self._producer: asyncio.Task | None = None
+        self._exhausted = False
+        self.metrics = StreamMetrics()
+
+    def _start(self) -> None:
+        if self._producer is None:
+            self.metrics = StreamMetrics()
+            self._producer = asyncio.create_task(self._produce())
+
+    async def _put(self, item: Any) -> bool:
+        try:
+            await asyncio.wait_for(self._queue.put(item), self._consumer_timeout)
+        except asyncio.TimeoutError:
+            self.metrics.finish("consumer_timeout")
+            return False
+        self.metrics.max_buffered = max(self.metrics.max_buffered, self._queue.qsize())
+        return True
+
+    async def _produce(self) -> None:
+        try:
+            async for chunk in self._source:
+                if not await self._put(chunk):
+                    return
+            await self._put(_DONE)
+        except Exception as exc:  # 소비자 쪽에서 다시 올립니다
+            await self._put(_Failure(exc))
+        finally:
+            # 취소·타임아웃으로 멈춘 경우에도 원본 스트림을 닫아 HTTP 응답을 정리합니다.
+            aclose = getattr(self._source, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    def __aiter__(self) -> "BufferedAsyncStream":
+        self._start()
+        return self
+
+    async def __anext__(self) -> Any:
+        self._start()
+        if self._exhausted or (self._queue.empty() and self._producer.done()):
+            # 생산자가 consumer_timeout 으로 멈췄다면 남은 청크까지만 돌려줍니다.
+            self._exhausted = True
+            raise StopAsyncIteration
+        item = await self._queue.get()
+        if item is _DONE:
+            self._exhausted = True
+            self.metrics.finish()
+            raise StopAsyncIteration
+        if isinstance(item, _Failure):
+            self._exhausted = True
+            self.metrics.finish()
+            raise item.error
+        self.metrics.record(item)
+        return item
+
+    async def aclose(self) -> None:
+        """끝까지 읽지 않았다면 생산자를 취소하고 원본 스트림을 닫습니다. (연결 끊김 처리)"""
+        producer, self._exhausted = self._producer, True
+        if producer is None:
+            return
+        if not producer.done():
+            self.metrics.finish("closed")
+            producer.cancel()
+        try:
+            await producer
+        except asyncio.CancelledError:
+            pass
+
+    async def __aenter__(self) -> "BufferedAsyncStream":
+        self._start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+
+# =====================================================
+# 3) 동기 버퍼 스트림 (스레드)
+# =====================================================
+class BufferedStream:
+    """
+    동기 이터레이터(예: chain.stream(...))를 생산자 스레드와 크기 제한 큐로 읽는 래퍼
+
+    - 인자는 BufferedAsyncStream 과 같습니다. with 로 쓰면 블록을 벗어날 때 close() 가 불립니다.
+    - 생산자가 다음 토큰을 기다리는 중에 close() 되면 그 토큰이 도착한 뒤에 멈춥니다.
+    - 동기 체인은 바깥 스트림을 닫아도 안쪽 LLM 스트림이 닫히지 않으므로 hf_transport.stream_cancel_event 로 알립니다.
+    """
+
+    _POLL = 0.05
+
+    def __init__(self, source: Iterator[Any], *, maxsize: int = 32, consumer_timeout: float | None = None) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize 는 0보다 커야 합니다.")
+        self._source = source
+        self._queue: queue.Queue = queue.Queue(maxsize)
+        self._consumer_timeout = consumer_timeout
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._exhausted = False
+        self.metrics = StreamMetrics()
+
+    def _start(self) -> None:
+        if self._thread is None:
+            self.metrics = StreamMetrics()
+            self._thread = threading.Thread(target=self._produce, name="buffered-stream", daemon=True)
+            self._thread.start()
+
+    def _put(self, item: Any) -> bool:
+        deadline = None if self._consumer_timeout is None else time.monotonic() + self._consumer_timeout
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=self._POLL)
+            except queue.Full:
+                if deadline is not None and time.monotonic() >= deadline:
+                    self.metrics.finish("consumer_timeout")
+                    self._stop.set()
+                    return False
+                continue
+            self.metrics.max_buffered = max(self.metrics.max_buffered, self._queue.qsize())
+            return True
+        return False
+
+    def _produce(self) -> None:
+        # close() 가 설정하는 _stop 을 hf_transport 에 알려 LLM 단계의 HTTP 응답까지 닫히게 합니다.
+        stream_cancel_event.set(self._stop)
+        try:
+            for chunk in self._source:
+                if self._stop.is_set() or not self._put(chunk):
+                    return
+            self._put(_DONE)
+        except Exception as exc:
+            self._put(_Failure(exc))
+        finally:
+            # 제너레이터는 만든 스레드가 아니어도 닫을 수 있지만, 실행 중인 스레드(여기)에서 닫아야 안전합니다.
+            close = getattr(self._source, "close", None)
+            if close is not None:
+                close()
+
+    def __iter__(self) -> "BufferedStream":
+        self._start()
+        return self
+
+    def __next__(self) -> Any:
+        self._start()
+        if self._exhausted:
+            raise StopIteration
+        while True:
+            try:
+                item = self._queue.get(timeout=self._POLL)
+                break
+            except queue.Empty:
+                if self._stop.is_set() and self._queue.empty():
+                    self._exhausted = True
+                    raise StopIteration
+        if item is _DONE:
+            self._exhausted = True
+            self.metrics.finish()
+            raise StopIteration
+        if isinstance(item, _Failure):
+            self._exhausted = True
+            self.metrics.finish()
+            raise item.error
+        self.metrics.record(item)
+        return item
+
+    def close(self) -> None:
+        if self._thread is not None and self._thread.is_alive() and not self._exhausted:
+            self.metrics.finish("closed")
+        self._exhausted = True
+        self._stop.set()
+
+    def __enter__(self) -> "BufferedStream":
+        self._start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+# =====================================================
+# 4) 스트리밍 LLM
+# =====================================================
+def make_streaming_llm(endpoint_url: str, transport: PooledHTTPTransport, **kwargs: Any) -> Any:
+    """공유 풀에 연결한 HuggingFaceEndpoint 를 돌려줍니다. stream / astream 도 hf_transport 클라이언트로 흐릅니다."""
+    return make_endpoint(endpoint_url, transport, **kwargs)
+
+
+# =====================================================
+# 5) 실행 예제 (로컬 스텁 서버 사용, API 키 불필요)
+# =====================================================
+if __name__ == "__main__":
+    from langchain_core.output_parsers import StrOutputParser
+    from langchain_core.prompts import PromptTemplate
+
+    from tgi_stub_server import StubConfig, start_in_thread
+
+    server, base_url, stop = start_in_thread(StubConfig(latency=0.05, token_latency=0.01))
+    prompt = PromptTemplate.from_template("<|user|>\n{question}<|end|>\n<|assistant|>")
+
+    async def demo() -> None:
+        transport = PooledHTTPTransport(pool_size=4)
+        chain = prompt | make_streaming_llm(base_url, transport, max_new_tokens=64) | StrOutputParser()
+
+        async with BufferedAsyncStream(chain.astream({"question": "what is the capital of South Korea?"})) as stream:
+            async for text in stream:
+                print(text, end="", flush=True)
+        print("\n전체 스트림:", stream.metrics.as_dict())
+
+        # 10 토큰만 받고 연결을 끊으면 서버도 생성을 멈춥니다.
+        async with BufferedAsyncStream(chain.astream({"question": "hello"}), maxsize=4) as stream:
+            async for _ in stream:
+                if stream.metrics.tokens == 10:
+                    break
+        await asyncio.sleep(0.1)
+        print("중간 취소:", stream.metrics.as_dict())
+        print("서버 통계:", server.stats)
+        await transport.aclose()
+
+    asyncio.run(demo())
+    stop()
@@ -0,0 +1,201 @@
+# =====================================================
+# HuggingFaceEndpoint 토큰 스트리밍 벤치마크: TTFT · 동시 스트림 · 역압 · 취소
+# =====================================================
+# - tgi_stub_server 를 백그라운드 스레드에 띄우고 prompt | llm | StrOutputParser() 체인으로 측정합니다.
+#   (llm 은 hf_streaming.make_streaming_llm: 공유 풀에 연결한 HuggingFaceEndpoint)
+# - 측정 항목
+#   · ttft        : invoke(전체 응답 대기) 지연 vs stream / astream 의 첫 토큰 지연(TTFT)과 전체 시간
+#   · concurrency : 동시 astream N 개의 TTFT p50/p95, 전체 시간 p50, 합계 토큰 처리량
+#   · backpressure: 느린 소비자(청크마다 --consumer-delay 초)에서 큐 크기별 최대 버퍼 점유
+#   · cancel      : 소비자가 --cancel-after 토큰 뒤 끊었을 때 서버가 실제로 보낸 토큰 수와 취소 횟수
+#
+# 실행 예)
+#   python model/hf_streaming_benchmark.py --max-new-tokens 256 --token-latency 0.01 --concurrency 1 16 64
+import argparse
+import asyncio
+import time
+import warnings
+
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import PromptTemplate
+
+from bench_utils import default_report_path, summarize_latencies, write_json_report
+from hf_streaming import BufferedAsyncStream, BufferedStream, make_streaming_llm
+from hf_transport import PooledHTTPTransport
+from tgi_stub_server import StubConfig, start_in_thread
+
+warnings.simplefilter("ignore")
+
+TEMPLATE = """<|system|>
+You are a helpful assistant.<|end|>
+<|user|>
+{question}<|end|>
+<|assistant|>"""
+
+
+def make_chain(base_url: str, transport: PooledHTTPTransport, max_new_tokens: int):
+    llm = make_streaming_llm(base_url, transport, max_new_tokens=max_new_tokens, temperature=0.1)
+    return PromptTemplate.from_template(TEMPLATE) | llm | StrOutputParser(), type(llm).__name__
+
+
+def run(transport: PooledHTTPTransport, coro):
+    # aiohttp 세션은 루프마다 따로 만들어지므로 asyncio.run 이 끝나기 전에 닫습니다.
+    async def wrapper():
+        try:
+            return await coro
+        finally:
+            await transport.aclose()
+    return asyncio.run(wrapper())
+
+
+def ms(seconds: list[float]) -> dict[str, float]:
+    lat = summarize_latencies(seconds)
+    return {"p50_ms": lat["p50_ms"], "p95_ms": lat["p95_ms"]}
+
+
+# =====================================================
+# 1) invoke vs stream TTFT
+# =====================================================
+def bench_ttft(chain, transport: PooledHTTPTransport, repeat: int) -> list[dict]:
+    invoke_s, sync_ttft, sync_total = [], [], []
+    for i in range(repeat):
+        start = time.perf_counter()
+        chain.invoke({"question": f"invoke {i}"})
+        invoke_s.append(time.perf_counter() - start)
+
+        with BufferedStream(chain.stream({"question": f"stream {i}"})) as stream:
+            for _ in stream:
+                pass
+        sync_ttft.append(stream.metrics.ttft)
+        sync_total.append(stream.metrics.total)
+
+    async def run_async() -> tuple[list[float], list[float]]:
+        ttft, total = [], []
+        for i in range(repeat):
+            async with BufferedAsyncStream(chain.astream({"question": f"astream {i}"})) as stream:
+                async for _ in stream:
+                    pass
+            ttft.append(stream.metrics.ttft)
+            total.append(stream.metrics.total)
+        return ttft, total
+
+    async_ttft, async_total = run(transport, run_async())
+    return [
+        {"mode": "invoke", "first_text": ms(invoke_s), "total": ms(invoke_s)},
+        {"mode": "stream", "first_text": ms(sync_ttft), "total": ms(sync_total)},
+        {"mode": "astream", "first_text": ms(async_ttft), "total": ms(async_total)},
+    ]
+
+
+# =====================================================
+# 2) 동시 스트림
+# =====================================================
+async def bench_concurrency(chain, concurrency: int, maxsize: int) -> dict:
+    async def one(i: int):
+        async with BufferedAsyncStream(chain.astream({"question": f"concurrent {i}"}), maxsize=maxsize) as stream:
+            async for _ in stream:
+                pass
+        return stream.metrics
+
+    start = time.perf_counter()
+    metrics = await asyncio.gather(*(one(i) for i in range(concurrency)))
+    wall = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "ttft": ms([m.ttft for m in metrics]),
+        "total": ms([m.total for m in metrics]),
+        "tokens_per_s": sum(m.tokens for m in metrics) / wall,
+    }
+
+
+# =====================================================
+# 3) 느린 소비자 / 4) 중간 취소
+# =====================================================
+async def bench_backpressure(chain, maxsize: int, consumer_delay: float) -> dict:
+    async with BufferedAsyncStream(chain.astream({"question": "slow consumer"}), maxsize=maxsize) as stream:
+        async for _ in stream:
+            await asyncio.sleep(consumer_delay)
+    return {"maxsize": maxsize, "max_buffered": stream.metrics.max_buffered, "total_ms": stream.metrics.total * 1000}
+
+
+def bench_cancel(chain, transport: PooledHTTPTransport, server, cancel_after: int) -> list[dict]:
+    results = []
+
+    server.reset_stats()
+    with BufferedStream(chain.stream({"question": "cancel sync"})) as stream:
+        for _ in stream:
+            if stream.metrics.tokens >= cancel_after:
+                break
+    time.sleep(0.2)   # 서버가 끊김을 알아차릴 시간
+    results.append({"mode": "stream", "server_tokens": server.stats.streamed_tokens, "server_cancelled": server.stats.cancelled})
+
+    async def run_async() -> None:
+        async with BufferedAsyncStream(chain.astream({"question": "cancel async"})) as stream:
+            async for _ in stream:
+                if stream.metrics.tokens >= cancel_after:
+                    break
+        await asyncio.sleep(0.2)
+
+    server.reset_stats()
+    run(transport, run_async())
+    results.append({"mode": "astream", "server_tokens": server.stats.streamed_tokens, "server_cancelled": server.stats.cancelled})
+    return results
+
+
+# =====================================================
+# 5) main
+# =====================================================
+def main():
+    parser = argparse.ArgumentParser(description="HuggingFaceEndpoint 토큰 스트리밍 벤치마크 (로컬 스텁 서버)")
+    parser.add_argument("--max-new-tokens", type=int, default=256)
+    parser.add_argument("--latency", type=float, default=0.05, help="첫 토큰 전 지연(prefill, 초)")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="토큰당 지연(초)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64])
+    parser.add_argument("--maxsize", type=int, default=32, help="스트림 버퍼 크기")
+    parser.add_argument("--consumer-delay", type=float, default=0.02, help="느린 소비자의 청크당 처리 시간(초)")
+    parser.add_argument("--cancel-after", type=int, default=16)
+    parser.add_argument("--output", default=None, help="JSON 결과 경로 (기본: benchmark_results/...)")
+    args = parser.parse_args()
+
+    server, base_url, stop = start_in_thread(StubConfig(latency=args.latency, token_latency=args.token_latency))
+    transport = PooledHTTPTransport(pool_size=max(args.concurrency))
+    chain, llm_name = make_chain(base_url, transport, args.max_new_tokens)
+    print(f"LLM: {llm_name}, max_new_tokens {args.max_new_tokens}, "
+          f"서버 지연 {args.latency * 1000:.0f}ms + 토큰당 {args.token_latency * 1000:.0f}ms")
+    results = []
+    try:
+        print(f"\n[ttft] {'mode':<8} {'첫 텍스트 p50':>13} {'p95':>8} {'전체 p50':>9}")
+        for r in bench_ttft(chain, transport, args.repeat):
+            results.append({"section": "ttft", **r})
+            print(f"       {r['mode']:<8} {r['first_text']['p50_ms']:>13.1f} {r['first_text']['p95_ms']:>8.1f} "
+                  f"{r['total']['p50_ms']:>9.1f}")
+
+        print(f"\n[concurrency] {'N':>4} {'TTFT p50':>9} {'TTFT p95':>9} {'전체 p50':>9} {'tokens/s':>9}")
+        for n in args.concurrency:
+            r = run(transport, bench_concurrency(chain, n, args.maxsize))
+            results.append({"section": "concurrency", **r})
+            print(f"              {n:>4} {r['ttft']['p50_ms']:>9.1f} {r['ttft']['p95_ms']:>9.1f} "
+                  f"{r['total']['p50_ms']:>9.1f} {r['tokens_per_s']:>9.0f}")
+
+        print(f"\n[backpressure] 소비자 청크당 {args.consumer_delay * 1000:.0f}ms")
+        for maxsize in (4, args.maxsize, args.max_new_tokens * 2):
+            r = run(transport, bench_backpressure(chain, maxsize, args.consumer_delay))
+            results.append({"section": "backpressure", **r})
+            print(f"  maxsize {maxsize:>4} → 최대 버퍼 {r['max_buffered']:>4}, 전체 {r['total_ms']:.0f}ms")
+
+        print(f"\n[cancel] {args.cancel_after} 토큰 후 연결 끊기 (요청 {args.max_new_tokens} 토큰)")
+        for r in bench_cancel(chain, transport, server, args.cancel_after):
+            results.append({"section": "cancel", **r})
+            print(f"  {r['mode']:<8} 서버 전송 토큰 {r['server_tokens']:>4}, 서버 취소 {r['server_cancelled']}")
+    finally:
+        transport.close()
+        stop()
+
+    params = {**{k: v for k, v in vars(args).items() if k != "output"}, "llm": llm_name}
+    path = write_json_report(args.output or default_report_path("hf_streaming"), "hf_streaming", params, results)
+    print("JSON 결과:", path)
+
+
+if __name__ == "__main__":
+    main()
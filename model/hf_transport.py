@@ -0,0 +1,267 @@
+# =====================================================
+# HuggingFaceEndpoint 용 공유 커넥션 풀(keep-alive) HTTP 전송 계층
+# =====================================================
+# - huggingface_endpoints.py 는 HuggingFaceEndpoint 를 만들고 chain.invoke 를 한 번 부릅니다.
+#   초당 수십~수백 건을 보내면 짧은 요청일수록 TCP 연결·TLS 핸드셰이크 비용이 응답 시간의 대부분이 됩니다.
+#   · huggingface_hub 의 AsyncInferenceClient 는 버전에 따라 요청마다 aiohttp 세션을 새로 만들어 연결을 재사용하지 못하고,
+#   · 동기 클라이언트도 스레드마다 세션을 따로 두어 동시성이 높으면 연결 수가 스레드 수만큼 늘어납니다.
+# - PooledHTTPTransport 는 프로세스 전체가 함께 쓰는 연결 풀을 하나 둡니다.
+#   · 동기: requests.Session + HTTPAdapter(pool_maxsize=pool_size, pool_block=True)
+#     풀이 가득 차면 새 연결을 더 만들지 않고 빈 연결을 기다립니다.
+#   · 비동기: 이벤트 루프마다 aiohttp.ClientSession(TCPConnector(limit_per_host=pool_size)) 하나를 재사용
+# - PooledTextGenerationClient / AsyncPooledTextGenerationClient 는 HuggingFaceEndpoint 가 쓰는
+#   client / async_client 자리에 그대로 끼울 수 있는 TGI(Text Generation Inference) 클라이언트입니다.
+#   · langchain_huggingface 0.2.x(pyproject 고정 버전)가 부르는 text_generation(prompt, **parameters) 를 구현합니다.
+#     (0.1.x 의 post(json=..., task=...) 경로는 지원하지 않습니다)
+#   attach_pooled_transport() 가 이 교체를 해 줍니다.
+#   · text_generation(prompt, stream=True) 는 TGI 의 SSE 스트림을 읽어 토큰 문자열을 하나씩 내보냅니다.
+#     (llm.stream / chain.astream 경로. 소비자가 중간에 멈추면 응답을 닫아 연결을 끊습니다 → hf_streaming.py)
+#
+# 사용 예)
+#   transport = PooledHTTPTransport(pool_size=64, token=os.environ["HUGGINGFACEHUB_API_TOKEN"])
+#   llm = make_endpoint("http://127.0.0.1:8080", transport, max_new_tokens=256, temperature=0.1)
+#   chain = prompt | llm | StrOutputParser()
+import asyncio
+import json
+import threading
+import weakref
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Iterator
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# 동기 스트림 취소 신호
+# - langchain_core 의 동기 RunnableSequence.stream 은 바깥 제너레이터를 닫아도 추적용 입력을 모으느라
+#   앞 단계 스트림을 끝까지 읽습니다. 그래서 LLM 단계까지 닫힘이 전달되지 않아 서버가 생성을 계속합니다.
+# - 스트림을 읽는 쪽(hf_streaming.BufferedStream)이 이 컨텍스트 변수에 Event 를 넣어 두면,
+#   stream_events 는 Event 가 설정된 뒤 다음 이벤트에서 응답을 닫고 끝냅니다. (비동기 경로는 태스크 취소로 충분)
+stream_cancel_event: ContextVar[threading.Event | None] = ContextVar("stream_cancel_event", default=None)
+
+
+# =====================================================
+# 1) 공유 전송 계층
+# =====================================================
+class PooledHTTPTransport:
+    """
+    프로세스 전체가 함께 쓰는 keep-alive HTTP 연결 풀
+
+    - pool_size: 호스트당 최대 동시 연결 수 (동기·비동기 각각)
+    - timeout: 요청 하나의 전체 제한 시간(초)
+    - token: 있으면 Authorization: Bearer 헤더로 보냄
+    - keepalive_timeout: 비동기 풀에서 쉬고 있는 연결을 유지하는 시간(초)
+    """
+
+    def __init__(
+        self,
+        *,
+        pool_size: int = 32,
+        timeout: float = 120.0,
+        token: str | None = None,
+        keepalive_timeout: float = 60.0,
+    ) -> None:
+        if pool_size <= 0:
+            raise ValueError("pool_size 는 0보다 커야 합니다.")
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.keepalive_timeout = keepalive_timeout
+        self.headers = {"Content-Type": "application/json"}
+        if token:
+            self.headers["Authorization"] = f"Bearer {token}"
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update(self.headers)
+
+        # aiohttp 세션은 만든 이벤트 루프에서만 쓸 수 있어 루프별로 하나씩 둡니다.
+        self._async_sessions: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    # -------------------------------------------------
+    # 1-1) 동기 요청
+    # -------------------------------------------------
+    def post_json(self, url: str, payload: dict) -> Any:
+        response = self.session.post(url, data=json.dumps(payload), timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    # -------------------------------------------------
+    # 1-2) 비동기 요청
+    # -------------------------------------------------
+    def _async_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        session = self._async_sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit_per_host=self.pool_size, keepalive_timeout=self.keepalive_timeout)
+            session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._async_sessions[loop] = session
+        return session
+
+    async def apost_json(self, url: str, payload: dict) -> Any:
+        async with self._async_session().post(url, data=json.dumps(payload)) as response:
+            response.raise_for_status()
+            return await response.json()
+
+    # -------------------------------------------------
+    # 1-3) SSE 스트리밍 요청
+    # -------------------------------------------------
+    def stream_events(self, url: str, payload: dict) -> Iterator[dict]:
+        """
+        SSE 응답의 data: 이벤트를 dict 로 하나씩 돌려줍니다.
+        - 제너레이터를 끝까지 읽지 않고 close() 하면 응답을 닫아 서버에 연결 끊김이 전달됩니다.
+          (연결은 풀로 돌아가지 않고 버려집니다)
+        """
+        cancel = stream_cancel_event.get()
+        response = self.session.post(url, data=json.dumps(payload), timeout=self.timeout, stream=True)
+        try:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if cancel is not None and cancel.is_set():
+                    return
+                if line.startswith(b"data:"):
+                    yield json.loads(line[5:])
+        finally:
+            response.close()
+
+    async def astream_events(self, url: str, payload: dict) -> AsyncIterator[dict]:
+        # 비동기 제너레이터가 aclose() 되거나 태스크가 취소되면 async with 가 응답을 닫습니다.
+        async with self._async_session().post(url, data=json.dumps(payload)) as response:
+            response.raise_for_status()
+            async for line in response.content:
+                if line.startswith(b"data:"):
+                    yield json.loads(line[5:])
+
+    # -------------------------------------------------
+    # 1-4) 정리
+    # -------------------------------------------------
+    def close(self) -> None:
+        self.session.close()
+
+    async def aclose(self) -> None:
+        """현재 이벤트 루프의 비동기 세션을 닫습니다. (루프를 끝내기 전에 호출)"""
+        session = self._async_sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+
+# =====================================================
+# 2) TGI 텍스트 생성 클라이언트
+# =====================================================
+def build_payload(prompt: str, parameters: dict[str, Any]) -> dict:
+    # HuggingFaceEndpoint 는 stop 으로 넘기지만, stop_sequences 로 넘겨도 TGI 의 stop 으로 바꿔 보냅니다.
+    params = {k: v for k, v in parameters.items() if v is not None and k != "stop_sequences"}
+    if parameters.get("stop_sequences") and "stop" not in params:
+        params["stop"] = parameters["stop_sequences"]
+    return {"inputs": prompt, "parameters": params}
+
+
+def stream_payload(prompt: str, parameters: dict[str, Any]) -> dict:
+    return {**build_payload(prompt, parameters), "stream": True}
+
+
+def iter_token_texts(events: Iterator[dict]) -> Iterator[str]:
+    # 특수 토큰(</s> 등)은 InferenceClient 와 마찬가지로 건너뜁니다.
+    try:
+        for event in events:
+            token = event.get("token") or {}
+            if not token.get("special"):
+                yield token.get("text", "")
+    finally:
+        events.close()
+
+
+async def aiter_token_texts(events: AsyncIterator[dict]) -> AsyncIterator[str]:
+    try:
+        async for event in events:
+            token = event.get("token") or {}
+            if not token.get("special"):
+                yield token.get("text", "")
+    finally:
+        await events.aclose()
+
+
+def parse_generated_text(body: Any) -> str:
+    # TGI 의 "/" 는 [{"generated_text": ...}], "/generate" 는 {"generated_text": ...} 를 돌려줍니다.
+    if isinstance(body, list):
+        body = body[0]
+    return body["generated_text"]
+
+
+class PooledTextGenerationClient:
+    """
+    HuggingFaceEndpoint.client 자리에 넣는 동기 TGI 클라이언트
+
+    - transport: 공유 PooledHTTPTransport
+    - url: 텍스트 생성 엔드포인트 URL (TGI 서버 주소 또는 Inference Endpoint URL)
+    """
+
+    def __init__(self, transport: PooledHTTPTransport, url: str) -> None:
+        self.transport = transport
+        self.url = url
+
+    def text_generation(self, prompt: str, *, stream: bool = False, details: bool = False,
+                        model: str | None = None, **parameters: Any) -> str | Iterator[str]:
+        """InferenceClient.text_generation 호환 (details=False). stream=True 면 토큰 문자열 이터레이터"""
+        if stream:
+            return iter_token_texts(self.transport.stream_events(self.url, stream_payload(prompt, parameters)))
+        return parse_generated_text(self.transport.post_json(self.url, build_payload(prompt, parameters)))
+
+
+class AsyncPooledTextGenerationClient:
+    """HuggingFaceEndpoint.async_client 자리에 넣는 비동기 TGI 클라이언트"""
+
+    def __init__(self, transport: PooledHTTPTransport, url: str) -> None:
+        self.transport = transport
+        self.url = url
+
+    async def text_generation(self, prompt: str, *, stream: bool = False, details: bool = False,
+                              model: str | None = None, **parameters: Any) -> str | AsyncIterator[str]:
+        if stream:
+            return aiter_token_texts(self.transport.astream_events(self.url, stream_payload(prompt, parameters)))
+        return parse_generated_text(await self.transport.apost_json(self.url, build_payload(prompt, parameters)))
+
+
+# =====================================================
+# 3) HuggingFaceEndpoint 연결
+# =====================================================
+def attach_pooled_transport(llm: Any, transport: PooledHTTPTransport, *, url: str | None = None) -> Any:
+    """
+    HuggingFaceEndpoint 의 client / async_client 를 공유 풀 클라이언트로 바꿉니다.
+    - url 을 생략하면 llm.endpoint_url 을 씁니다. (repo_id 만 지정한 경우 url 을 직접 넘겨야 함)
+    """
+    url = url or getattr(llm, "endpoint_url", None)
+    if not url:
+        raise ValueError("엔드포인트 URL 을 알 수 없습니다. url= 로 직접 넘겨주세요.")
+    llm.client = PooledTextGenerationClient(transport, url)
+    llm.async_client = AsyncPooledTextGenerationClient(transport, url)
+    return llm
+
+
+def make_endpoint(endpoint_url: str, transport: PooledHTTPTransport, **kwargs: Any) -> Any:
+    """공유 풀을 쓰는 HuggingFaceEndpoint 를 만듭니다. kwargs 는 HuggingFaceEndpoint 인자 그대로입니다."""
+    from langchain_huggingface import HuggingFaceEndpoint
+
+    return attach_pooled_transport(HuggingFaceEndpoint(endpoint_url=endpoint_url, **kwargs), transport)
+
+
+# =====================================================
+# 4) 실행 예제 (로컬 스텁 서버 사용, API 키 불필요)
+# =====================================================
+if __name__ == "__main__":
+    from tgi_stub_server import StubConfig, start_in_thread
+
+    server, base_url, stop = start_in_thread(StubConfig(latency=0.01))
+    transport = PooledHTTPTransport(pool_size=4)
+    client = PooledTextGenerationClient(transport, base_url)
+    for question in ["what is the capital of South Korea?"] * 5:
+        print(client.text_generation(question, max_new_tokens=8, temperature=0.1))
+    print("서버 통계:", server.stats, "(요청 5건을 연결 1개로 처리)")
+    transport.close()
+    stop()
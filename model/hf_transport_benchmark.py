@@ -0,0 +1,153 @@
+# =====================================================
+# HuggingFaceEndpoint 전송 계층 벤치마크: 요청마다 새 연결 vs 공유 keep-alive 풀
+# =====================================================
+# - tgi_stub_server 를 백그라운드 스레드에 띄우고, 같은 요청을 여러 방식으로 보내 처리량·지연시간·연결 수를 비교합니다.
+#   · sync-new-conn   : 요청마다 requests.post (새 세션 → 새 TCP 연결)
+#   · sync-pooled     : PooledHTTPTransport 의 공유 세션 (pool_size 개 연결 재사용)
+#   · async-new-conn  : 요청마다 aiohttp.ClientSession 생성 (구버전 AsyncInferenceClient 와 같은 방식)
+#   · async-pooled    : PooledHTTPTransport 의 루프별 공유 aiohttp 세션
+#   · endpoint-pooled : langchain_huggingface 가 설치되어 있으면 prompt | HuggingFaceEndpoint | StrOutputParser 로 같은 측정
+# - 로컬 루프백이라 TLS 가 없습니다. 실제 https 엔드포인트에서는 새 연결마다 TLS 핸드셰이크가 더해져 차이가 더 커집니다.
+#
+# 실행 예)
+#   python model/hf_transport_benchmark.py --requests 2000 --concurrency 32 --pool-size 32
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+import requests
+
+from bench_utils import summarize_latencies
+from hf_transport import PooledHTTPTransport, PooledTextGenerationClient, AsyncPooledTextGenerationClient
+from tgi_stub_server import StubConfig, start_in_thread
+
+TEMPLATE = """<|system|>
+You are a helpful assistant.<|end|>
+<|user|>
+{question}<|end|>
+<|assistant|>"""
+
+
+def payload(i: int, max_new_tokens: int) -> dict:
+    return {"inputs": TEMPLATE.format(question=f"question {i}"), "parameters": {"max_new_tokens": max_new_tokens}}
+
+
+# =====================================================
+# 1) 방식별 실행
+# =====================================================
+def run_sync(call, n: int, concurrency: int) -> tuple[list[float], float]:
+    def timed(i: int) -> float:
+        start = time.perf_counter()
+        call(i)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(timed, range(n)))
+    return latencies, time.perf_counter() - start
+
+
+async def run_async(call, n: int, concurrency: int) -> tuple[list[float], float]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed(i: int) -> float:
+        async with semaphore:
+            start = time.perf_counter()
+            await call(i)
+            return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(timed(i) for i in range(n)))
+    return list(latencies), time.perf_counter() - start
+
+
+def bench(mode: str, base_url: str, args) -> tuple[list[float], float]:
+    tokens = args.max_new_tokens
+    if mode == "sync-new-conn":
+        def call(i):
+            requests.post(base_url, data=json.dumps(payload(i, tokens)), timeout=60).raise_for_status()
+        return run_sync(call, args.requests, args.concurrency)
+
+    if mode == "sync-pooled":
+        transport = PooledHTTPTransport(pool_size=args.pool_size)
+        client = PooledTextGenerationClient(transport, base_url)
+        try:
+            return run_sync(lambda i: client.text_generation(payload(i, tokens)["inputs"], max_new_tokens=tokens),
+                            args.requests, args.concurrency)
+        finally:
+            transport.close()
+
+    if mode == "async-new-conn":
+        async def call(i):
+            async with aiohttp.ClientSession() as session:
+                async with session.post(base_url, json=payload(i, tokens)) as response:
+                    await response.json()
+        return asyncio.run(run_async(call, args.requests, args.concurrency))
+
+    if mode == "async-pooled":
+        async def main():
+            transport = PooledHTTPTransport(pool_size=args.pool_size)
+            client = AsyncPooledTextGenerationClient(transport, base_url)
+            try:
+                return await run_async(
+                    lambda i: client.text_generation(payload(i, tokens)["inputs"], max_new_tokens=tokens),
+                    args.requests, args.concurrency,
+                )
+            finally:
+                await transport.aclose()
+        return asyncio.run(main())
+
+    if mode == "endpoint-pooled":
+        from langchain_core.output_parsers import StrOutputParser
+        from langchain_core.prompts import PromptTemplate
+
+        from hf_transport import make_endpoint
+
+        transport = PooledHTTPTransport(pool_size=args.pool_size)
+        llm = make_endpoint(base_url, transport, max_new_tokens=tokens, temperature=0.1)
+        chain = PromptTemplate.from_template(TEMPLATE) | llm | StrOutputParser()
+        try:
+            return run_sync(lambda i: chain.invoke({"question": f"question {i}"}), args.requests, args.concurrency)
+        finally:
+            transport.close()
+
+    raise ValueError(mode)
+
+
+# =====================================================
+# 2) main
+# =====================================================
+def main():
+    parser = argparse.ArgumentParser(description="HuggingFaceEndpoint 전송 계층 처리량 비교 (로컬 스텁 서버)")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--pool-size", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.005, help="스텁 서버 응답 지연(초)")
+    parser.add_argument("--max-new-tokens", type=int, default=16)
+    parser.add_argument("--modes", nargs="+",
+                        default=["sync-new-conn", "sync-pooled", "async-new-conn", "async-pooled", "endpoint-pooled"])
+    args = parser.parse_args()
+
+    server, base_url, stop = start_in_thread(StubConfig(latency=args.latency))
+    print(f"요청 {args.requests}건, 동시성 {args.concurrency}, pool_size {args.pool_size}, 서버 지연 {args.latency * 1000:.0f}ms")
+    print(f"{'mode':<16} {'rps':>8} {'p50(ms)':>8} {'p99(ms)':>8} {'연결 수':>7}")
+    try:
+        for mode in args.modes:
+            server.reset_stats()
+            try:
+                latencies, wall = bench(mode, base_url, args)
+            except ImportError as exc:
+                print(f"{mode:<16} 건너뜀 ({exc.name} 미설치)")
+                continue
+            lat = summarize_latencies(latencies)
+            print(f"{mode:<16} {len(latencies) / wall:>8.0f} {lat['p50_ms']:>8.2f} {lat['p99_ms']:>8.2f} "
+                  f"{server.stats.connections:>7}")
+    finally:
+        stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -49,6 +49,12 @@ llm = HuggingFaceEndpoint(
     temperature=0.1,     # temperature: 출력 다양성 제어
     # huggingfacehub_api_token=os.environ["HUGGINGFACEHUB_API_TOKEN"],  # : 위에서 login(token) 안한 경우 엔드포인트에 넣기 가능
 )
+# ※ 많은 요청을 동시에 보낼 때는 hf_transport.py 의 PooledHTTPTransport 로
+#   연결을 재사용하세요. (attach_pooled_transport(llm, transport, url=...))
+#   자체 서버에 배치 경로(/generate_batch, tgi_stub_server.py 참고)를 두었다면 hf_batching.py 의 attach_batching 으로
+#   동시에 들어온 요청을 묶어 보낼 수 있습니다. (TGI · Inference Endpoints 는 서버가 알아서 묶으므로 필요 없음)
+#   첫 토큰까지의 시간(TTFT)을 줄이려면 chain.stream/astream 을 hf_streaming.py 의 BufferedAsyncStream 으로 감싸세요.
+#   로컬 부하 테스트용 TGI 호환 서버는 tgi_stub_server.py 에 있습니다.
 
 # -----------------------------------------------------
 # 7) LangChain 체인 구성
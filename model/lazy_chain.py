@@ -0,0 +1,247 @@
+# =====================================================
+# 지연(lazy) 체인 복원: 처음 호출될 때 구성 요소를 만드는 프록시 Runnable
+# =====================================================
+# - serialization.py 의 load(loaded_dict, secrets_map=...) 는 체인 안의 모든 구성 요소를 즉시 만듭니다.
+#   ChatOpenAI 는 생성 시점에 HTTP 클라이언트까지 만들기 때문에,
+#   체인을 수백 개 등록하지만 요청마다 몇 개만 쓰는 서비스는 기동 시간이 대부분 여기에 쓰입니다.
+# - LazyChainLoader.load() 는 dumpd dict 를 받아 LazyRunnable(프록시)만 돌려주고 아무것도 만들지 않습니다.
+#   · 프록시는 invoke/ainvoke/batch/stream 등이 처음 불릴 때 자기 구성 요소를 만듭니다.
+#   · RunnableSequence / RunnableParallel 같은 "조립용" 구성 요소는 껍데기만 만들고
+#     자식들은 다시 프록시로 넣으므로, 실행 중 실제로 도달한 단계만 만들어집니다.
+#     (예: RunnableParallel 에서 한 번도 쓰지 않은 가지는 끝까지 만들지 않음)
+# - 구성 요소를 만들 때마다 경로·클래스·소요 시간을 loader.timings 에 기록하고 report() 로 보여 줍니다.
+# - 부모 실행(run) 아래에 그대로 이어지도록 프록시 자체는 콜백 run 을 만들지 않고 config 를 그대로 넘깁니다.
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+
+from langchain_core.load import load
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableParallel, RunnableSequence
+
+from chain_format import MAGIC, decode_chain
+
+SEQUENCE_ID = ("langchain", "schema", "runnable", "RunnableSequence")
+PARALLEL_ID = ("langchain", "schema", "runnable", "RunnableParallel")
+
+
+# =====================================================
+# 1) 구성 요소 생성 기록
+# =====================================================
+@dataclass
+class ComponentTiming:
+    """구성 요소 하나를 만드는 데 걸린 시간"""
+    path: str          # 예) "fruit_chain.last", "router.steps__.summary"
+    name: str          # 클래스 이름 (dumpd 의 id 마지막 요소)
+    seconds: float
+
+
+# =====================================================
+# 2) 프록시 Runnable
+# =====================================================
+class LazyRunnable(Runnable):
+    """
+    dumpd dict 를 들고 있다가 처음 실행될 때 실제 Runnable 을 만드는 프록시
+
+    - resolve(): 지금 바로 만들고 실제 Runnable 을 반환 (deep=True 면 자식 프록시까지 모두)
+    - built: 이미 만들어졌는지 여부
+    - 실행 메서드와 InputType / OutputType / get_input_schema / get_output_schema 는 실제 Runnable 로 위임합니다.
+      (타입 · 스키마를 조회하면 그 시점에 구성 요소가 만들어집니다)
+    """
+
+    def __init__(self, serialized: dict, loader: "LazyChainLoader", path: str) -> None:
+        self._serialized = serialized
+        self._loader = loader
+        self._path = path
+        self._target: Runnable | None = None
+        self._children: list[LazyRunnable] = []
+        self._lock = threading.Lock()
+        self.name = serialized.get("name") or serialized["id"][-1]
+
+    @property
+    def built(self) -> bool:
+        return self._target is not None
+
+    def resolve(self, *, deep: bool = False) -> Runnable:
+        if self._target is None:
+            # 여러 스레드가 동시에 처음 호출해도 한 번만 만듭니다.
+            with self._lock:
+                if self._target is None:
+                    self._target = self._loader._build(self)
+        if deep:
+            for child in self._children:
+                child.resolve(deep=True)
+        return self._target
+
+    def __repr__(self) -> str:
+        state = "built" if self.built else "lazy"
+        return f"LazyRunnable({self._path}: {self.name}, {state})"
+
+    # -------------------------------------------------
+    # 2-1) 실행 위임
+    # -------------------------------------------------
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        return self.resolve().invoke(input, config, **kwargs)
+
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        return await self.resolve().ainvoke(input, config, **kwargs)
+
+    def batch(self, inputs: list[Any], config: Any = None, *, return_exceptions: bool = False, **kwargs: Any) -> list[Any]:
+        return self.resolve().batch(inputs, config, return_exceptions=return_exceptions, **kwargs)
+
+    async def abatch(self, inputs: list[Any], config: Any = None, *, return_exceptions: bool = False, **kwargs: Any) -> list[Any]:
+        return await self.resolve().abatch(inputs, config, return_exceptions=return_exceptions, **kwargs)
+
+    def stream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Iterator[Any]:
+        yield from self.resolve().stream(input, config, **kwargs)
+
+    async def astream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> AsyncIterator[Any]:
+        async for chunk in self.resolve().astream(input, config, **kwargs):
+            yield chunk
+
+    # RunnableSequence 의 스트리밍은 각 단계의 transform 을 이어 붙이므로 이것도 위임해야
+    # 중간 단계가 입력을 전부 모으지 않고 청크 단위로 흘려보냅니다.
+    def transform(self, input: Iterator[Any], config: Optional[RunnableConfig] = None, **kwargs: Any) -> Iterator[Any]:
+        yield from self.resolve().transform(input, config, **kwargs)
+
+    async def atransform(self, input: AsyncIterator[Any], config: Optional[RunnableConfig] = None, **kwargs: Any) -> AsyncIterator[Any]:
+        async for chunk in self.resolve().atransform(input, config, **kwargs):
+            yield chunk
+
+    # -------------------------------------------------
+    # 2-2) 타입 · 스키마 위임
+    # -------------------------------------------------
+    # Runnable 기본 구현은 제네릭 인자에서 타입을 읽으므로 프록시에서는 Any 가 됩니다.
+    # 조회하는 순간 실제 Runnable 을 만들고 그쪽 값을 돌려줍니다. (with_types, 스키마 생성 등이 그대로 동작)
+    @property
+    def InputType(self) -> Any:
+        return self.resolve().InputType
+
+    @property
+    def OutputType(self) -> Any:
+        return self.resolve().OutputType
+
+    def get_input_schema(self, config: Optional[RunnableConfig] = None) -> Any:
+        return self.resolve().get_input_schema(config)
+
+    def get_output_schema(self, config: Optional[RunnableConfig] = None) -> Any:
+        return self.resolve().get_output_schema(config)
+
+
+# =====================================================
+# 3) 로더
+# =====================================================
+class LazyChainLoader:
+    """
+    dumpd dict / 저장 파일을 LazyRunnable 로 여는 로더
+
+    - load_kwargs: 구성 요소를 만들 때 langchain_core.load.load 에 넘길 인자
+      예) secrets_map={"OPENAI_API_KEY": ...}, allowed_objects="all"
+    - 체인 여러 개를 같은 로더로 열면 timings 에 생성 기록이 모두 모입니다.
+    - 조립용 구성 요소는 composites[id 튜플] = 생성 함수(proxy → Runnable) 로 추가할 수 있습니다.
+      생성 함수 안에서 _child() 로 자식을 프록시로 감싸면 됩니다.
+    """
+
+    def __init__(self, **load_kwargs: Any) -> None:
+        self._load_kwargs = load_kwargs
+        self.timings: list[ComponentTiming] = []
+        self._timings_lock = threading.Lock()
+        self.composites: dict[tuple[str, ...], Callable[["LazyRunnable"], Runnable]] = {
+            SEQUENCE_ID: self._build_sequence,
+            PARALLEL_ID: self._build_parallel,
+        }
+
+    # -------------------------------------------------
+    # 3-1) 열기
+    # -------------------------------------------------
+    def load(self, serialized: dict, *, name: str = "root") -> LazyRunnable:
+        """dumpd dict → 프록시 (아무것도 만들지 않음)"""
+        if serialized.get("type") != "constructor":
+            raise ValueError("constructor 타입의 dumpd dict 만 지연 복원할 수 있습니다.")
+        return LazyRunnable(serialized, self, name)
+
+    def load_file(self, path: str, *, name: str | None = None) -> LazyRunnable:
+        """chain_format 바이너리 또는 JSON 파일 → 프록시 (pickle 은 지원하지 않음)"""
+        with open(path, "rb") as f:
+            data = f.read()
+        serialized = decode_chain(data) if data.startswith(MAGIC) else json.loads(data)
+        return self.load(serialized, name=name or path)
+
+    # -------------------------------------------------
+    # 3-2) 생성
+    # -------------------------------------------------
+    def _child(self, parent: LazyRunnable, serialized: Any, key: str) -> Any:
+        # constructor 가 아닌 값(문자열, 숫자 등)은 가벼우므로 바로 복원합니다.
+        if not (isinstance(serialized, dict) and serialized.get("type") == "constructor"):
+            return load(serialized, **self._load_kwargs)
+        child = LazyRunnable(serialized, self, f"{parent._path}.{key}")
+        parent._children.append(child)
+        return child
+
+    def _build_sequence(self, proxy: LazyRunnable) -> Runnable:
+        kwargs = proxy._serialized["kwargs"]
+        steps = [self._child(proxy, kwargs["first"], "first")]
+        steps += [self._child(proxy, step, f"middle[{i}]") for i, step in enumerate(kwargs.get("middle", []))]
+        steps.append(self._child(proxy, kwargs["last"], "last"))
+        return RunnableSequence(*steps)
+
+    def _build_parallel(self, proxy: LazyRunnable) -> Runnable:
+        steps = proxy._serialized["kwargs"]["steps__"]
+        return RunnableParallel({key: self._child(proxy, step, f"steps__.{key}") for key, step in steps.items()})
+
+    def _build(self, proxy: LazyRunnable) -> Runnable:
+        builder = self.composites.get(tuple(proxy._serialized["id"]))
+        start = time.perf_counter()
+        target = builder(proxy) if builder is not None else load(proxy._serialized, **self._load_kwargs)
+        elapsed = time.perf_counter() - start
+        with self._timings_lock:
+            self.timings.append(ComponentTiming(proxy._path, proxy._serialized["id"][-1], elapsed))
+        return target
+
+    # -------------------------------------------------
+    # 3-3) 보고
+    # -------------------------------------------------
+    @property
+    def total_seconds(self) -> float:
+        return sum(t.seconds for t in self.timings)
+
+    def report(self, top: int | None = None) -> str:
+        """생성 시간이 긴 순서로 정렬한 표 문자열"""
+        rows = sorted(self.timings, key=lambda t: t.seconds, reverse=True)[:top]
+        lines = [f"{'path':<40} {'component':<24} {'ms':>8}"]
+        lines += [f"{t.path:<40} {t.name:<24} {t.seconds * 1000:>8.3f}" for t in rows]
+        lines.append(f"구성 요소 {len(self.timings)}개, 합계 {self.total_seconds * 1000:.3f} ms")
+        return "\n".join(lines)
+
+
+# =====================================================
+# 4) 실행 예제 (API 키 없이 동작)
+# =====================================================
+if __name__ == "__main__":
+    import warnings
+
+    from langchain_core.load import dumpd
+    from langchain_core.output_parsers import StrOutputParser
+    from langchain_core.prompts import PromptTemplate
+
+    from fake_llm import FakeLatencyChatModel
+
+    warnings.simplefilter("ignore")
+
+    prompt = PromptTemplate(template="{fruit}의 색상이 무엇입니까?", input_variables=["fruit"])
+    branches = RunnableParallel(
+        short=FakeLatencyChatModel(latency=0.01, response_words=5) | StrOutputParser(),
+        long=FakeLatencyChatModel(latency=0.01, response_words=40) | StrOutputParser(),
+    )
+    serialized = dumpd(prompt | branches)
+
+    loader = LazyChainLoader(
+        valid_namespaces=["fake_llm"],
+        allowed_objects=[PromptTemplate, RunnableSequence, RunnableParallel, StrOutputParser, FakeLatencyChatModel],
+    )
+    chain = loader.load(serialized, name="fruit_chain")
+    print("복원 직후:", chain, "/ 만든 구성 요소", len(loader.timings), "개")
+
+    print("실행 결과:", chain.invoke({"fruit": "사과"}))
+    print(loader.report())
@@ -0,0 +1,72 @@
+# =====================================================
+# 지연 복원 기동 시간 벤치마크: load() vs LazyChainLoader
+# =====================================================
+# - serialization.py 와 같은 "prompt | ChatOpenAI | StrOutputParser" 체인 --chains 개를 등록하는
+#   서비스 기동 과정을 흉내 냅니다.
+#   · eager: 모든 체인을 load() 로 즉시 복원 (ChatOpenAI HTTP 클라이언트까지 생성)
+#   · lazy : LazyChainLoader.load() 로 프록시만 등록
+# - 그 다음 "첫 요청"에서 --used 개 체인만 쓴다고 보고, lazy 쪽은 그 체인들만 resolve(deep=True) 로
+#   만듭니다. (실제 invoke 가 처음 할 생성 작업과 같고, API 호출은 하지 않습니다)
+# - 마지막에 구성 요소별 생성 시간 상위 항목을 보여 줍니다.
+#
+# 실행 예)
+#   python model/lazy_chain_benchmark.py --chains 500 --used 5
+import argparse
+import time
+import warnings
+
+from langchain_core.load import dumpd, load
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import PromptTemplate
+from langchain_openai import ChatOpenAI
+
+from lazy_chain import LazyChainLoader
+
+warnings.simplefilter("ignore")
+
+FAKE_KEY = "sk-placeholder"
+LOAD_KWARGS = {"secrets_map": {"OPENAI_API_KEY": FAKE_KEY}, "allowed_objects": "all"}
+
+
+def make_serialized(n: int) -> list[dict]:
+    chains = []
+    for i in range(n):
+        prompt = PromptTemplate(template=f"[{i}] {{fruit}}의 색상이 무엇입니까?", input_variables=["fruit"])
+        llm = ChatOpenAI(model="gpt-4.1-mini", temperature=(i % 5) / 10, api_key=FAKE_KEY)
+        chains.append(dumpd(prompt | llm | StrOutputParser()))
+    return chains
+
+
+def main():
+    parser = argparse.ArgumentParser(description="체인 지연 복원 기동 시간 비교")
+    parser.add_argument("--chains", type=int, default=500, help="등록할 체인 수")
+    parser.add_argument("--used", type=int, default=5, help="첫 요청에서 실제로 쓰는 체인 수")
+    args = parser.parse_args()
+
+    serialized = make_serialized(args.chains)
+
+    start = time.perf_counter()
+    eager = {f"chain-{i}": load(d, **LOAD_KWARGS) for i, d in enumerate(serialized)}
+    eager_register = time.perf_counter() - start
+
+    loader = LazyChainLoader(**LOAD_KWARGS)
+    start = time.perf_counter()
+    lazy = {f"chain-{i}": loader.load(d, name=f"chain-{i}") for i, d in enumerate(serialized)}
+    lazy_register = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for name in list(lazy)[:args.used]:
+        lazy[name].resolve(deep=True)
+    lazy_first_use = time.perf_counter() - start
+
+    print(f"체인 {len(eager)}개 등록, 첫 요청에서 {args.used}개 사용")
+    print(f"{'mode':<6} {'등록(ms)':>10} {'첫 요청 생성(ms)':>16} {'합계(ms)':>10}")
+    print(f"{'eager':<6} {eager_register * 1000:>10.1f} {0.0:>16.1f} {eager_register * 1000:>10.1f}")
+    print(f"{'lazy':<6} {lazy_register * 1000:>10.1f} {lazy_first_use * 1000:>16.1f} "
+          f"{(lazy_register + lazy_first_use) * 1000:>10.1f}")
+    print(f"기동 시간 단축: {eager_register / (lazy_register + lazy_first_use):.1f}x\n")
+    print(loader.report(top=6))
+
+
+if __name__ == "__main__":
+    main()
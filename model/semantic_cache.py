@@ -0,0 +1,284 @@
+# =====================================================
+# 임베딩 유사도 기반 시맨틱(Semantic) LLM 캐시
+# =====================================================
+# - InMemoryCache / SQLiteCache 는 프롬프트 문자열이 "완전히 같을 때만" 적중합니다.
+#   "한국에 대해서 200자 내외로 요약해줘" 와 "한국에 대해 200자 정도로 요약해 줘" 는 서로 다른 키입니다.
+# - 시맨틱 캐시는 프롬프트를 임베딩한 뒤, 프로세스 내부 ANN(근사 최근접 이웃) 인덱스에서
+#   가장 가까운 벡터를 찾고 코사인 유사도가 threshold 이상이면 저장된 응답을 돌려줍니다.
+# - ANN 인덱스는 외부 라이브러리 없이 numpy 로 구현한 랜덤 하이퍼플레인 LSH 입니다.
+#   · 여러 개의 해시 테이블에서 후보를 모은 뒤, 후보만 정확한 코사인 유사도로 다시 계산
+#   · 인덱스 크기(maxsize)를 넘으면 가장 오래 사용되지 않은 항목부터 퇴출(LRU)
+# - 같은 문자열이 다시 들어오면 임베딩 없이 바로 돌려주는 exact-match 경로를 먼저 확인합니다.
+# - 참고: 캐시 미스 판정에도 임베딩 호출 1회가 필요하므로,
+#   OpenAIEmbeddings 같은 원격 임베딩보다 로컬 임베딩 모델과 함께 쓸 때 효과가 큽니다.
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.embeddings import Embeddings
+
+from bounded_cache import CacheStats
+
+
+# =====================================================
+# 1) 프롬프트 → 임베딩용 텍스트 추출
+# =====================================================
+def prompt_to_text(prompt: str) -> str:
+    """
+    캐시에 전달되는 prompt 에서 사람이 읽는 텍스트만 뽑아냅니다.
+    - LLM 은 렌더링된 문자열이 그대로 들어옵니다.
+    - Chat 모델은 메시지 리스트를 dumps 한 JSON 이 들어오므로 content 만 이어 붙입니다.
+    """
+    try:
+        messages = json.loads(prompt)
+    except ValueError:
+        return prompt
+    if not isinstance(messages, list):
+        return prompt
+
+    parts = []
+    for message in messages:
+        kwargs = message.get("kwargs", {}) if isinstance(message, dict) else {}
+        content = kwargs.get("content")
+        if isinstance(content, str):
+            parts.append(content)
+    return "\n".join(parts) if parts else prompt
+
+
+# =====================================================
+# 2) LSH 기반 ANN 인덱스
+# =====================================================
+class LSHIndex:
+    """
+    랜덤 하이퍼플레인 LSH 로 구현한 코사인 유사도 ANN 인덱스
+
+    - dim: 벡터 차원
+    - n_tables: 해시 테이블 수 (늘리면 재현율↑, 메모리·조회 비용↑)
+    - n_bits: 테이블당 해시 비트 수 (늘리면 버킷이 잘게 나뉘어 후보 수↓)
+    - 벡터는 정규화해서 저장하므로 내적이 곧 코사인 유사도입니다.
+    """
+
+    def __init__(self, dim: int, *, n_tables: int = 8, n_bits: int = 12, seed: int = 0) -> None:
+        rng = np.random.default_rng(seed)
+        self._planes = rng.standard_normal((n_tables, n_bits, dim)).astype(np.float32)
+        self._powers = (1 << np.arange(n_bits, dtype=np.int64))
+        self._tables: list[dict[int, set[int]]] = [{} for _ in range(n_tables)]
+        self._vectors: dict[int, np.ndarray] = {}
+        self._hashes: dict[int, np.ndarray] = {}
+
+    def _hash(self, vector: np.ndarray) -> np.ndarray:
+        # (n_tables, n_bits) 부호 비트 → 테이블별 정수 버킷 번호
+        bits = (self._planes @ vector) > 0
+        return bits.astype(np.int64) @ self._powers
+
+    def add(self, item_id: int, vector: np.ndarray) -> None:
+        hashes = self._hash(vector)
+        for table, bucket in zip(self._tables, hashes):
+            table.setdefault(int(bucket), set()).add(item_id)
+        self._vectors[item_id] = vector
+        self._hashes[item_id] = hashes
+
+    def remove(self, item_id: int) -> None:
+        hashes = self._hashes.pop(item_id, None)
+        if hashes is None:
+            return
+        del self._vectors[item_id]
+        for table, bucket in zip(self._tables, hashes):
+            members = table.get(int(bucket))
+            if members is not None:
+                members.discard(item_id)
+                if not members:
+                    del table[int(bucket)]
+
+    def search(self, vector: np.ndarray) -> tuple[int, float] | None:
+        """가장 유사한 (item_id, 코사인 유사도) 를 반환합니다. 후보가 없으면 None."""
+        candidates: set[int] = set()
+        for table, bucket in zip(self._tables, self._hash(vector)):
+            candidates |= table.get(int(bucket), set())
+        if not candidates:
+            return None
+
+        ids = list(candidates)
+        matrix = np.stack([self._vectors[i] for i in ids])
+        scores = matrix @ vector
+        best = int(np.argmax(scores))
+        return ids[best], float(scores[best])
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+
+# =====================================================
+# 3) SemanticCache 정의
+# =====================================================
+@dataclass
+class SemanticCacheStats(CacheStats):
+    """CacheStats + semantic_hits (hits 중 exact-match 가 아니라 유사도로 적중한 횟수)"""
+    semantic_hits: int = 0
+
+
+class SemanticCache(BaseCache):
+    """
+    임베딩 유사도로 적중 여부를 판단하는 LLM 캐시
+
+    - embedding: langchain Embeddings 구현체 (embed_query 사용)
+    - threshold: 코사인 유사도 적중 기준 (0~1, 높을수록 엄격)
+    - maxsize: 캐시 전체(모든 llm_string 합계) 최대 항목 수, 넘으면 모델 설정과 상관없이 전역 LRU 순서로 퇴출
+    - n_tables / n_bits: LSHIndex 튜닝 값
+    - 모델 설정이 다르면 응답도 달라야 하므로 llm_string 마다 인덱스를 따로 둡니다.
+    """
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        *,
+        threshold: float = 0.92,
+        maxsize: int = 10_000,
+        n_tables: int = 8,
+        n_bits: int = 12,
+    ) -> None:
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold 는 0보다 크고 1 이하여야 합니다.")
+        if maxsize <= 0:
+            raise ValueError("maxsize 는 0보다 커야 합니다.")
+
+        self._embedding = embedding
+        self._threshold = threshold
+        self._maxsize = maxsize
+        self._n_tables = n_tables
+        self._n_bits = n_bits
+
+        # llm_string -> LSHIndex
+        self._indexes: dict[str, LSHIndex] = {}
+        # item_id -> (llm_string, prompt, return_val), 앞쪽이 LRU
+        self._entries: OrderedDict[int, tuple[str, str, RETURN_VAL_TYPE]] = OrderedDict()
+        # (prompt, llm_string) -> item_id : 임베딩 없이 확인하는 exact-match 경로
+        self._exact: dict[tuple[str, str], int] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._stats = SemanticCacheStats()
+
+    # -------------------------------------------------
+    # 3-1) 내부 헬퍼
+    # -------------------------------------------------
+    def _embed(self, prompt: str) -> np.ndarray:
+        vector = np.asarray(self._embedding.embed_query(prompt_to_text(prompt)), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _index_for(self, llm_string: str, dim: int) -> LSHIndex:
+        index = self._indexes.get(llm_string)
+        if index is None:
+            index = LSHIndex(dim, n_tables=self._n_tables, n_bits=self._n_bits)
+            self._indexes[llm_string] = index
+        return index
+
+    def _remove(self, item_id: int) -> None:
+        llm_string, prompt, _ = self._entries.pop(item_id)
+        self._exact.pop((prompt, llm_string), None)
+        index = self._indexes[llm_string]
+        index.remove(item_id)
+        if not len(index):
+            del self._indexes[llm_string]
+
+    def _hit(self, item_id: int) -> RETURN_VAL_TYPE:
+        self._entries.move_to_end(item_id)
+        self._stats.hits += 1
+        return self._entries[item_id][2]
+
+    # -------------------------------------------------
+    # 3-2) BaseCache 인터페이스 구현
+    # -------------------------------------------------
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        with self._lock:
+            item_id = self._exact.get((prompt, llm_string))
+            if item_id is not None:
+                return self._hit(item_id)
+            if llm_string not in self._indexes:
+                self._stats.misses += 1
+                return None
+
+        # 임베딩 호출은 느릴 수 있으므로 락 밖에서 수행합니다.
+        vector = self._embed(prompt)
+        with self._lock:
+            index = self._indexes.get(llm_string)
+            found = index.search(vector) if index is not None else None
+            if found is None or found[1] < self._threshold or found[0] not in self._entries:
+                self._stats.misses += 1
+                return None
+            self._stats.semantic_hits += 1
+            return self._hit(found[0])
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        vector = self._embed(prompt)
+        with self._lock:
+            old_id = self._exact.get((prompt, llm_string))
+            if old_id is not None:
+                self._remove(old_id)
+
+            item_id = self._next_id
+            self._next_id += 1
+            self._index_for(llm_string, vector.shape[0]).add(item_id, vector)
+            self._entries[item_id] = (llm_string, prompt, return_val)
+            self._exact[(prompt, llm_string)] = item_id
+
+            while len(self._entries) > self._maxsize:
+                self._remove(next(iter(self._entries)))
+                self._stats.evictions += 1
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._indexes.clear()
+            self._entries.clear()
+            self._exact.clear()
+            self._stats.semantic_hits = 0
+
+    @property
+    def semantic_hits(self) -> int:
+        return self._stats.semantic_hits
+
+    def stats(self) -> SemanticCacheStats:
+        """카운터 스냅샷. semantic_hits 는 hits 중 유사도로 적중한 횟수입니다."""
+        with self._lock:
+            return SemanticCacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                entries=len(self._entries),
+                semantic_hits=self._stats.semantic_hits,
+            )
+
+
+# =====================================================
+# 4) 실행 예제
+# =====================================================
+if __name__ == "__main__":
+    import os
+    import time
+
+    from dotenv import load_dotenv
+    from langchain.globals import set_llm_cache
+    from langchain_core.output_parsers import StrOutputParser
+    from langchain_core.prompts import PromptTemplate
+    from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+    load_dotenv()
+    if not os.getenv("OPENAI_API_KEY"):
+        raise RuntimeError("❌ OPENAI_API_KEY가 설정되지 않았습니다.")
+
+    cache = SemanticCache(OpenAIEmbeddings(model="text-embedding-3-small"), threshold=0.9)
+    set_llm_cache(cache)
+
+    llm = ChatOpenAI(model="gpt-4.1-mini")
+    chain = PromptTemplate.from_template("{question}") | llm | StrOutputParser()
+
+    # 표현만 살짝 다른 두 질문 → 두 번째는 시맨틱 히트
+    for question in ["한국에 대해서 200자 내외로 요약해줘", "한국에 대해  200자 정도로 요약해 줘"]:
+        start = time.perf_counter()
+        answer = chain.invoke({"question": question})
+        print(f"[{time.perf_counter() - start:.3f}초] {question} → {answer[:40]}...")
+    print("캐시 통계:", cache.stats())
@@ -0,0 +1,234 @@
+# =====================================================
+# 직렬화 왕복(round-trip) 벤치마크 스위트
+# =====================================================
+# - serialization.py 의 pickle / JSON 경로와 chain_format 바이너리, langgraph 체크포인트 serde 를
+#   같은 워크로드에서 비교합니다.
+# - 워크로드
+#   · chain-N    : prompt | ChatOpenAI | StrOutputParser 가지 N 개를 RunnableParallel 로 묶은 체인 (--chain-sizes)
+#   · messages-N : Human/AI(tool_calls)/Tool 메시지 N 개가 든 그래프 state {"messages": [...]} (--message-counts)
+# - 포맷 (인코딩 → 디코딩)
+#   · dumpd          : dumpd → load            (파이썬 dict, 크기는 같은 dict 의 compact JSON 기준)
+#   · dumps          : dumps → loads           (JSON 문자열)
+#   · json(indent=2) : dumpd + json.dumps(indent=2) → json.loads + load   (serialization.py 저장 방식)
+#   · pickle         : dumpd + pickle → pickle + load                     (serialization.py 저장 방식)
+#   · binary         : chain_format.encode_chain(dumpd) → decode_chain + load
+#   · binary+zstd    : 위와 같고 compress=True (zstandard 가 없으면 zlib 로 압축하므로 이름도 binary+zlib)
+#   · langgraph      : JsonPlusSerializer.dumps_typed → loads_typed (state 전용, 체크포인트가 쓰는 방식)
+# - 지표: 인코딩/디코딩 p50·p95 지연시간, 왕복 처리량(ops/s), 왕복 1회 최대 메모리(tracemalloc), 출력 크기
+# - 회귀 검사
+#   · --save-baseline PATH 로 결과를 기준선으로 저장하고,
+#   · --baseline PATH 로 비교하면 지연시간이 --tolerance 배 이상 느려졌거나 크기가 커진 항목을 표시하고
+#     종료 코드 1 로 끝납니다. (CI 에서 그대로 사용 가능)
+#
+# 실행 예)
+#   python model/serialization_benchmark.py --save-baseline benchmark_results/serialization_baseline.json
+#   python model/serialization_benchmark.py --baseline benchmark_results/serialization_baseline.json
+import argparse
+import json
+import pickle
+import sys
+import time
+import tracemalloc
+import warnings
+from typing import Any, Callable
+
+from langchain_core.load import dumpd, dumps, load, loads
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import RunnableParallel
+from langchain_openai import ChatOpenAI
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from bench_utils import default_report_path, summarize_latencies, write_json_report
+from chain_format import decode_chain, encode_chain
+from compressed_cache import ValueCodec
+
+warnings.simplefilter("ignore")
+
+FAKE_KEY = "sk-placeholder"
+LOAD_KWARGS = {"secrets_map": {"OPENAI_API_KEY": FAKE_KEY}, "allowed_objects": "all"}
+
+
+# =====================================================
+# 1) 워크로드
+# =====================================================
+def make_chain(branches: int):
+    llm = ChatOpenAI(model="gpt-4.1-mini", api_key=FAKE_KEY)
+    return RunnableParallel({
+        f"b{i}": PromptTemplate(template=f"[{i}] {{fruit}}의 색상이 무엇입니까?", input_variables=["fruit"])
+        | llm | StrOutputParser()
+        for i in range(branches)
+    })
+
+
+def make_state(n: int) -> dict:
+    messages = []
+    for i in range(0, n, 3):
+        messages.append(HumanMessage(f"{i}번째 질문: 서울 날씨는 어떤가요?", id=f"h{i}"))
+        messages.append(AIMessage("", id=f"a{i}", tool_calls=[
+            {"name": "get_weather", "args": {"city": "서울", "turn": i}, "id": f"call{i}"}
+        ]))
+        messages.append(ToolMessage(f"서울은 맑음, 기온 {i % 30}도", tool_call_id=f"call{i}", id=f"t{i}"))
+    return {"messages": messages[:n]}
+
+
+# =====================================================
+# 2) 포맷
+# =====================================================
+_serde = JsonPlusSerializer()
+# encode_chain(compress=True) 가 실제로 쓰는 코덱 (zstandard 설치 여부에 따라 zstd / zlib)
+_CODEC = ValueCodec().codec
+
+# 이름 → (인코딩, 디코딩, 크기 계산, state 전용 여부)
+FORMATS: dict[str, tuple[Callable[[Any], Any], Callable[[Any], Any], Callable[[Any], int], bool]] = {
+    "dumpd": (
+        dumpd,
+        lambda d: load(d, **LOAD_KWARGS),
+        lambda d: len(json.dumps(d, ensure_ascii=False, separators=(",", ":")).encode("utf-8")),
+        False,
+    ),
+    "dumps": (
+        dumps,
+        lambda s: loads(s, **LOAD_KWARGS),
+        lambda s: len(s.encode("utf-8")),
+        False,
+    ),
+    "json(indent=2)": (
+        lambda obj: json.dumps(dumpd(obj), ensure_ascii=False, indent=2),
+        lambda s: load(json.loads(s), **LOAD_KWARGS),
+        lambda s: len(s.encode("utf-8")),
+        False,
+    ),
+    "pickle": (
+        lambda obj: pickle.dumps(dumpd(obj)),
+        lambda b: load(pickle.loads(b), **LOAD_KWARGS),
+        len,
+        False,
+    ),
+    "binary": (
+        lambda obj: encode_chain(dumpd(obj)),
+        lambda b: load(decode_chain(b), **LOAD_KWARGS),
+        len,
+        False,
+    ),
+    f"binary+{_CODEC}": (
+        lambda obj: encode_chain(dumpd(obj), compress=True),
+        lambda b: load(decode_chain(b), **LOAD_KWARGS),
+        len,
+        False,
+    ),
+    "langgraph": (
+        _serde.dumps_typed,
+        _serde.loads_typed,
+        lambda typed: len(typed[1]),
+        True,
+    ),
+}
+
+
+# =====================================================
+# 3) 측정
+# =====================================================
+def measure(obj: Any, fmt: str, repeat: int) -> dict:
+    encode, decode, size_of, _ = FORMATS[fmt]
+
+    encoded = encode(obj)
+    decode(encoded)   # 첫 호출의 import·캐시 비용은 측정에서 뺍니다.
+
+    encode_s, decode_s = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        encoded = encode(obj)
+        encode_s.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        decode(encoded)
+        decode_s.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    decode(encode(obj))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "size_bytes": size_of(encoded),
+        "encode": summarize_latencies(encode_s),
+        "decode": summarize_latencies(decode_s),
+        "roundtrip_ops": repeat / (sum(encode_s) + sum(decode_s)),
+        "peak_memory_bytes": peak,
+    }
+
+
+# =====================================================
+# 4) 기준선 비교
+# =====================================================
+def find_regressions(results: list[dict], baseline: list[dict], tolerance: float) -> list[str]:
+    """지연시간(p50)이 tolerance 배 이상이거나 크기가 커진 항목을 문장으로 돌려줍니다."""
+    previous = {(r["workload"], r["format"]): r for r in baseline}
+    problems = []
+    for r in results:
+        old = previous.get((r["workload"], r["format"]))
+        if old is None:
+            continue
+        for phase in ("encode", "decode"):
+            new_ms, old_ms = r[phase]["p50_ms"], old[phase]["p50_ms"]
+            if old_ms > 0 and new_ms > old_ms * tolerance:
+                problems.append(f"{r['workload']}/{r['format']} {phase} p50 {old_ms:.3f} → {new_ms:.3f} ms "
+                                f"({new_ms / old_ms:.2f}x)")
+        if r["size_bytes"] > old["size_bytes"]:
+            problems.append(f"{r['workload']}/{r['format']} size {old['size_bytes']} → {r['size_bytes']} bytes")
+    return problems
+
+
+# =====================================================
+# 5) main
+# =====================================================
+def main():
+    parser = argparse.ArgumentParser(description="직렬화 왕복 벤치마크 스위트")
+    parser.add_argument("--chain-sizes", type=int, nargs="+", default=[1, 8, 32], help="체인 가지 수")
+    parser.add_argument("--message-counts", type=int, nargs="+", default=[100, 1000], help="state 메시지 수")
+    parser.add_argument("--formats", nargs="+", choices=list(FORMATS), default=list(FORMATS))
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", default=None, help="JSON 결과 경로 (기본: benchmark_results/...)")
+    parser.add_argument("--baseline", default=None, help="비교할 기준선 JSON")
+    parser.add_argument("--save-baseline", default=None, help="이번 결과를 기준선으로 저장할 경로")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="p50 이 기준선의 몇 배를 넘으면 회귀로 볼지")
+    args = parser.parse_args()
+
+    workloads = [(f"chain-{n}", make_chain(n), False) for n in args.chain_sizes]
+    workloads += [(f"messages-{n}", make_state(n), True) for n in args.message_counts]
+
+    results = []
+    print(f"{'workload':<14} {'format':<15} {'size(KB)':>9} {'enc p50':>8} {'enc p95':>8} "
+          f"{'dec p50':>8} {'dec p95':>8} {'ops/s':>8} {'peak(KB)':>9}")
+    for workload, obj, is_state in workloads:
+        for fmt in args.formats:
+            if FORMATS[fmt][3] and not is_state:
+                continue
+            r = {"workload": workload, "format": fmt, **measure(obj, fmt, args.repeat)}
+            results.append(r)
+            print(f"{workload:<14} {fmt:<15} {r['size_bytes'] / 1024:>9.1f} "
+                  f"{r['encode']['p50_ms']:>8.3f} {r['encode']['p95_ms']:>8.3f} "
+                  f"{r['decode']['p50_ms']:>8.3f} {r['decode']['p95_ms']:>8.3f} "
+                  f"{r['roundtrip_ops']:>8.0f} {r['peak_memory_bytes'] / 1024:>9.1f}")
+
+    params = {k: v for k, v in vars(args).items() if k not in ("output", "baseline", "save_baseline")}
+    path = write_json_report(args.output or default_report_path("serialization"), "serialization", params, results)
+    print("JSON 결과:", path)
+    if args.save_baseline:
+        print("기준선 저장:", write_json_report(args.save_baseline, "serialization", params, results))
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        problems = find_regressions(results, baseline, args.tolerance)
+        if problems:
+            print(f"\n⚠️ 기준선 대비 회귀 {len(problems)}건")
+            for line in problems:
+                print("  -", line)
+            sys.exit(1)
+        print("\n기준선 대비 회귀 없음")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# =====================================================
+# 해시 샤딩 SQLite LLM 캐시 (여러 DB 파일로 분산)
+# =====================================================
+# - SQLite 는 DB 파일 하나에 쓰기 잠금이 하나뿐이라, 코어가 많아도 쓰기는 한 줄로 서서 기다립니다.
+# - ShardedSQLiteCache 는 키(sha256)를 해시해서 N 개의 독립된 SQLite 파일 중 하나로 보냅니다.
+#   · 샤드마다 자기 커넥션 풀·write-behind 배처·쓰기 잠금을 따로 가짐
+#   · 서로 다른 샤드의 쓰기는 잠금을 기다리지 않고 동시에 진행될 수 있습니다.
+#     처리량이 얼마나 늘어나는지는 CPU 코어 수와 디스크의 병렬 쓰기(fsync) 성능에 달려 있습니다.
+#     (CPU 1개 환경에서는 1/2/4/8 샤드가 1.00/1.06/1.13/0.92배로 거의 늘지 않았습니다. sharded_cache_benchmark.py 로 확인)
+# - 샤드 수를 바꿀 때는 서비스를 내린 상태에서 reshard() 로 새 디렉터리에 다시 나눠 담습니다.
+#   (저장된 키가 이미 sha256 이라 프롬프트 원문 없이도 새 샤드를 계산할 수 있습니다)
+#
+# 디렉터리 구조)
+#   cache/llm_cache_shards/shard-000-of-004.db
+#   cache/llm_cache_shards/shard-001-of-004.db ...
+#
+# 실행 예)
+#   python model/sharded_cache.py reshard cache/llm_cache_shards cache/llm_cache_shards8 8
+import glob
+import os
+import re
+import sqlite3
+from typing import Any, Callable
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+
+from compressed_cache import ValueCodec
+from sqlite_wal_cache import WALSQLiteCache, make_key
+
+SHARD_FILE = "shard-{index:03d}-of-{count:03d}.db"
+SHARD_PATTERN = re.compile(r"shard-(\d{3})-of-(\d{3})\.db$")
+
+
+def shard_for(key: bytes, n_shards: int) -> int:
+    """sha256 키 → 샤드 번호. 키가 이미 균등 분포라 뒤쪽 8바이트의 나머지를 씁니다."""
+    return int.from_bytes(key[-8:], "little") % n_shards
+
+
+def shard_paths(directory: str, n_shards: int) -> list[str]:
+    return [os.path.join(directory, SHARD_FILE.format(index=i, count=n_shards)) for i in range(n_shards)]
+
+
+def detect_shards(directory: str) -> int:
+    """디렉터리에 있는 샤드 파일 이름으로 샤드 수를 알아냅니다. (없으면 0)"""
+    counts = {int(m.group(2)) for p in glob.glob(os.path.join(directory, "shard-*.db"))
+              if (m := SHARD_PATTERN.search(p))}
+    if len(counts) > 1:
+        raise ValueError(f"샤드 수가 다른 파일이 섞여 있습니다: {directory} {sorted(counts)}")
+    return counts.pop() if counts else 0
+
+
+# =====================================================
+# 1) ShardedSQLiteCache 정의
+# =====================================================
+class ShardedSQLiteCache(BaseCache):
+    """
+    키 해시로 N 개의 SQLite 샤드에 나눠 저장하는 캐시
+
+    - directory: 샤드 파일을 둘 디렉터리
+    - n_shards: 샤드 수 (None 이면 디렉터리에 있는 샤드 수, 없으면 4)
+    - shard_factory: 경로 → 샤드 캐시 (기본값 WALSQLiteCache, CompressedSQLiteCache 도 가능)
+    - 디렉터리의 기존 샤드 수와 n_shards 가 다르면 잘못된 샤드를 읽게 되므로 에러를 냅니다.
+    """
+
+    def __init__(
+        self,
+        directory: str = "cache/llm_cache_shards",
+        *,
+        n_shards: int | None = None,
+        shard_factory: Callable[[str], WALSQLiteCache] = WALSQLiteCache,
+        **shard_kwargs: Any,
+    ) -> None:
+        existing = detect_shards(directory)
+        if n_shards is None:
+            n_shards = existing or 4
+        if existing and existing != n_shards:
+            raise ValueError(
+                f"{directory} 에는 샤드 {existing}개가 있습니다. 샤드 수를 바꾸려면 reshard() 를 사용하세요."
+            )
+        if n_shards <= 0:
+            raise ValueError("n_shards 는 0보다 커야 합니다.")
+
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.n_shards = n_shards
+        self.shards = [shard_factory(path, **shard_kwargs) for path in shard_paths(directory, n_shards)]
+
+    def _shard(self, prompt: str, llm_string: str) -> WALSQLiteCache:
+        return self.shards[shard_for(make_key(prompt, llm_string), self.n_shards)]
+
+    # -------------------------------------------------
+    # 1-1) BaseCache 인터페이스 구현
+    # -------------------------------------------------
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        return self._shard(prompt, llm_string).lookup(prompt, llm_string)
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        self._shard(prompt, llm_string).update(prompt, llm_string, return_val)
+
+    def clear(self, **kwargs: Any) -> None:
+        for shard in self.shards:
+            shard.clear(**kwargs)
+
+    def lookup_many(self, pairs: list[tuple[str, str]]) -> list[RETURN_VAL_TYPE | None]:
+        """샤드별로 묶어서 조회합니다. (AsyncIOCache 의 배치 조회와 함께 사용)"""
+        groups: dict[int, list[int]] = {}
+        for position, (prompt, llm_string) in enumerate(pairs):
+            groups.setdefault(shard_for(make_key(prompt, llm_string), self.n_shards), []).append(position)
+
+        results: list[RETURN_VAL_TYPE | None] = [None] * len(pairs)
+        for index, positions in groups.items():
+            values = self.shards[index].lookup_many([pairs[p] for p in positions])
+            for position, value in zip(positions, values):
+                results[position] = value
+        return results
+
+    # -------------------------------------------------
+    # 1-2) 운영용 헬퍼
+    # -------------------------------------------------
+    def flush(self) -> None:
+        for shard in self.shards:
+            shard.flush()
+
+    def close(self) -> None:
+        for shard in self.shards:
+            shard.close()
+
+    def shard_sizes(self) -> list[int]:
+        """샤드별 항목 수 (분포가 고른지 확인용)"""
+        self.flush()
+        sizes = []
+        for shard in self.shards:
+            with shard._pool.connection() as conn:
+                sizes.append(conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0])
+        return sizes
+
+
+# =====================================================
+# 2) 오프라인 리샤딩
+# =====================================================
+def reshard(
+    source_dir: str,
+    target_dir: str,
+    n_shards: int,
+    *,
+    shard_factory: Callable[[str], WALSQLiteCache] = WALSQLiteCache,
+    batch_size: int = 1000,
+) -> dict[str, Any]:
+    """
+    source_dir 의 샤드들을 n_shards 개로 다시 나눠 target_dir 에 씁니다. (서비스 중단 상태에서 실행)
+
+    - 값은 원본 샤드의 압축 사전으로 풀어서, 대상 샤드의 인코딩(압축 설정)으로 다시 저장합니다.
+    - 원본은 건드리지 않으므로, 검증 후 디렉터리를 바꿔치기하면 됩니다.
+    """
+    source_count = detect_shards(source_dir)
+    if not source_count:
+        raise ValueError(f"샤드 파일이 없습니다: {source_dir}")
+    if os.path.abspath(source_dir) == os.path.abspath(target_dir):
+        raise ValueError("source_dir 과 target_dir 은 달라야 합니다.")
+
+    target = ShardedSQLiteCache(target_dir, n_shards=n_shards, shard_factory=shard_factory)
+    # 대상 샤드가 압축 캐시면 그 codec 으로, 아니면 압축 없이 저장
+    encoders = [getattr(shard, "codec", None) for shard in target.shards]
+    buffers: list[list[tuple[bytes, bytes, float]]] = [[] for _ in range(n_shards)]
+    moved = 0
+
+    def flush_buffer(index: int) -> None:
+        with target.shards[index]._pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at) VALUES (?, ?, ?)",
+                buffers[index],
+            )
+            conn.execute("COMMIT")
+        buffers[index].clear()
+
+    for path in shard_paths(source_dir, source_count):
+        source = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        tables = {row[0] for row in source.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        reader = ValueCodec("zlib")
+        if "cache_dicts" in tables:
+            for dict_id, data in source.execute("SELECT id, data FROM cache_dicts"):
+                reader.add_dictionary(dict_id, data, activate=False)
+
+        for key, value, created_at in source.execute("SELECT key, value, created_at FROM llm_cache"):
+            index = shard_for(key, n_shards)
+            raw = reader.decompress(value)
+            encoder = encoders[index]
+            buffers[index].append((key, encoder.compress(raw) if encoder else raw, created_at))
+            if len(buffers[index]) >= batch_size:
+                flush_buffer(index)
+            moved += 1
+        source.close()
+
+    for index in range(n_shards):
+        if buffers[index]:
+            flush_buffer(index)
+    sizes = target.shard_sizes()
+    target.close()
+    return {"moved": moved, "shard_sizes": sizes}
+
+
+# =====================================================
+# 3) main: 리샤딩 실행
+# =====================================================
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) == 5 and sys.argv[1] == "reshard":
+        result = reshard(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+        print(f"{result['moved']}건 이동, 샤드별 항목 수: {result['shard_sizes']}")
+    else:
+        print("사용법: python model/sharded_cache.py reshard <원본 디렉터리> <대상 디렉터리> <샤드 수>")
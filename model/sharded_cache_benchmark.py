@@ -0,0 +1,68 @@
+# =====================================================
+# 샤드 수에 따른 쓰기 처리량 확장성 벤치마크
+# =====================================================
+# - --writers 개의 프로세스가 동시에 ShardedSQLiteCache 에 update 합니다.
+# - 샤드 수를 1 / 2 / 4 / 8 로 바꿔 가며 전체 쓰기 처리량(ops/s)과 1샤드 대비 배율을 봅니다.
+# - batch_size=1 로 항목마다 커밋하게 만들어, 배치 효과가 아닌 "잠금 분산" 효과만 측정합니다.
+#   (--batch-size 로 바꿀 수 있음)
+#
+# 실행 예)
+#   python model/sharded_cache_benchmark.py --writers 8 --shards 1 2 4 8
+import argparse
+import tempfile
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+from langchain_core.outputs import Generation
+
+from sharded_cache import ShardedSQLiteCache
+
+warnings.simplefilter("ignore")
+
+LLM_STRING = "benchmark-llm"
+ANSWER = "대한민국은 동아시아의 한반도 남부에 위치한 민주공화국입니다. " * 8
+
+
+def run_writer(directory: str, n_shards: int, writer_id: int, ops: int, batch_size: int) -> float:
+    """update ops 번 + 마지막 커밋까지 걸린 시간(초)"""
+    cache = ShardedSQLiteCache(directory, n_shards=n_shards, batch_size=batch_size, flush_interval=0)
+    value = [Generation(text=ANSWER)]
+    start = time.perf_counter()
+    for i in range(ops):
+        cache.update(f"writer{writer_id}-q{i}", LLM_STRING, value)
+    cache.flush()
+    elapsed = time.perf_counter() - start
+    cache.close()
+    return elapsed
+
+
+def bench(n_shards: int, writers: int, ops: int, batch_size: int) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        # 샤드 파일과 스키마를 미리 만들어 둡니다.
+        ShardedSQLiteCache(tmp, n_shards=n_shards).close()
+        with ProcessPoolExecutor(max_workers=writers) as pool:
+            futures = [pool.submit(run_writer, tmp, n_shards, w, ops, batch_size) for w in range(writers)]
+            slowest = max(f.result() for f in futures)
+    return writers * ops / slowest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="샤드 수별 SQLite 캐시 쓰기 확장성 벤치마크")
+    parser.add_argument("--writers", type=int, default=8, help="동시 쓰기 프로세스 수")
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--ops", type=int, default=500, help="프로세스당 update 수")
+    parser.add_argument("--batch-size", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"쓰기 프로세스 {args.writers}개, 프로세스당 {args.ops}건, batch_size={args.batch_size}")
+    print(f"{'shards':>6} {'update ops/s':>14} {'배율':>7}")
+    baseline = None
+    for n_shards in args.shards:
+        ops_per_sec = bench(n_shards, args.writers, args.ops, args.batch_size)
+        baseline = baseline or ops_per_sec
+        print(f"{n_shards:>6} {ops_per_sec:>14,.0f} {ops_per_sec / baseline:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
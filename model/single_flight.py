@@ -0,0 +1,182 @@
+# =====================================================
+# Single-flight: 동일한 동시 호출을 하나의 LLM 호출로 합치기
+# =====================================================
+# - 캐시는 "이미 저장된" 응답만 돌려줍니다. 같은 입력이 동시에 여러 번 들어오면
+#   모두 캐시 미스가 나고, 각자 API 를 호출합니다(thundering herd).
+# - SingleFlight 는 체인을 감싸서, 같은 키의 호출이 진행 중이면
+#   새 호출을 보내지 않고 진행 중인 호출(leader)의 결과를 함께 받습니다.
+#   · 동기 invoke 와 비동기 ainvoke 를 모두 지원하며, 둘이 섞여도 같은 호출을 공유합니다.
+#   · leader 가 예외로 끝나면 기다리던 호출(follower)도 같은 예외를 받습니다.
+#   · leader 가 취소(cancel)되면 follower 중 하나가 새 leader 가 되어 다시 호출합니다.
+# - 결과를 저장하지는 않으므로 set_llm_cache 로 설정한 캐시와 함께 쓰면 됩니다.
+import asyncio
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable
+
+from langchain_core.runnables import Runnable, RunnableConfig
+
+
+class _LeaderCancelled(Exception):
+    """leader 가 결과 없이 취소되었음을 follower 에게 알리는 내부 예외"""
+
+
+# =====================================================
+# 1) 기본 키 함수
+# =====================================================
+def default_key(input: Any, config: RunnableConfig | None = None, kwargs: dict[str, Any] | None = None) -> str:
+    """
+    체인 입력 · config["configurable"] · 호출 kwargs 로 키를 만듭니다.
+    - 입력이 같아도 configurable(모델 · temperature 등)이나 kwargs(stop 등)가 다르면 다른 키가 되어 합쳐지지 않습니다.
+    - callbacks · tags 등 나머지 config 는 결과에 영향을 주지 않으므로 키에 넣지 않습니다.
+    - dict 는 키 순서와 관계없이 같은 키가 되도록 sort_keys 로 직렬화합니다.
+    - JSON 으로 바꿀 수 없는 값(메시지 객체 등)은 repr 로 대신합니다.
+    """
+    configurable = (config or {}).get("configurable") or {}
+    raw = json.dumps([input, configurable, kwargs or {}], sort_keys=True, ensure_ascii=False, default=repr)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# =====================================================
+# 2) SingleFlight 정의
+# =====================================================
+class SingleFlight(Runnable):
+    """
+    같은 키의 동시 호출을 하나로 합쳐 실행하는 Runnable 래퍼
+
+    - runnable: 감쌀 체인 (예: prompt | llm | StrOutputParser())
+    - key_fn: (input, config, kwargs) → 키 함수 (기본값 default_key)
+      직접 넘길 때는 config["configurable"] 와 kwargs 도 키에 반영해야 합니다.
+      그렇지 않으면 모델 · stop 등이 다른 호출이 하나로 합쳐져 한쪽이 다른 설정의 결과를 받습니다.
+    사용 예)
+        chain = SingleFlight(prompt | llm | StrOutputParser())
+        chain.invoke({"country": "한국"})
+    """
+
+    def __init__(self, runnable: Runnable, *,
+                 key_fn: Callable[[Any, RunnableConfig | None, dict[str, Any]], str] = default_key) -> None:
+        self.runnable = runnable
+        self.key_fn = key_fn
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        # leaders: 실제 호출 수, coalesced: 다른 호출의 결과를 공유받은 수
+        self.leaders = 0
+        self.coalesced = 0
+
+    @property
+    def InputType(self):
+        return self.runnable.InputType
+
+    @property
+    def OutputType(self):
+        return self.runnable.OutputType
+
+    # -------------------------------------------------
+    # 2-1) 진행 중 호출 등록/해제
+    # -------------------------------------------------
+    def _join(self, key: str) -> tuple[Future, bool]:
+        """(future, leader 여부). 진행 중인 호출이 없으면 새로 등록하고 leader 가 됩니다."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = Future()
+            self._inflight[key] = future
+            self.leaders += 1
+            return future, True
+
+    def _finish(self, key: str, future: Future) -> None:
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    # -------------------------------------------------
+    # 2-2) 동기 호출
+    # -------------------------------------------------
+    def invoke(self, input: Any, config: RunnableConfig | None = None, **kwargs: Any) -> Any:
+        key = self.key_fn(input, config, kwargs)
+        while True:
+            future, leader = self._join(key)
+            if not leader:
+                try:
+                    return future.result()
+                except _LeaderCancelled:
+                    continue  # 새 leader 를 뽑아 다시 시도
+
+            try:
+                result = self.runnable.invoke(input, config, **kwargs)
+            except BaseException as exc:
+                future.set_exception(exc if isinstance(exc, Exception) else _LeaderCancelled())
+                raise
+            else:
+                future.set_result(result)
+                return result
+            finally:
+                self._finish(key, future)
+
+    # -------------------------------------------------
+    # 2-3) 비동기 호출
+    # -------------------------------------------------
+    async def ainvoke(self, input: Any, config: RunnableConfig | None = None, **kwargs: Any) -> Any:
+        key = self.key_fn(input, config, kwargs)
+        while True:
+            future, leader = self._join(key)
+            if not leader:
+                try:
+                    # shield: follower 가 취소돼도 공유 future 자체는 취소되지 않게 합니다.
+                    return await asyncio.shield(asyncio.wrap_future(future))
+                except _LeaderCancelled:
+                    continue
+
+            try:
+                result = await self.runnable.ainvoke(input, config, **kwargs)
+            except asyncio.CancelledError:
+                future.set_exception(_LeaderCancelled())
+                raise
+            except Exception as exc:
+                future.set_exception(exc)
+                raise
+            else:
+                future.set_result(result)
+                return result
+            finally:
+                self._finish(key, future)
+
+
+# =====================================================
+# 3) 간단 실행 예제 (API 키 없이 동작)
+# =====================================================
+if __name__ == "__main__":
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    from langchain_core.runnables import RunnableLambda
+
+    calls = {"count": 0}
+
+    def slow_llm(inputs: dict) -> str:
+        calls["count"] += 1
+        time.sleep(0.5)   # LLM 응답 지연을 흉내냄
+        return f"{inputs['country']} 요약"
+
+    async def aslow_llm(inputs: dict) -> str:
+        calls["count"] += 1
+        await asyncio.sleep(0.5)
+        return f"{inputs['country']} 요약"
+
+    chain = SingleFlight(RunnableLambda(slow_llm, afunc=aslow_llm))
+
+    # 동기: 스레드 20개가 동시에 같은 입력으로 호출
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        results = list(pool.map(lambda _: chain.invoke({"country": "한국"}), range(20)))
+    print("sync  결과:", set(results), "실제 호출 수:", calls["count"])
+
+    # 비동기: 코루틴 20개가 동시에 같은 입력으로 호출
+    async def run_async():
+        return await asyncio.gather(*(chain.ainvoke({"country": "일본"}) for _ in range(20)))
+
+    print("async 결과:", set(asyncio.run(run_async())), "실제 호출 수:", calls["count"])
+    print(f"leaders={chain.leaders}, coalesced={chain.coalesced}")
@@ -0,0 +1,130 @@
+# =====================================================
+# SQLite 캐시 동시 쓰기 벤치마크
+# =====================================================
+# - SQLiteCache(langchain_community) 와 WALSQLiteCache 를 같은 조건에서 비교합니다.
+# - 동시 작성자(writer) 수를 1 / 8 / 32 로 바꿔 가며 update, lookup 처리량(ops/s)을 측정합니다.
+# - 작성자는 기본적으로 프로세스입니다(--mode thread 로 스레드 비교도 가능).
+#   각 작성자는 자기 키 구간에 --ops 번 update 한 뒤, 같은 키를 --ops 번 lookup 합니다.
+#
+# 실행 예)
+#   python model/sqlite_cache_benchmark.py
+#   python model/sqlite_cache_benchmark.py --writers 1 8 32 --ops 500 --mode thread
+import argparse
+import os
+import tempfile
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from langchain_core.outputs import Generation
+
+from sqlite_wal_cache import WALSQLiteCache
+
+LLM_STRING = "benchmark-llm"
+ANSWER = "대한민국은 동아시아의 한반도 남부에 위치한 민주공화국입니다. " * 8
+
+# langchain_core.load.loads 의 beta 경고가 조회마다 출력되지 않도록 끕니다.
+warnings.simplefilter("ignore")
+
+
+# =====================================================
+# 1) 캐시 생성 (프로세스/스레드 안에서 호출)
+# =====================================================
+def make_cache(backend: str, path: str):
+    if backend == "sqlite":
+        from langchain_community.cache import SQLiteCache
+        return SQLiteCache(database_path=path)
+    return WALSQLiteCache(path, pool_size=8)
+
+
+def close_cache(cache) -> None:
+    # WALSQLiteCache 는 남은 write-behind 쓰기를 모두 커밋한 뒤 닫습니다.
+    if isinstance(cache, WALSQLiteCache):
+        cache.close()
+
+
+# =====================================================
+# 2) 작성자 1명의 작업
+# =====================================================
+def run_writer(backend: str, path: str, writer_id: int, ops: int, cache=None) -> tuple[float, float]:
+    """(update 소요 시간, lookup 소요 시간) 을 반환합니다."""
+    own_cache = cache is None
+    cache = cache or make_cache(backend, path)
+    prompts = [f"writer{writer_id}-q{i}" for i in range(ops)]
+    value = [Generation(text=ANSWER)]
+
+    start = time.perf_counter()
+    for prompt in prompts:
+        cache.update(prompt, LLM_STRING, value)
+    if isinstance(cache, WALSQLiteCache):
+        cache.flush()   # 처리량에는 실제 커밋까지 포함합니다.
+    update_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for prompt in prompts:
+        cache.lookup(prompt, LLM_STRING)
+    lookup_time = time.perf_counter() - start
+
+    if own_cache:
+        close_cache(cache)
+    return update_time, lookup_time
+
+
+# =====================================================
+# 3) 동시 작성자 N명 실행
+# =====================================================
+def bench(backend: str, writers: int, ops: int, mode: str) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, f"{backend}.db")
+        # 스키마를 미리 만들어 두어 작성자들이 테이블 생성에서 경합하지 않게 합니다.
+        close_cache(make_cache(backend, path))
+
+        start = time.perf_counter()
+        if mode == "process":
+            with ProcessPoolExecutor(max_workers=writers) as pool:
+                futures = [pool.submit(run_writer, backend, path, w, ops) for w in range(writers)]
+                results = [f.result() for f in futures]
+        else:
+            # 스레드 모드: 한 프로세스 안에서 캐시 객체 하나를 공유
+            cache = make_cache(backend, path)
+            with ThreadPoolExecutor(max_workers=writers) as pool:
+                futures = [pool.submit(run_writer, backend, path, w, ops, cache) for w in range(writers)]
+                results = [f.result() for f in futures]
+            close_cache(cache)
+        wall = time.perf_counter() - start
+
+    total = writers * ops
+    # 작성자들이 동시에 돌았으므로 가장 느린 작성자 기준으로 처리량을 계산합니다.
+    update_time = max(r[0] for r in results)
+    lookup_time = max(r[1] for r in results)
+    return {
+        "backend": backend,
+        "writers": writers,
+        "update_ops": total / update_time,
+        "lookup_ops": total / lookup_time,
+        "wall": wall,
+    }
+
+
+# =====================================================
+# 4) main
+# =====================================================
+def main():
+    parser = argparse.ArgumentParser(description="SQLite LLM 캐시 동시성 벤치마크")
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--ops", type=int, default=300, help="작성자당 update/lookup 횟수")
+    parser.add_argument("--mode", choices=["process", "thread"], default="process")
+    parser.add_argument("--backends", nargs="+", choices=["sqlite", "wal"], default=["sqlite", "wal"])
+    args = parser.parse_args()
+
+    print(f"mode={args.mode}, 작성자당 ops={args.ops}")
+    print(f"{'backend':<8} {'writers':>7} {'update ops/s':>14} {'lookup ops/s':>14} {'wall(s)':>8}")
+    for writers in args.writers:
+        for backend in args.backends:
+            r = bench(backend, writers, args.ops, args.mode)
+            print(f"{r['backend']:<8} {r['writers']:>7} {r['update_ops']:>14,.0f} "
+                  f"{r['lookup_ops']:>14,.0f} {r['wall']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,405 @@
+# =====================================================
+# 동시성에 강한 SQLite LLM 캐시 (WAL + 커넥션 풀 + write-behind 배치 쓰기)
+# =====================================================
+# - langchain_community 의 SQLiteCache 는 update 때마다 세션을 열고 커밋하므로
+#   여러 워커 프로세스가 같은 DB 파일을 공유하면 쓰기마다 DB 전체 잠금이 걸립니다.
+# - WALSQLiteCache 는 다음 세 가지로 이를 줄입니다.
+#   1) WAL(Write-Ahead Logging) 모드 : 읽기와 쓰기가 서로를 막지 않음
+#   2) 프로세스별 커넥션 풀 : 스레드마다 커넥션을 새로 열지 않고 재사용
+#      (fork 된 자식 프로세스는 부모의 커넥션을 쓰지 않고 새 풀을 만듭니다)
+#   3) write-behind 배처 : update 는 큐에 넣고 바로 반환,
+#      백그라운드 스레드가 여러 항목을 모아 트랜잭션 하나로 커밋
+#      (큐는 max_queue 로 제한, 가득 차면 update 가 기다림 / 커밋 실패는 재시도 후 flush() 에서 예외로 알림)
+#      (fork 된 자식 프로세스는 부모의 큐 · 배처 스레드를 물려받지 못하므로 자기 것을 새로 만듭니다)
+# - 아직 커밋되지 않은 항목도 같은 프로세스에서는 바로 조회됩니다(read-your-writes).
+import hashlib
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import Generation
+
+logger = logging.getLogger(__name__)
+
+
+# =====================================================
+# 1) 키 / 값 직렬화
+# =====================================================
+def make_key(prompt: str, llm_string: str) -> bytes:
+    """(prompt, llm_string) 을 고정 길이 32바이트 키로 만듭니다."""
+    digest = hashlib.sha256()
+    digest.update(prompt.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(llm_string.encode("utf-8"))
+    return digest.digest()
+
+
+def dump_generations(return_val: RETURN_VAL_TYPE) -> bytes:
+    return dumps(list(return_val)).encode("utf-8")
+
+
+def load_generations(data: bytes) -> RETURN_VAL_TYPE:
+    try:
+        return loads(data.decode("utf-8"))
+    except Exception:
+        # 역직렬화가 안 되면 SQLiteCache 와 같이 원문 텍스트로 취급합니다.
+        return [Generation(text=data.decode("utf-8", errors="replace"))]
+
+
+# =====================================================
+# 2) 프로세스별 SQLite 커넥션 풀
+# =====================================================
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key        BLOB PRIMARY KEY,
+    value      BLOB NOT NULL,
+    created_at REAL NOT NULL
+) WITHOUT ROWID
+"""
+
+
+class SQLiteConnectionPool:
+    """
+    WAL 모드로 설정된 SQLite 커넥션을 최대 size 개까지 재사용하는 풀
+
+    - busy_timeout: 다른 프로세스가 쓰기 잠금을 잡고 있을 때 기다리는 시간(ms)
+    - synchronous=NORMAL: WAL 모드에서는 커밋마다 fsync 하지 않아도 DB 가 깨지지 않습니다.
+    """
+
+    def __init__(self, database_path: str, *, size: int = 8, busy_timeout: int = 5000) -> None:
+        if size <= 0:
+            raise ValueError("size 는 0보다 커야 합니다.")
+        self.database_path = database_path
+        self.size = size
+        self.busy_timeout = busy_timeout
+        self._pid = os.getpid()
+        self._idle: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(database_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self.connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None → 트랜잭션을 BEGIN/COMMIT 으로 직접 제어
+        conn = sqlite3.connect(
+            self.database_path,
+            timeout=self.busy_timeout / 1000,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        conn.execute(f"PRAGMA busy_timeout={self.busy_timeout}")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reset_after_fork(self) -> None:
+        # 부모 프로세스에서 연 커넥션은 fork 이후 공유하면 안 되므로 버리고 새로 시작합니다.
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        if os.getpid() != self._pid:
+            self._reset_after_fork()
+
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            # 풀이 가득 찼다면 다른 스레드가 반납할 때까지 기다립니다.
+            conn = self._connect() if can_create else self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        self._created = 0
+
+
+# =====================================================
+# 3) write-behind 배처
+# =====================================================
+class WriteBehindBatcher:
+    """
+    쓰기 요청을 큐에 모았다가 백그라운드 스레드에서 한 트랜잭션으로 커밋합니다.
+
+    - batch_size: 한 트랜잭션에 담을 최대 항목 수
+    - flush_interval: 첫 항목이 들어온 뒤 배치를 모으는 최대 대기 시간(초)
+    - max_queue: 커밋을 기다리는 최대 항목 수, 가득 차면 submit 이 자리가 날 때까지 기다립니다(역압).
+    - retries: 커밋 실패 시 재시도 횟수. 그래도 실패하면 그 배치는 버리고 on_failed 를 호출하며,
+      다음 flush() 가 마지막 예외를 다시 올립니다.
+    - on_written / on_failed: 커밋이 끝난 / 버려진 (key, value) 목록을 받는 콜백 (pending 정리에 사용)
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        pool: SQLiteConnectionPool,
+        *,
+        batch_size: int = 256,
+        flush_interval: float = 0.05,
+        max_queue: int = 10_000,
+        retries: int = 2,
+        on_written=None,
+        on_failed=None,
+    ) -> None:
+        self._pool = pool
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._retries = retries
+        self._on_written = on_written
+        self._on_failed = on_failed
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self.batches = 0
+        self.rows = 0
+        self.failed_rows = 0
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=self._run, name="sqlite-write-behind", daemon=True)
+        self._thread.start()
+
+    def submit(self, key: bytes, value: bytes) -> None:
+        self._queue.put((key, value, time.time()))
+
+    def flush(self) -> None:
+        """지금까지 submit 된 항목이 모두 커밋될 때까지 기다립니다. 그 사이 버려진 배치가 있으면 예외를 올립니다."""
+        self._queue.join()
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def close(self) -> None:
+        self._queue.put(self._STOP)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                self._queue.task_done()
+                return
+
+            batch = [item]
+            deadline = time.monotonic() + self._flush_interval
+            stop = False
+            while len(batch) < self._batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    nxt = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if nxt is self._STOP:
+                    stop = True
+                    break
+                batch.append(nxt)
+
+            try:
+                self._write_with_retry(batch)
+            except Exception as exc:
+                # 쓰기 실패가 배처 스레드를 죽이지 않도록 배치를 버리고 계속 진행합니다.
+                logger.exception("write-behind 배치 커밋 실패 (%d건), 버림", len(batch))
+                self.failed_rows += len(batch)
+                self._error = exc
+                if self._on_failed is not None:
+                    self._on_failed([(key, value) for key, value, _ in batch])
+            finally:
+                for _ in range(len(batch) + stop):
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _write_with_retry(self, batch: list[tuple[bytes, bytes, float]]) -> None:
+        for attempt in range(self._retries + 1):
+            try:
+                self._write(batch)
+                return
+            except sqlite3.Error:
+                # database is locked 처럼 잠깐 뒤에 풀리는 오류를 위해 간격을 늘려가며 다시 시도합니다.
+                if attempt == self._retries:
+                    raise
+                time.sleep(0.05 * 2 ** attempt)
+
+    def _write(self, batch: list[tuple[bytes, bytes, float]]) -> None:
+        with self._pool.connection() as conn:
+            # BEGIN IMMEDIATE: 쓰기 잠금을 트랜잭션 시작 시점에 잡아 교착을 피합니다.
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO llm_cache (key, value, created_at) VALUES (?, ?, ?)",
+                    batch,
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        self.batches += 1
+        self.rows += len(batch)
+        if self._on_written is not None:
+            self._on_written([(key, value) for key, value, _ in batch])
+
+
+# =====================================================
+# 4) WALSQLiteCache 정의
+# =====================================================
+class WALSQLiteCache(BaseCache):
+    """
+    여러 스레드·프로세스가 공유해도 잠금 경합이 적은 SQLite LLM 캐시
+
+    - database_path: SQLite 파일 경로 (디렉터리가 없으면 생성)
+    - pool_size: 프로세스당 최대 커넥션 수
+    - batch_size / flush_interval / max_queue: write-behind 배치 크기, 대기 시간, 큐 상한
+    - 프로세스 종료 전에 close() (또는 flush()) 를 호출하면 남은 쓰기가 모두 커밋됩니다.
+    """
+
+    def __init__(
+        self,
+        database_path: str = "cache/llm_cache_wal.db",
+        *,
+        pool_size: int = 8,
+        batch_size: int = 256,
+        flush_interval: float = 0.05,
+        max_queue: int = 10_000,
+    ) -> None:
+        self.database_path = database_path
+        self._pool = SQLiteConnectionPool(database_path, size=pool_size)
+        self._batcher_options = {"batch_size": batch_size, "flush_interval": flush_interval, "max_queue": max_queue}
+        self._start_writer()
+
+    def _start_writer(self) -> None:
+        self._pid = os.getpid()
+        # 아직 커밋되지 않은 쓰기: key -> value (같은 프로세스에서는 바로 조회 가능)
+        self._pending: dict[bytes, bytes] = {}
+        self._pending_lock = threading.Lock()
+        self._batcher = WriteBehindBatcher(
+            self._pool,
+            **self._batcher_options,
+            on_written=self._forget_pending,
+            on_failed=self._forget_pending,
+        )
+
+    def _check_fork(self) -> None:
+        # fork 된 자식에는 배처 스레드가 없어 큐에 넣은 항목이 커밋되지 않고 flush() 가 영원히 기다립니다.
+        # 부모의 pending 은 부모가 커밋하므로 자식은 빈 pending 과 새 배처로 시작합니다.
+        if os.getpid() != self._pid:
+            self._start_writer()
+
+    # -------------------------------------------------
+    # 4-1) 값 인코딩 (하위 클래스에서 압축 등으로 바꿀 수 있음)
+    # -------------------------------------------------
+    def _encode(self, return_val: RETURN_VAL_TYPE) -> bytes:
+        return dump_generations(return_val)
+
+    def _decode(self, data: bytes) -> RETURN_VAL_TYPE:
+        return load_generations(data)
+
+    def _forget_pending(self, done: list[tuple[bytes, bytes]]) -> None:
+        with self._pending_lock:
+            for key, value in done:
+                # 그 사이 같은 키가 다시 갱신됐다면 최신 값은 남겨둡니다.
+                if self._pending.get(key) is value:
+                    del self._pending[key]
+
+    # -------------------------------------------------
+    # 4-2) BaseCache 인터페이스 구현
+    # -------------------------------------------------
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        self._check_fork()
+        key = make_key(prompt, llm_string)
+        with self._pending_lock:
+            data = self._pending.get(key)
+        if data is None:
+            with self._pool.connection() as conn:
+                row = conn.execute("SELECT value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            data = row[0]
+        return self._decode(data)
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        self._check_fork()
+        key = make_key(prompt, llm_string)
+        value = self._encode(return_val)
+        with self._pending_lock:
+            self._pending[key] = value
+        self._batcher.submit(key, value)
+
+    def lookup_many(self, pairs: list[tuple[str, str]]) -> list[RETURN_VAL_TYPE | None]:
+        """여러 (prompt, llm_string) 을 SELECT 한 번으로 조회합니다. 결과 순서는 입력 순서와 같습니다."""
+        self._check_fork()
+        keys = [make_key(prompt, llm_string) for prompt, llm_string in pairs]
+        with self._pending_lock:
+            found = {key: self._pending[key] for key in keys if key in self._pending}
+        missing = list({key for key in keys if key not in found})
+        # SQLite 바인딩 변수 개수 제한(기본 999)을 넘지 않도록 나눠서 조회합니다.
+        for start in range(0, len(missing), 500):
+            chunk = missing[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            with self._pool.connection() as conn:
+                rows = conn.execute(
+                    f"SELECT key, value FROM llm_cache WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+            found.update(rows)
+        return [self._decode(found[key]) if key in found else None for key in keys]
+
+    def clear(self, **kwargs: Any) -> None:
+        # 대기 중인 쓰기를 먼저 비워야 DELETE 뒤에 옛 항목이 다시 써지지 않습니다.
+        # 앞서 버려진 배치의 예외는 이미 로그로 남았고 어차피 지울 항목이라 DELETE 를 막지 않습니다.
+        try:
+            self.flush()
+        except Exception as exc:
+            logger.warning("clear 전 flush 에서 이전 쓰기 실패를 무시합니다: %s", exc)
+        with self._pool.connection() as conn:
+            conn.execute("DELETE FROM llm_cache")
+
+    # -------------------------------------------------
+    # 4-3) 운영용 헬퍼
+    # -------------------------------------------------
+    def flush(self) -> None:
+        """대기 중인 쓰기를 모두 커밋합니다. 재시도 후에도 커밋하지 못한 배치가 있었으면 그 예외를 올립니다."""
+        self._check_fork()
+        self._batcher.flush()
+
+    def close(self) -> None:
+        self._check_fork()
+        self._batcher.close()
+        self._pool.close()
+
+    def write_stats(self) -> dict[str, int]:
+        """커밋된 배치 수와 행 수 (행/배치 비율이 클수록 배치 효과가 큼), 커밋하지 못하고 버린 행 수"""
+        return {"batches": self._batcher.batches, "rows": self._batcher.rows, "failed_rows": self._batcher.failed_rows}
+
+
+# =====================================================
+# 5) 간단 실행 예제 (API 키 없이 동작)
+# =====================================================
+if __name__ == "__main__":
+    cache = WALSQLiteCache("cache/llm_cache_wal.db")
+    cache.update("한국에 대해서 200자 내외로 요약해줘", "llm", [Generation(text="대한민국은 ...")])
+    print("커밋 전 조회:", cache.lookup("한국에 대해서 200자 내외로 요약해줘", "llm"))
+    cache.flush()
+    print("쓰기 통계:", cache.write_stats())
+    cache.close()
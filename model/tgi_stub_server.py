@@ -0,0 +1,255 @@
+# =====================================================
+# 로컬 텍스트 생성 서버 (Text Generation Inference 호환 스텁)
+# =====================================================
+# - huggingface_endpoints.py 의 HuggingFaceEndpoint 부하 테스트를 네트워크·토큰·비용 없이 돌리기 위한 서버입니다.
+# - Hugging Face TGI(Text Generation Inference) 의 요청/응답 형식을 따릅니다.
+#   · POST /          {"inputs": str, "parameters": {...}} → [{"generated_text": str}]
+#   · POST /generate  {"inputs": str, "parameters": {...}} → {"generated_text": str}
+#   · POST /generate_stream (또는 "/" 에 "stream": true) → SSE 로 토큰을 하나씩 전송
+#     data:{"index": i, "token": {"id", "text", "logprob", "special"}, "generated_text": null | str, "details": null}
+#     클라이언트가 중간에 연결을 끊으면 생성을 멈추고 stats.cancelled 로 셉니다.
+#   · POST /generate_batch {"inputs": [str, ...], "parameters": {...}} → [{"generated_text": str}, ...]
+#     (TGI 에는 없는 경로. 여러 프롬프트를 한 번의 forward 로 처리하는 배치 서버를 흉내 냅니다)
+#   · GET  /stats     누적 요청 수 / 새 TCP 연결 수 (keep-alive 효과 확인용)
+#   · GET  /health
+# - 응답 지연은 latency(요청당 고정) + token_latency × 생성 토큰 수 로 조절합니다.
+#   · 스트리밍은 latency 뒤에 첫 토큰, 이후 token_latency 마다 한 토큰씩 보냅니다.
+#   · 배치 요청은 한 번의 latency 에 항목당 batch_item_latency 만 더해집니다.
+#   · max_concurrency 를 주면 GPU 처럼 동시에 그만큼의 요청(배치)만 처리하고 나머지는 줄을 섭니다.
+#   같은 inputs 에는 항상 같은 텍스트를 돌려줍니다. (fake_llm.WORDS 사용)
+# - 벤치마크에서는 start_in_thread() 로 같은 프로세스의 백그라운드 스레드에 띄웁니다.
+#
+# 실행 예)
+#   python model/tgi_stub_server.py --port 8080 --latency 0.05 --token-latency 0.001
+#   → HuggingFaceEndpoint(endpoint_url="http://127.0.0.1:8080", max_new_tokens=256)
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import json
+import random
+import threading
+import weakref
+from dataclasses import dataclass
+
+from aiohttp import web
+
+from fake_llm import WORDS
+
+
+# =====================================================
+# 1) 서버 설정 / 통계
+# =====================================================
+@dataclass
+class StubConfig:
+    """응답 지연 설정 (초)"""
+    latency: float = 0.05
+    token_latency: float = 0.0
+    jitter: float = 0.0            # 요청마다 latency 에 0~jitter 초를 더함
+    default_new_tokens: int = 64
+    batch_item_latency: float = 0.0  # 배치 요청에서 항목 하나당 더해지는 지연
+    max_concurrency: int | None = None  # 동시에 처리하는 요청(배치) 수, None 이면 무제한
+
+
+@dataclass
+class ServerStats:
+    requests: int = 0
+    connections: int = 0
+    prompts: int = 0   # 배치 요청 안의 프롬프트까지 센 수
+    streamed_tokens: int = 0
+    cancelled: int = 0   # 클라이언트가 끊어 중간에 멈춘 스트림 수
+
+
+def generate_tokens(inputs: str, max_new_tokens: int) -> list[str]:
+    """입력 해시로 단어를 골라 항상 같은 토큰 목록을 만듭니다."""
+    seed = hashlib.sha256(inputs.encode("utf-8")).digest()
+    return [(" " if i else "") + WORDS[seed[i % len(seed)] % len(WORDS)] for i in range(max_new_tokens)]
+
+
+# =====================================================
+# 2) 핸들러
+# =====================================================
+class TGIStubServer:
+    """
+    aiohttp 로 구현한 TGI 호환 스텁 서버
+
+    - config: StubConfig (실행 중에 바꿔도 다음 요청부터 반영)
+    - stats: 누적 요청 수 / 새 연결 수
+    """
+
+    def __init__(self, config: StubConfig | None = None) -> None:
+        self.config = config or StubConfig()
+        self.stats = ServerStats()
+        self._seen_transports: weakref.WeakSet = weakref.WeakSet()
+        self._slots: asyncio.Semaphore | None = None
+        self.app = web.Application()
+        self.app.router.add_post("/", self._handle_compat)
+        self.app.router.add_post("/generate", self._handle_generate)
+        self.app.router.add_post("/generate_stream", self._handle_generate_stream)
+        self.app.router.add_post("/generate_batch", self._handle_generate_batch)
+        self.app.router.add_get("/stats", self._handle_stats)
+        self.app.router.add_get("/health", lambda request: web.Response(text="ok"))
+
+    def _count(self, request: web.Request, prompts: int = 1) -> None:
+        self.stats.requests += 1
+        self.stats.prompts += prompts
+        # keep-alive 연결은 같은 transport 로 여러 요청이 들어오므로 처음 본 transport 만 셉니다.
+        # (닫힌 연결의 transport 는 WeakSet 에서 저절로 빠집니다)
+        if request.transport not in self._seen_transports:
+            self._seen_transports.add(request.transport)
+            self.stats.connections += 1
+
+    def _max_new_tokens(self, parameters: dict) -> int:
+        return int(parameters.get("max_new_tokens") or self.config.default_new_tokens)
+
+    def _first_delay(self) -> float:
+        delay = self.config.latency
+        if self.config.jitter:
+            delay += random.uniform(0, self.config.jitter)
+        return delay
+
+    @contextlib.asynccontextmanager
+    async def _slot(self):
+        # max_concurrency 가 있으면 GPU 슬롯처럼 동시에 그 수만큼만 처리합니다.
+        if self.config.max_concurrency is None:
+            yield
+            return
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.config.max_concurrency)
+        async with self._slots:
+            yield
+
+    async def _generate(self, inputs: list[str], parameters: dict) -> list[str]:
+        max_new_tokens = self._max_new_tokens(parameters)
+        texts = ["".join(generate_tokens(str(prompt), max_new_tokens)) for prompt in inputs]
+        delay = self._first_delay() + self.config.token_latency * max_new_tokens
+        delay += self.config.batch_item_latency * (len(inputs) - 1)
+        async with self._slot():
+            await asyncio.sleep(delay)
+        return texts
+
+    async def _stream(self, request: web.Request, payload: dict) -> web.StreamResponse:
+        tokens = generate_tokens(str(payload.get("inputs", "")), self._max_new_tokens(payload.get("parameters") or {}))
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await response.prepare(request)
+        async with self._slot():
+            await asyncio.sleep(self._first_delay())
+            try:
+                for i, token in enumerate(tokens):
+                    if i:
+                        await asyncio.sleep(self.config.token_latency)
+                    last = i == len(tokens) - 1
+                    event = {
+                        "index": i + 1,
+                        "token": {"id": i, "text": token, "logprob": 0.0, "special": False},
+                        "generated_text": "".join(tokens) if last else None,
+                        "details": None,
+                    }
+                    await response.write(f"data:{json.dumps(event, ensure_ascii=False)}\n\n".encode("utf-8"))
+                    self.stats.streamed_tokens += 1
+            except ConnectionResetError:
+                # 클라이언트가 연결을 끊었으므로 남은 토큰은 만들지 않습니다.
+                self.stats.cancelled += 1
+                return response
+            except asyncio.CancelledError:
+                self.stats.cancelled += 1
+                raise
+        await response.write_eof()
+        return response
+
+    async def _handle_generate_stream(self, request: web.Request) -> web.StreamResponse:
+        payload = await request.json()
+        self._count(request)
+        return await self._stream(request, payload)
+
+    async def _handle_compat(self, request: web.Request) -> web.StreamResponse:
+        payload = await request.json()
+        self._count(request)
+        if payload.get("stream"):
+            return await self._stream(request, payload)
+        (text,) = await self._generate([payload.get("inputs", "")], payload.get("parameters") or {})
+        return web.json_response([{"generated_text": text}])
+
+    async def _handle_generate(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        self._count(request)
+        (text,) = await self._generate([payload.get("inputs", "")], payload.get("parameters") or {})
+        return web.json_response({"generated_text": text})
+
+    async def _handle_generate_batch(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        inputs = payload.get("inputs") or []
+        self._count(request, len(inputs))
+        texts = await self._generate(inputs, payload.get("parameters") or {})
+        return web.json_response([{"generated_text": text} for text in texts])
+
+    async def _handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(vars(self.stats))
+
+    def reset_stats(self) -> None:
+        self.stats = ServerStats()
+
+
+# =====================================================
+# 3) 실행
+# =====================================================
+def start_in_thread(config: StubConfig | None = None, *, host: str = "127.0.0.1", port: int = 0):
+    """
+    백그라운드 스레드에서 서버를 띄우고 (server, base_url, stop) 를 반환합니다.
+    port=0 이면 비어 있는 포트를 자동으로 고릅니다.
+    """
+    server = TGIStubServer(config)
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    holder: dict = {}
+
+    async def start() -> None:
+        runner = web.AppRunner(server.app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, host, port, backlog=1024)
+        await site.start()
+        holder["runner"] = runner
+        holder["port"] = site._server.sockets[0].getsockname()[1]
+
+    def run() -> None:
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(start())
+        started.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=run, name="tgi-stub", daemon=True)
+    thread.start()
+    started.wait()
+
+    def stop() -> None:
+        asyncio.run_coroutine_threadsafe(holder["runner"].cleanup(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+
+    return server, f"http://{host}:{holder['port']}", stop
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TGI 호환 로컬 텍스트 생성 스텁 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.05, help="요청당 고정 지연(초)")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="토큰당 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="요청마다 더할 0~jitter 초 무작위 지연")
+    parser.add_argument("--batch-item-latency", type=float, default=0.0, help="배치 항목당 추가 지연(초)")
+    parser.add_argument("--max-concurrency", type=int, default=None, help="동시에 처리하는 요청 수")
+    args = parser.parse_args()
+
+    server = TGIStubServer(StubConfig(
+        latency=args.latency,
+        token_latency=args.token_latency,
+        jitter=args.jitter,
+        batch_item_latency=args.batch_item_latency,
+        max_concurrency=args.max_concurrency,
+    ))
+    print(f"TGI 스텁 서버: http://{args.host}:{args.port}")
+    web.run_app(server.app, host=args.host, port=args.port, access_log=None, print=None)
+
+
+if __name__ == "__main__":
+    main()
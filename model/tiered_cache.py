@@ -0,0 +1,228 @@
+# =====================================================
+# 2단 캐시: 메모리 L1 + 디스크(SQLite) L2
+# =====================================================
+# - caching.py 에서는 InMemoryCache 와 SQLiteCache 중 하나만 고를 수 있습니다.
+#   · 메모리 캐시는 빠르지만 재시작하면 사라지고
+#   · SQLite 캐시는 남아 있지만 조회마다 디스크 I/O 가 듭니다.
+# - TieredCache 는 둘을 겹쳐서 사용합니다.
+#   1) 조회: L1(BoundedInMemoryCache) → 없으면 L2(SQLite) 순서로 확인
+#   2) 승격: L2 에서 promote_after 번 적중한 "자주 쓰는" 항목은 L1 으로 올림
+#   3) 쓰기: L1 은 즉시, L2 는 백그라운드 스레드에서 비동기로 기록
+#      → chain.invoke 는 디스크 쓰기를 기다리지 않습니다.
+# - 계층별 적중률과 조회 지연시간을 따로 집계합니다(tier_stats()).
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+
+from bounded_cache import BoundedInMemoryCache
+
+logger = logging.getLogger(__name__)
+
+
+# =====================================================
+# 1) 계층별 통계
+# =====================================================
+@dataclass
+class TierStats:
+    """한 계층(L1 또는 L2)의 조회 결과와 누적 지연시간"""
+    name: str
+    hits: int = 0
+    misses: int = 0
+    total_seconds: float = 0.0
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_ratio(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    @property
+    def avg_latency_ms(self) -> float:
+        return self.total_seconds / self.lookups * 1000 if self.lookups else 0.0
+
+    def __str__(self) -> str:
+        return (f"[{self.name}] 조회 {self.lookups}회, 적중률 {self.hit_ratio:.1%}, "
+                f"평균 {self.avg_latency_ms:.3f}ms")
+
+
+# =====================================================
+# 2) TieredCache 정의
+# =====================================================
+class TieredCache(BaseCache):
+    """
+    L1(메모리) → L2(디스크) 순으로 조회하고, 자주 쓰는 항목을 L1 으로 승격하는 캐시
+
+    - l2: L2 로 쓸 캐시 (SQLiteCache, WALSQLiteCache 등 BaseCache 구현체)
+    - l1: L1 캐시 (기본값 BoundedInMemoryCache(maxsize=1024))
+    - promote_after: L2 에서 몇 번 적중하면 L1 으로 올릴지 (1 이면 첫 적중에 바로 승격)
+    - async_writes: True 면 L2 쓰기를 백그라운드 스레드에서 처리
+    - l2_hits_limit: 승격 전 L2 적중 횟수를 기억할 최대 키 수 (promote_after > 1 일 때, L1 크기 정도가 적당)
+    """
+
+    def __init__(
+        self,
+        l2: BaseCache,
+        *,
+        l1: BaseCache | None = None,
+        promote_after: int = 1,
+        async_writes: bool = True,
+        l2_hits_limit: int = 4096,
+    ) -> None:
+        if promote_after <= 0:
+            raise ValueError("promote_after 는 0보다 커야 합니다.")
+        if l2_hits_limit <= 0:
+            raise ValueError("l2_hits_limit 는 0보다 커야 합니다.")
+        self.l1 = l1 if l1 is not None else BoundedInMemoryCache(maxsize=1024)
+        self.l2 = l2
+        self._promote_after = promote_after
+
+        # 승격 전 L2 적중 횟수 (키가 무한정 쌓이지 않도록 l2_hits_limit 개까지, 오래된 키부터 버림)
+        self._l2_hits: OrderedDict[tuple[str, str], int] = OrderedDict()
+        self._l2_hits_limit = l2_hits_limit
+        self._lock = threading.Lock()
+
+        # 워커 1개짜리 executor → L2 쓰기 순서가 update 호출 순서와 같게 유지됩니다.
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="l2-writer") if async_writes else None
+
+        self._l1_stats = TierStats("L1")
+        self._l2_stats = TierStats("L2")
+        self.promotions = 0
+
+    # -------------------------------------------------
+    # 2-1) 내부 헬퍼
+    # -------------------------------------------------
+    def _should_promote(self, key: tuple[str, str]) -> bool:
+        if self._promote_after == 1:
+            return True
+        with self._lock:
+            count = self._l2_hits.pop(key, 0) + 1
+            if count >= self._promote_after:
+                return True
+            self._l2_hits[key] = count
+            while len(self._l2_hits) > self._l2_hits_limit:
+                self._l2_hits.popitem(last=False)
+        return False
+
+    @staticmethod
+    def _log_write_error(future) -> None:
+        # 백그라운드 쓰기의 예외는 아무도 result() 를 부르지 않으면 그대로 사라지므로 로그로 남깁니다.
+        error = future.exception()
+        if error is not None:
+            logger.error("L2 비동기 쓰기 실패", exc_info=error)
+
+    def _record(self, stats: TierStats, hit: bool, elapsed: float) -> None:
+        with self._lock:
+            if hit:
+                stats.hits += 1
+            else:
+                stats.misses += 1
+            stats.total_seconds += elapsed
+
+    # -------------------------------------------------
+    # 2-2) BaseCache 인터페이스 구현
+    # -------------------------------------------------
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        start = time.perf_counter()
+        value = self.l1.lookup(prompt, llm_string)
+        self._record(self._l1_stats, value is not None, time.perf_counter() - start)
+        if value is not None:
+            return value
+
+        start = time.perf_counter()
+        value = self.l2.lookup(prompt, llm_string)
+        self._record(self._l2_stats, value is not None, time.perf_counter() - start)
+        if value is not None and self._should_promote((prompt, llm_string)):
+            self.l1.update(prompt, llm_string, value)
+            with self._lock:
+                self.promotions += 1
+        return value
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        # 새로 생성된 응답은 곧 다시 쓰일 가능성이 높으므로 L1 에도 바로 넣습니다.
+        self.l1.update(prompt, llm_string, return_val)
+        if self._writer is not None:
+            future = self._writer.submit(self.l2.update, prompt, llm_string, return_val)
+            future.add_done_callback(self._log_write_error)
+        else:
+            self.l2.update(prompt, llm_string, return_val)
+
+    def clear(self, **kwargs: Any) -> None:
+        self.flush()
+        self.l1.clear(**kwargs)
+        self.l2.clear(**kwargs)
+        with self._lock:
+            self._l2_hits.clear()
+
+    # -------------------------------------------------
+    # 2-3) 운영용 헬퍼
+    # -------------------------------------------------
+    def flush(self) -> None:
+        """대기 중인 L2 비동기 쓰기가 끝날 때까지 기다립니다."""
+        if self._writer is not None:
+            self._writer.submit(lambda: None).result()
+        flush_l2 = getattr(self.l2, "flush", None)
+        if callable(flush_l2):
+            flush_l2()
+
+    def close(self) -> None:
+        self.flush()
+        if self._writer is not None:
+            self._writer.shutdown(wait=True)
+        close_l2 = getattr(self.l2, "close", None)
+        if callable(close_l2):
+            close_l2()
+
+    def tier_stats(self) -> tuple[TierStats, TierStats]:
+        """(L1 통계, L2 통계) 스냅샷. L2 조회 수는 L1 미스 수와 같습니다."""
+        with self._lock:
+            return (
+                TierStats(**vars(self._l1_stats)),
+                TierStats(**vars(self._l2_stats)),
+            )
+
+
+# =====================================================
+# 3) 실행 예제
+# =====================================================
+if __name__ == "__main__":
+    import os
+
+    from dotenv import load_dotenv
+    from langchain.globals import set_llm_cache
+    from langchain_core.output_parsers import StrOutputParser
+    from langchain_core.prompts import PromptTemplate
+    from langchain_openai import ChatOpenAI
+
+    from sqlite_wal_cache import WALSQLiteCache
+
+    load_dotenv()
+    if not os.getenv("OPENAI_API_KEY"):
+        raise RuntimeError("❌ OPENAI_API_KEY가 설정되지 않았습니다.")
+
+    cache = TieredCache(WALSQLiteCache("cache/llm_cache_wal.db"), l1=BoundedInMemoryCache(maxsize=256))
+    set_llm_cache(cache)
+
+    prompt = PromptTemplate(template="{country}에 대해서 200자 내외로 요약해줘", input_variables=["country"])
+    chain = prompt | ChatOpenAI(model="gpt-4.1-mini") | StrOutputParser()
+
+    for i in range(3):
+        start = time.perf_counter()
+        chain.invoke({"country": "한국"})
+        print(f"{i + 1}번째 호출: {time.perf_counter() - start:.3f}초")
+        if i == 0:
+            # L1 을 비워서 다음 호출이 L2 에서 적중 → L1 으로 승격되는 흐름을 확인합니다.
+            cache.flush()
+            cache.l1.clear()
+
+    for stats in cache.tier_stats():
+        print(stats)
+    print("승격 횟수:", cache.promotions)
+    cache.close()
@@ -108,6 +108,7 @@ def stream_response(user_input: str):
 # 9) 프로그램 진입점 정의
 # =============================================================================
 def main():
+    # 한 번에 한 명씩 처리합니다. 여러 사용자를 동시에 받으려면 graph_runner.ConcurrentGraphRunner 를 참고하세요.
     print("\nType 'quit' to exit.")
     while True:
         user_input = input("User: ")
@@ -16,6 +16,7 @@ from langchain_core.messages import ToolMessage
 from langchain_core.runnables.graph_ascii import draw_ascii
 from langchain_tavily import TavilySearch
 from langgraph.types import StreamWriter
+from hedged_llm import HedgedRunnable
 
 # .env 파일 읽기
 load_dotenv()
@@ -34,7 +35,8 @@ tool = TavilySearch(max_results=2)
 tools = [tool]
 
 # LLM에 도구 바인딩 (invoke 시 tool_calls 지원)
-llm_with_tools = llm.bind_tools(tools)
+# HedgedRunnable: 응답이 최근 p95 보다 늦으면 같은 요청을 한 번 더 보내 먼저 온 응답을 사용 (hedged_llm.py)
+llm_with_tools = HedgedRunnable(llm.bind_tools(tools), hedge_percentile=0.95, budget=60)
 
 # =============================================================================
 # 3) 상태(State) 타입 정의
@@ -0,0 +1,331 @@
+# =============================================================================
+# asyncio 동시 그래프 실행기: 컴파일한 그래프 하나로 수천 개의 astream 세션 돌리기
+# =============================================================================
+# - 1부(1bu.py)의 main() 은 input() 으로 한 명의 입력을 받아 compiled_graph.stream() 을 한 번씩 돌립니다.
+#   LLM 응답을 기다리는 동안 프로세스는 아무 일도 하지 않으므로 여러 사용자를 받으려면 동시에 돌려야 합니다.
+# - ConcurrentGraphRunner 는 같은 컴파일된 그래프로 세션(graph.astream 한 번)을 여러 개 동시에 돌립니다.
+#   · 전역 동시 실행 상한(max_concurrency): 넘는 세션은 대기열에서 기다립니다.
+#   · 공정한 스케줄링: 대기열은 key(사용자 · thread_id 등)별로 나뉘고, 자리가 나면 key 를 돌아가며(round-robin) 꺼냅니다.
+#     한 사용자가 세션을 수천 개 넣어도 다른 사용자의 세션이 그 뒤에 줄 서지 않습니다. (fair=False 면 들어온 순서)
+#   · 세션별 출력 버퍼 상한(queue_size): 소비자가 느리면
+#     - overflow="block"      : 그래프 실행이 그 자리에서 멈춥니다(역압). 실행 슬롯은 계속 차지합니다.
+#     - overflow="drop_oldest": 가장 오래된 청크를 버리고 계속 실행합니다. (진행 상황 표시처럼 유실돼도 되는 경우)
+#     - consumer_timeout 초 동안 버퍼가 비지 않으면 SlowConsumerError 로 세션을 끝내고 슬롯을 돌려줍니다.
+#   · 세션마다 대기 시간, 첫 청크까지 시간(TTFC), 전체 시간을 기록합니다.
+#   · 소비자가 세션을 끝까지 읽지 않고 떠나면(async for 에서 break, 예외, 취소) 세션을 취소해 실행 슬롯을 돌려줍니다.
+#     async with session: 으로 감싸면 블록을 나갈 때 취소가 끝날 때까지 기다립니다.
+#
+# 사용 예)
+#   async with ConcurrentGraphRunner(compiled_graph, max_concurrency=256) as runner:
+#       session = runner.submit({"messages": [{"role": "user", "content": text}]}, key=user_id)
+#       async with session:
+#           async for event in session:
+#               ...
+import asyncio
+import itertools
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Hashable
+from dataclasses import dataclass
+from typing import Any
+
+
+class SlowConsumerError(RuntimeError):
+    """소비자가 consumer_timeout 초 동안 세션 출력을 읽지 않았을 때"""
+
+
+class RunnerClosedError(RuntimeError):
+    """닫힌 실행기에 세션을 넣으려 할 때"""
+
+
+@dataclass
+class SessionMetrics:
+    submitted: float
+    started: float | None = None
+    first_chunk: float | None = None
+    finished: float | None = None
+    chunks: int = 0
+    dropped: int = 0
+    max_buffered: int = 0
+
+    @property
+    def queue_wait(self) -> float | None:
+        return None if self.started is None else self.started - self.submitted
+
+    @property
+    def ttfc(self) -> float | None:
+        return None if self.first_chunk is None else self.first_chunk - self.submitted
+
+    @property
+    def total(self) -> float | None:
+        return None if self.finished is None else self.finished - self.submitted
+
+
+# =============================================================================
+# 1) 세션: 그래프 실행 하나 + 상한 있는 출력 버퍼
+# =============================================================================
+class Session:
+    """
+    runner.submit() 이 돌려주는 세션. `async for chunk in session` 으로 astream 청크를 읽습니다.
+    - 그래프가 예외로 끝나면 반복 중에 그 예외가 올라옵니다.
+    - 반복을 끝까지 하지 않고 빠져나가면(break · 예외 · 취소) 세션을 취소합니다.
+    - 소비자는 하나라고 가정합니다.
+    """
+
+    def __init__(self, runner: "ConcurrentGraphRunner", session_id: int, key: Hashable, inputs: Any,
+                 config: dict | None, queue_size: int, overflow: str) -> None:
+        self._runner = runner
+        self.id = session_id
+        self.key = key
+        self.inputs = inputs
+        self.config = config
+        self.metrics = SessionMetrics(submitted=time.perf_counter())
+        self.error: BaseException | None = None
+        self._buffer: deque = deque()
+        self._queue_size = queue_size
+        self._overflow = overflow
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._closed = False
+        self._task: asyncio.Task | None = None
+        self._queue_key: Hashable = None   # 대기열 key (runner.fair 가 아니면 None)
+
+    # -------------------------------------------------------------------------
+    # 1-1) 생산자(실행기) 쪽
+    # -------------------------------------------------------------------------
+    async def _put(self, chunk: Any, consumer_timeout: float | None) -> None:
+        if len(self._buffer) >= self._queue_size:
+            if self._overflow == "drop_oldest":
+                self._buffer.popleft()
+                self.metrics.dropped += 1
+            else:
+                while len(self._buffer) >= self._queue_size:
+                    self._not_full.clear()
+                    try:
+                        await asyncio.wait_for(self._not_full.wait(), consumer_timeout)
+                    except asyncio.TimeoutError:
+                        raise SlowConsumerError(f"세션 {self.id}: {consumer_timeout}초 동안 읽지 않음") from None
+        self._buffer.append(chunk)
+        self._not_empty.set()
+        m = self.metrics
+        m.chunks += 1
+        m.max_buffered = max(m.max_buffered, len(self._buffer))
+        if m.first_chunk is None:
+            m.first_chunk = time.perf_counter()
+
+    def _close(self, error: BaseException | None = None) -> None:
+        self.error = error
+        self.metrics.finished = time.perf_counter()
+        self._closed = True
+        self._not_empty.set()
+
+    # -------------------------------------------------------------------------
+    # 1-2) 소비자 쪽
+    # -------------------------------------------------------------------------
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        # 비동기 제너레이터라 async for 를 break 로 빠져나가도 제너레이터가 닫히면서 finally 가 실행됩니다.
+        try:
+            while True:
+                while not self._buffer:
+                    if self._closed:
+                        if self.error is not None:
+                            raise self.error
+                        return
+                    self._not_empty.clear()
+                    await self._not_empty.wait()
+                chunk = self._buffer.popleft()
+                self._not_full.set()
+                yield chunk
+        finally:
+            if not self._closed:   # 끝까지 읽지 않고 떠난 소비자: 실행 슬롯을 돌려줍니다.
+                self.cancel()
+
+    async def collect(self) -> list:
+        async with self:
+            return [chunk async for chunk in self]
+
+    @property
+    def done(self) -> bool:
+        return self._closed
+
+    def cancel(self) -> None:
+        """실행 중이면 그래프 실행을 취소하고, 대기 중이면 바로 대기열에서 빼고 실패로 셉니다."""
+        if self._task is not None:
+            self._task.cancel()
+        elif not self._closed:
+            self._runner._withdraw(self)
+            self._close(asyncio.CancelledError())
+
+    async def aclose(self) -> None:
+        """세션을 취소하고 그래프 실행이 실제로 끝날 때까지 기다립니다. (이미 끝났으면 아무것도 하지 않음)"""
+        self.cancel()
+        if self._task is not None:
+            await asyncio.wait([self._task])
+
+    async def __aenter__(self) -> "Session":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
+# =============================================================================
+# 2) 실행기
+# =============================================================================
+class ConcurrentGraphRunner:
+    """
+    컴파일된 그래프 하나로 graph.astream 세션을 동시에 돌리는 실행기
+    - max_concurrency: 동시에 실행할 세션 수 상한
+    - queue_size / overflow / consumer_timeout: 세션별 출력 버퍼 정책
+    - fair: True 면 key 별 round-robin, False 면 들어온 순서(FIFO)로 대기열에서 꺼냅니다.
+    - stream_mode: graph.astream 에 넘길 stream_mode (기본 "updates", 1bu.py 의 stream() 과 같음)
+    """
+
+    def __init__(self, graph, *, max_concurrency: int = 256, queue_size: int = 64, overflow: str = "block",
+                 consumer_timeout: float | None = None, fair: bool = True, stream_mode: str | list = "updates") -> None:
+        if overflow not in ("block", "drop_oldest"):
+            raise ValueError(f"overflow 는 'block' 또는 'drop_oldest' 입니다: {overflow!r}")
+        self.graph = graph
+        self.max_concurrency = max_concurrency
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.consumer_timeout = consumer_timeout
+        self.fair = fair
+        self.stream_mode = stream_mode
+        self._ids = itertools.count()
+        self._waiting: dict[Hashable, deque[Session]] = {}
+        self._ready_keys: deque[Hashable] = deque()
+        self._running: set[Session] = set()
+        self._closed = False
+        self.completed = 0
+        self.failed = 0
+
+    # -------------------------------------------------------------------------
+    # 2-1) 세션 넣기 · 스케줄링
+    # -------------------------------------------------------------------------
+    def submit(self, inputs: Any, config: dict | None = None, *, key: Hashable = None) -> Session:
+        """세션을 만들어 대기열에 넣고 자리가 있으면 바로 시작합니다. (실행 중인 이벤트 루프 안에서 호출)"""
+        if self._closed:
+            raise RunnerClosedError("이미 닫힌 실행기입니다.")
+        if key is None and config is not None:
+            key = config.get("configurable", {}).get("thread_id")
+        session = Session(self, next(self._ids), key, inputs, config, self.queue_size, self.overflow)
+        session._queue_key = queue_key = key if self.fair else None
+        if queue_key not in self._waiting:
+            self._waiting[queue_key] = deque()
+            self._ready_keys.append(queue_key)
+        self._waiting[queue_key].append(session)
+        self._dispatch()
+        return session
+
+    def _next_waiting(self) -> Session | None:
+        while self._ready_keys:
+            key = self._ready_keys.popleft()
+            sessions = self._waiting[key]
+            session = sessions.popleft()
+            if sessions:
+                self._ready_keys.append(key)   # 이 key 의 다음 세션은 다른 key 들 뒤로
+            else:
+                del self._waiting[key]
+            return session
+        return None
+
+    def _withdraw(self, session: Session) -> None:
+        # 대기 중에 취소된 세션: 바로 대기열에서 빼서 waiting 에 남지 않게 하고 실패로 셉니다.
+        sessions = self._waiting.get(session._queue_key)
+        if sessions is None or session not in sessions:
+            return
+        sessions.remove(session)
+        if not sessions:
+            del self._waiting[session._queue_key]
+            self._ready_keys.remove(session._queue_key)
+        self.failed += 1
+
+    def _dispatch(self) -> None:
+        while len(self._running) < self.max_concurrency:
+            session = self._next_waiting()
+            if session is None:
+                return
+            self._running.add(session)
+            session.metrics.started = time.perf_counter()
+            session._task = asyncio.create_task(self._drive(session), name=f"graph-session-{session.id}")
+
+    async def _drive(self, session: Session) -> None:
+        error: BaseException | None = None
+        try:
+            async for chunk in self.graph.astream(session.inputs, session.config, stream_mode=self.stream_mode):
+                await session._put(chunk, self.consumer_timeout)
+        except asyncio.CancelledError as exc:
+            error = exc
+            raise
+        except Exception as exc:   # 세션 하나의 실패가 실행기를 멈추지 않도록 소비자에게 넘깁니다.
+            error = exc
+        finally:
+            session._close(error)
+            self._running.discard(session)
+            if error is None:
+                self.completed += 1
+            else:
+                self.failed += 1
+            if not self._closed:
+                self._dispatch()
+
+    # -------------------------------------------------------------------------
+    # 2-2) 상태 · 종료
+    # -------------------------------------------------------------------------
+    @property
+    def running(self) -> int:
+        return len(self._running)
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(sessions) for sessions in self._waiting.values())
+
+    async def join(self) -> None:
+        """대기 중 · 실행 중인 세션이 모두 끝날 때까지 기다립니다."""
+        while self._running or self._waiting:
+            tasks = [s._task for s in self._running if s._task is not None]
+            if tasks:
+                await asyncio.wait(tasks)
+            else:
+                await asyncio.sleep(0)
+
+    async def aclose(self) -> None:
+        """새 세션을 받지 않고, 대기 중인 세션은 취소, 실행 중인 세션은 취소 후 끝날 때까지 기다립니다."""
+        self._closed = True
+        while (session := self._next_waiting()) is not None:
+            session._close(asyncio.CancelledError())
+            self.failed += 1
+        tasks = [s._task for s in self._running if s._task is not None]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.wait(tasks)
+
+    async def __aenter__(self) -> "ConcurrentGraphRunner":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+
+# =============================================================================
+# 3) 간단 실행 예제 (가짜 LLM, API 키 불필요)
+# =============================================================================
+if __name__ == "__main__":
+    from hedged_llm_benchmark import TailLatencyChatModel, build_graph
+
+    _, graph = build_graph(TailLatencyChatModel(latency=0.05, jitter=0.05, slow_rate=0.0))
+
+    async def demo() -> None:
+        async with ConcurrentGraphRunner(graph, max_concurrency=200, queue_size=8) as runner:
+            start = time.perf_counter()
+            sessions = [runner.submit({"messages": [{"role": "user", "content": f"{i}번째 질문"}]},
+                                      key=f"user-{i % 50}") for i in range(1000)]
+            replies = await asyncio.gather(*(s.collect() for s in sessions))
+            elapsed = time.perf_counter() - start
+        print(f"세션 {len(sessions)}개, {elapsed:.2f}초 ({len(sessions) / elapsed:.0f} 세션/초), "
+              f"완료 {runner.completed}, 실패 {runner.failed}")
+        print("Assistant:", replies[0][-1]["chatbot"]["messages"][-1].content)
+
+    asyncio.run(demo())
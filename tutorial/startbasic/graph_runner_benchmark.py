@@ -0,0 +1,199 @@
+# =============================================================================
+# 동시 그래프 실행기 벤치마크: 처리량 · 지연 곡선 (가짜 LLM, API 키 불필요)
+# =============================================================================
+# - 1부의 그래프(START → chatbot → END)를 hedged_llm_benchmark 의 TailLatencyChatModel 로 만들고
+#   ConcurrentGraphRunner 로 세션을 돌립니다.
+# - 측정
+#   · sequential : 1bu.py main() 처럼 한 번에 하나씩 astream (기준)
+#   · burst      : 세션 N 개를 한꺼번에 넣고 동시 실행 상한 C 별 처리량(세션/초)과 지연(p50/p95/p99),
+#                  대기열 대기 p50, 첫 청크(TTFC) p50
+#   · load       : 초당 R 개 세션이 푸아송 도착으로 --duration 초 동안 들어올 때의 지연 곡선 (열린 부하)
+#   · fairness   : 한 key 가 세션의 90% 를 한꺼번에 넣을 때 나머지 key 세션의 지연 (round-robin vs FIFO)
+# - 소비자는 세션마다 하나씩 돌며 청크를 읽습니다. (--consumer-delay 로 느린 소비자 흉내)
+#
+# 실행 예)
+#   python tutorial/startbasic/graph_runner_benchmark.py --sessions 1000 5000 --concurrency 64 256 1024 4096
+import argparse
+import asyncio
+import os
+import random
+import resource
+import sys
+import time
+import warnings
+
+from graph_runner import ConcurrentGraphRunner
+from hedged_llm_benchmark import TailLatencyChatModel, build_graph, inputs
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "model"))
+from bench_utils import percentile, write_json_report  # noqa: E402
+
+warnings.simplefilter("ignore")
+
+
+def make_graph(args):
+    model = TailLatencyChatModel(latency=args.latency, jitter=args.jitter, slow_rate=args.slow_rate,
+                                 slow_latency=args.slow_latency)
+    _, graph = build_graph(model)
+    return graph
+
+
+def latency_summary(seconds: list[float]) -> dict[str, float]:
+    return {f"p{q}_ms": percentile(seconds, q / 100) * 1000 for q in (50, 95, 99)}
+
+
+async def consume(session, delay: float) -> None:
+    async for _ in session:
+        if delay:
+            await asyncio.sleep(delay)
+
+
+# =============================================================================
+# 1) 한 번에 하나씩 (1bu.py main() 방식)
+# =============================================================================
+async def bench_sequential(graph, count: int) -> dict:
+    latencies = []
+    start = time.perf_counter()
+    for i in range(count):
+        begin = time.perf_counter()
+        async for _ in graph.astream(inputs(i)):
+            pass
+        latencies.append(time.perf_counter() - begin)
+    wall = time.perf_counter() - start
+    return {"sessions": count, "sessions_per_s": count / wall, **latency_summary(latencies)}
+
+
+# =============================================================================
+# 2) 한꺼번에 N 개 (동시 실행 상한별)
+# =============================================================================
+async def bench_burst(graph, sessions: int, concurrency: int, args) -> dict:
+    async with ConcurrentGraphRunner(graph, max_concurrency=concurrency, queue_size=args.queue_size) as runner:
+        start = time.perf_counter()
+        handles = [runner.submit(inputs(i), key=i % args.keys) for i in range(sessions)]
+        await asyncio.gather(*(consume(s, args.consumer_delay) for s in handles), return_exceptions=True)
+        wall = time.perf_counter() - start
+    metrics = [s.metrics for s in handles]
+    return {
+        "sessions": sessions, "concurrency": concurrency,
+        "sessions_per_s": sessions / wall,
+        **latency_summary([m.total for m in metrics]),
+        "queue_wait_p50_ms": percentile([m.queue_wait for m in metrics], 0.5) * 1000,
+        "ttfc_p50_ms": percentile([m.ttfc for m in metrics if m.ttfc is not None], 0.5) * 1000,
+        "failed": runner.failed,
+    }
+
+
+# =============================================================================
+# 3) 열린 부하: 초당 R 개 도착
+# =============================================================================
+async def bench_load(graph, rate: float, args) -> dict:
+    rng = random.Random(rate)
+    consumers = []
+    async with ConcurrentGraphRunner(graph, max_concurrency=args.load_concurrency,
+                                     queue_size=args.queue_size) as runner:
+        start = time.perf_counter()
+        handles = []
+        next_arrival = start
+        i = 0
+        while next_arrival - start < args.duration:
+            await asyncio.sleep(max(0.0, next_arrival - time.perf_counter()))
+            session = runner.submit(inputs(i), key=i % args.keys)
+            handles.append(session)
+            consumers.append(asyncio.create_task(consume(session, args.consumer_delay)))
+            next_arrival += rng.expovariate(rate)
+            i += 1
+        await asyncio.gather(*consumers, return_exceptions=True)
+        wall = time.perf_counter() - start
+    return {
+        "offered_per_s": rate, "sessions": len(handles),
+        "achieved_per_s": len(handles) / wall,
+        **latency_summary([s.metrics.total for s in handles]),
+        "queue_wait_p50_ms": percentile([s.metrics.queue_wait for s in handles], 0.5) * 1000,
+        "failed": runner.failed,
+    }
+
+
+# =============================================================================
+# 4) 공정성
+# =============================================================================
+async def bench_fairness(graph, fair: bool, args) -> dict:
+    total = args.fairness_sessions
+    heavy_count = int(total * 0.9)
+    async with ConcurrentGraphRunner(graph, max_concurrency=args.fairness_concurrency, fair=fair,
+                                     queue_size=args.queue_size) as runner:
+        heavy = [runner.submit(inputs(i), key="heavy") for i in range(heavy_count)]
+        light = [runner.submit(inputs(i), key=f"light-{i % 20}") for i in range(total - heavy_count)]
+        await asyncio.gather(*(consume(s, 0.0) for s in heavy + light), return_exceptions=True)
+    return {
+        "scheduler": "round-robin" if fair else "fifo",
+        "heavy_p50_ms": percentile([s.metrics.total for s in heavy], 0.5) * 1000,
+        "light_p50_ms": percentile([s.metrics.total for s in light], 0.5) * 1000,
+        "light_p99_ms": percentile([s.metrics.total for s in light], 0.99) * 1000,
+    }
+
+
+# =============================================================================
+# 5) main
+# =============================================================================
+def main():
+    parser = argparse.ArgumentParser(description="ConcurrentGraphRunner 처리량 · 지연 벤치마크 (가짜 LLM)")
+    parser.add_argument("--latency", type=float, default=0.2, help="가짜 LLM 응답 시간(초)")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--slow-rate", type=float, default=0.01)
+    parser.add_argument("--slow-latency", type=float, default=1.0)
+    parser.add_argument("--sequential", type=int, default=20, help="한 번에 하나씩 돌릴 세션 수")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[64, 256, 1024, 4096])
+    parser.add_argument("--rates", type=float, nargs="*", default=[100, 200, 400, 800], help="열린 부하 도착률(세션/초)")
+    parser.add_argument("--duration", type=float, default=5.0, help="열린 부하 측정 시간(초)")
+    parser.add_argument("--load-concurrency", type=int, default=1024)
+    parser.add_argument("--fairness-sessions", type=int, default=2000)
+    parser.add_argument("--fairness-concurrency", type=int, default=64)
+    parser.add_argument("--queue-size", type=int, default=16, help="세션별 출력 버퍼 크기")
+    parser.add_argument("--keys", type=int, default=100, help="세션을 나눌 사용자(key) 수")
+    parser.add_argument("--consumer-delay", type=float, default=0.0, help="소비자의 청크당 처리 시간(초)")
+    parser.add_argument("--output", default=None, help="JSON 결과 경로")
+    args = parser.parse_args()
+
+    graph = make_graph(args)
+    print(f"가짜 LLM {args.latency * 1000:.0f}~{(args.latency + args.jitter) * 1000:.0f}ms, "
+          f"느린 응답 {args.slow_rate:.0%} × {args.slow_latency * 1000:.0f}ms")
+    results = []
+
+    r = asyncio.run(bench_sequential(graph, args.sequential))
+    results.append({"section": "sequential", **r})
+    print(f"\n[sequential] {r['sessions']}개: {r['sessions_per_s']:.1f} 세션/초, p50 {r['p50_ms']:.0f}ms")
+
+    print(f"\n[burst] {'N':>6} {'C':>5} {'세션/초':>8} {'p50':>7} {'p95':>7} {'p99':>7} {'대기 p50':>9} {'TTFC p50':>9}")
+    for sessions in args.sessions:
+        for concurrency in args.concurrency:
+            r = asyncio.run(bench_burst(graph, sessions, concurrency, args))
+            results.append({"section": "burst", **r})
+            print(f"        {sessions:>6} {concurrency:>5} {r['sessions_per_s']:>8.0f} {r['p50_ms']:>7.0f} "
+                  f"{r['p95_ms']:>7.0f} {r['p99_ms']:>7.0f} {r['queue_wait_p50_ms']:>9.0f} {r['ttfc_p50_ms']:>9.0f}")
+
+    if args.rates:
+        print(f"\n[load] 동시 상한 {args.load_concurrency}, {args.duration:.0f}초")
+        print(f"       {'도착/초':>7} {'처리/초':>7} {'p50':>7} {'p95':>7} {'p99':>7} {'대기 p50':>9}")
+        for rate in args.rates:
+            r = asyncio.run(bench_load(graph, rate, args))
+            results.append({"section": "load", **r})
+            print(f"       {rate:>7.0f} {r['achieved_per_s']:>7.0f} {r['p50_ms']:>7.0f} {r['p95_ms']:>7.0f} "
+                  f"{r['p99_ms']:>7.0f} {r['queue_wait_p50_ms']:>9.0f}")
+
+    print(f"\n[fairness] 세션 {args.fairness_sessions}개 중 90% 가 한 key, 동시 상한 {args.fairness_concurrency}")
+    for fair in (True, False):
+        r = asyncio.run(bench_fairness(graph, fair, args))
+        results.append({"section": "fairness", **r})
+        print(f"  {r['scheduler']:<12} heavy p50 {r['heavy_p50_ms']:>6.0f}ms, "
+              f"나머지 p50 {r['light_p50_ms']:>6.0f}ms / p99 {r['light_p99_ms']:>6.0f}ms")
+
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"\n최대 RSS {peak_mb:.0f}MB")
+    if args.output:
+        write_json_report(args.output, "graph_runner_benchmark", vars(args), results, peak_rss_mb=peak_mb)
+        print("JSON 결과:", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,404 @@
+# =============================================================================
+# 헤지 요청(hedged request) · 지연 예산 · 지터 재시도 · 서킷 브레이커 LLM 래퍼
+# =============================================================================
+# - chatbot_node 는 llm_with_tools.invoke 를 한 번 부르고 응답을 기다립니다.
+#   LLM API 는 대부분 빠르지만 가끔 몇 배 느린 응답(꼬리 지연)이 섞여 p99 를 끌어올립니다.
+# - HedgedRunnable 은 LLM(또는 bind_tools 결과)을 감싸서
+#   1) 헤지: 최근 응답 지연의 hedge_percentile 분위수만큼 기다려도 답이 없으면 같은 요청을 한 번 더 보내고,
+#      먼저 온 응답을 쓰고 늦은 쪽은 취소합니다.
+#      · 느린 (1 - hedge_percentile) 비율의 호출에만 두 번째 요청이 나가고,
+#        max_hedge_ratio 로 헤지 비율에 상한을 두므로 비용이 두 배가 되지 않습니다.
+#   2) 지연 예산: budget 초 안에 끝나지 않으면 LatencyBudgetExceeded(TimeoutError) 를 올립니다.
+#   3) 재시도: 예외가 나면 지수 백오프 + 전체 지터(0 ~ 백오프 사이 무작위)로 max_retries 번까지 다시 시도합니다.
+#      (남은 예산보다 오래 기다려야 하면 재시도하지 않음)
+#   4) 서킷 브레이커: 연속 실패가 failure_threshold 번이면 reset_timeout 초 동안 바로 CircuitOpenError 를 올리고,
+#      그 뒤 한 번 시험 호출해 성공하면 다시 닫습니다.
+# - 비동기(ainvoke)는 진 쪽 태스크를 취소해 HTTP 요청까지 끊습니다.
+#   동기(invoke)는 스레드 풀에서 요청을 보내므로 진 쪽 요청(예산 초과로 버린 요청 포함)은 끝까지 실행되고 결과만 버려집니다.
+#   이렇게 버려진 요청도 max_workers 자리를 차지하므로, 풀이 가득 차 있으면 헤지 요청을 더 보내지 않습니다.
+# - 시험 호출(half_open) 중 호출자가 취소되거나 KeyboardInterrupt 등이 나도 실패로 기록해 브레이커가 half_open 에 멈추지 않습니다.
+#
+# 사용 예)
+#   llm_with_tools = HedgedRunnable(llm.bind_tools(tools), hedge_percentile=0.95, budget=30)
+#   def chatbot_node(state):
+#       return {"messages": [llm_with_tools.invoke(state["messages"])]}
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from concurrent import futures
+from contextvars import copy_context
+from dataclasses import dataclass
+from typing import Any
+
+from langchain_core.runnables import Runnable, RunnableConfig
+
+
+class LatencyBudgetExceeded(TimeoutError):
+    """호출 하나가 지연 예산(budget)을 넘겼을 때"""
+
+
+class CircuitOpenError(RuntimeError):
+    """서킷 브레이커가 열려 있어 호출을 보내지 않았을 때"""
+
+
+# =============================================================================
+# 1) 최근 지연시간 기록 (헤지 지연 계산용)
+# =============================================================================
+class LatencyTracker:
+    """최근 window 개 응답 지연(초)을 보관하고 분위수를 계산합니다."""
+
+    def __init__(self, window: int = 500) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> float:
+        with self._lock:
+            ordered = sorted(self._samples)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+# =============================================================================
+# 2) 서킷 브레이커
+# =============================================================================
+class CircuitBreaker:
+    """
+    연속 실패 횟수로 여닫는 서킷 브레이커 (closed → open → half_open → closed)
+
+    - failure_threshold: 이 횟수만큼 연속 실패하면 open
+    - reset_timeout: open 상태를 유지하는 시간(초). 지나면 시험 호출 하나만 통과시킴(half_open)
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state, self._failures, self._trial_running = "closed", 0, False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                self.state, self._opened_at, self._trial_running = "open", time.monotonic(), False
+
+
+# =============================================================================
+# 3) HedgedRunnable
+# =============================================================================
+@dataclass
+class HedgeStats:
+    calls: int = 0            # invoke/ainvoke 호출 수
+    requests: int = 0         # 실제로 보낸 요청 수 (헤지·재시도 포함 = 비용)
+    hedges: int = 0           # 보낸 헤지 요청 수
+    hedge_wins: int = 0       # 헤지 요청이 먼저 끝난 수
+    retries: int = 0
+    budget_exceeded: int = 0
+    short_circuited: int = 0  # 서킷이 열려 있어 바로 실패한 수
+
+
+class HedgedRunnable(Runnable):
+    """
+    헤지 요청 · 지연 예산 · 지터 재시도 · 서킷 브레이커를 더한 Runnable 래퍼
+
+    - runnable: 감쌀 LLM (예: llm.bind_tools(tools))
+    - hedge_percentile: 최근 지연의 이 분위수만큼 기다린 뒤 헤지 요청을 보냄 (None 이면 헤지 안 함)
+    - min_samples: 기록이 이만큼 쌓이기 전에는 initial_hedge_delay 를 씀
+    - max_hedge_ratio: 전체 호출 대비 헤지 요청 비율 상한
+    - budget: 호출 하나의 지연 예산(초). invoke(..., budget=...) 로 호출마다 바꿀 수 있음
+    - max_retries / backoff_base / backoff_cap: 예외 시 재시도 횟수와 백오프(초)
+    - breaker: 공유할 CircuitBreaker (기본값: 새로 만듦)
+    - max_workers: 동기 invoke 가 요청을 보내는 스레드 풀 크기
+      진 쪽 · 예산 초과로 버린 요청도 끝날 때까지 이 자리를 차지하며(취소 불가), 실행 중인 요청이
+      max_workers 개면 헤지 요청을 보내지 않습니다. 새 호출은 풀 대기열에서 자리를 기다립니다.
+    """
+
+    def __init__(
+        self,
+        runnable: Runnable,
+        *,
+        hedge_percentile: float | None = 0.95,
+        min_samples: int = 20,
+        initial_hedge_delay: float = 2.0,
+        max_hedge_ratio: float = 0.1,
+        budget: float | None = None,
+        max_retries: int = 2,
+        backoff_base: float = 0.2,
+        backoff_cap: float = 5.0,
+        breaker: CircuitBreaker | None = None,
+        max_workers: int = 32,
+    ) -> None:
+        self.runnable = runnable
+        self.hedge_percentile = hedge_percentile
+        self.min_samples = min_samples
+        self.initial_hedge_delay = initial_hedge_delay
+        self.max_hedge_ratio = max_hedge_ratio
+        self.budget = budget
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = LatencyTracker()
+        self.stats = HedgeStats()
+        self._max_workers = max_workers
+        self._pool: futures.ThreadPoolExecutor | None = None
+        self._inflight = 0   # 동기 풀에 들어가 아직 끝나지 않은 요청 수 (버려진 요청 포함)
+        self._lock = threading.Lock()
+
+    @property
+    def InputType(self):
+        return self.runnable.InputType
+
+    @property
+    def OutputType(self):
+        return self.runnable.OutputType
+
+    # -------------------------------------------------------------------------
+    # 3-1) 헤지 / 재시도 판단
+    # -------------------------------------------------------------------------
+    def hedge_delay(self) -> float | None:
+        """지금 헤지 요청을 보내기까지 기다릴 시간(초). 헤지하지 않으면 None"""
+        if self.hedge_percentile is None:
+            return None
+        if len(self.latency) < self.min_samples:
+            return self.initial_hedge_delay
+        return self.latency.percentile(self.hedge_percentile)
+
+    def _take_hedge(self) -> bool:
+        with self._lock:
+            # 처음 몇 번의 호출에서도 헤지할 수 있도록 1 만큼 여유를 둡니다.
+            if self.stats.hedges >= self.max_hedge_ratio * self.stats.calls + 1:
+                return False
+            if self._inflight >= self._max_workers:   # 동기 풀이 버려진 요청으로 차 있으면 헤지해도 대기열에 줄만 섭니다.
+                return False
+            self.stats.hedges += 1
+            self.stats.requests += 1
+            return True
+
+    def _backoff(self, attempt: int) -> float:
+        # full jitter: 여러 호출이 같은 순간에 다시 몰리지 않도록 0~백오프 사이에서 고릅니다.
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def _start_call(self, budget: float | None) -> float | None:
+        with self._lock:
+            self.stats.calls += 1
+        budget = self.budget if budget is None else budget
+        return None if budget is None else time.monotonic() + budget
+
+    def _check_circuit(self) -> None:
+        if not self.breaker.allow():
+            with self._lock:
+                self.stats.short_circuited += 1
+            raise CircuitOpenError("서킷 브레이커가 열려 있어 LLM 을 호출하지 않았습니다.")
+
+    def _over_budget(self) -> LatencyBudgetExceeded:
+        with self._lock:
+            self.stats.budget_exceeded += 1
+        return LatencyBudgetExceeded("지연 예산을 넘겼습니다.")
+
+    def _settle(self, ok: bool) -> None:
+        # try/finally 에서 부르므로 취소 · KeyboardInterrupt 도 실패로 기록되고, half_open 시험 호출 자리가 풀립니다.
+        if ok:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    @staticmethod
+    def _remaining(deadline: float | None) -> float | None:
+        return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+    # -------------------------------------------------------------------------
+    # 3-2) 동기 호출 (스레드 풀)
+    # -------------------------------------------------------------------------
+    def _timed(self, input: Any, config: RunnableConfig | None, kwargs: dict) -> Any:
+        start = time.perf_counter()
+        result = self.runnable.invoke(input, config, **kwargs)
+        self.latency.record(time.perf_counter() - start)
+        return result
+
+    def _submit(self, input: Any, config: RunnableConfig | None, kwargs: dict) -> futures.Future:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = futures.ThreadPoolExecutor(self._max_workers, thread_name_prefix="hedged-llm")
+        with self._lock:
+            self._inflight += 1
+        # 콜백·트레이싱 컨텍스트가 스레드로 이어지도록 현재 컨텍스트에서 실행합니다.
+        future = self._pool.submit(copy_context().run, self._timed, input, config, kwargs)
+        future.add_done_callback(self._request_done)
+        return future
+
+    def _request_done(self, future: futures.Future) -> None:
+        with self._lock:
+            self._inflight -= 1
+
+    def _hedged_invoke(self, input: Any, config: RunnableConfig | None, kwargs: dict, deadline: float | None) -> Any:
+        with self._lock:
+            self.stats.requests += 1
+        primary = self._submit(input, config, kwargs)
+        pending = {primary}
+        delay = self.hedge_delay()
+        if delay is not None:
+            remaining = self._remaining(deadline)
+            done, _ = futures.wait(pending, timeout=delay if remaining is None else min(delay, remaining))
+            if not done and self._remaining(deadline) != 0 and self._take_hedge():
+                pending.add(self._submit(input, config, kwargs))
+
+        error: BaseException | None = None
+        while pending:
+            done, pending = futures.wait(pending, timeout=self._remaining(deadline), return_when=futures.FIRST_COMPLETED)
+            if not done:
+                for future in pending:
+                    future.cancel()
+                raise self._over_budget()
+            for future in done:
+                if future.exception() is None:
+                    for loser in pending:
+                        loser.cancel()   # 이미 실행 중이면 결과만 버려집니다
+                    if future is not primary:
+                        with self._lock:
+                            self.stats.hedge_wins += 1
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def invoke(self, input: Any, config: RunnableConfig | None = None, *, budget: float | None = None, **kwargs: Any) -> Any:
+        deadline = self._start_call(budget)
+        for attempt in range(self.max_retries + 1):
+            self._check_circuit()
+            ok = False
+            try:
+                result = self._hedged_invoke(input, config, kwargs, deadline)
+                ok = True
+            except LatencyBudgetExceeded:
+                raise
+            except Exception:
+                wait = self._backoff(attempt)
+                remaining = self._remaining(deadline)
+                if attempt == self.max_retries or (remaining is not None and wait >= remaining):
+                    raise
+                with self._lock:
+                    self.stats.retries += 1
+            finally:
+                self._settle(ok)
+            if ok:
+                return result
+            time.sleep(wait)
+
+    # -------------------------------------------------------------------------
+    # 3-3) 비동기 호출 (태스크, 진 쪽은 취소)
+    # -------------------------------------------------------------------------
+    async def _atimed(self, input: Any, config: RunnableConfig | None, kwargs: dict) -> Any:
+        start = time.perf_counter()
+        result = await self.runnable.ainvoke(input, config, **kwargs)
+        self.latency.record(time.perf_counter() - start)
+        return result
+
+    async def _hedged_ainvoke(self, input: Any, config: RunnableConfig | None, kwargs: dict, deadline: float | None) -> Any:
+        with self._lock:
+            self.stats.requests += 1
+        primary = asyncio.create_task(self._atimed(input, config, kwargs))
+        pending = {primary}
+        try:
+            delay = self.hedge_delay()
+            if delay is not None:
+                remaining = self._remaining(deadline)
+                done, _ = await asyncio.wait(pending, timeout=delay if remaining is None else min(delay, remaining))
+                if not done and self._remaining(deadline) != 0 and self._take_hedge():
+                    pending.add(asyncio.create_task(self._atimed(input, config, kwargs)))
+
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=self._remaining(deadline), return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise self._over_budget()
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            with self._lock:
+                                self.stats.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # 진 쪽(또는 예산 초과·호출자 취소 시 남은 요청)을 취소합니다.
+            for task in pending:
+                task.cancel()
+
+    async def ainvoke(self, input: Any, config: RunnableConfig | None = None, *, budget: float | None = None, **kwargs: Any) -> Any:
+        deadline = self._start_call(budget)
+        for attempt in range(self.max_retries + 1):
+            self._check_circuit()
+            ok = False
+            try:
+                result = await self._hedged_ainvoke(input, config, kwargs, deadline)
+                ok = True
+            except LatencyBudgetExceeded:
+                raise
+            except Exception:
+                wait = self._backoff(attempt)
+                remaining = self._remaining(deadline)
+                if attempt == self.max_retries or (remaining is not None and wait >= remaining):
+                    raise
+                with self._lock:
+                    self.stats.retries += 1
+            finally:
+                self._settle(ok)
+            if ok:
+                return result
+            await asyncio.sleep(wait)
+
+
+# =============================================================================
+# 4) 간단 실행 예제 (API 키 없이 동작)
+# =============================================================================
+if __name__ == "__main__":
+    from langchain_core.runnables import RunnableLambda
+
+    async def flaky_llm(messages: list) -> str:
+        # 3% 확률로 1초 걸리는 느린 응답
+        await asyncio.sleep(1.0 if random.random() < 0.03 else random.uniform(0.02, 0.04))
+        return "서울입니다."
+
+    llm = HedgedRunnable(RunnableLambda(lambda m: "서울입니다.", afunc=flaky_llm), hedge_percentile=0.9, max_hedge_ratio=0.15, budget=2.0)
+
+    async def main():
+        latencies = []
+        for _ in range(200):
+            start = time.perf_counter()
+            await llm.ainvoke([{"role": "human", "content": "한국의 수도는?"}])
+            latencies.append(time.perf_counter() - start)
+        latencies.sort()
+        print(f"p50 {latencies[100] * 1000:.0f}ms / p99 {latencies[198] * 1000:.0f}ms")
+        print(llm.stats)
+
+    asyncio.run(main())
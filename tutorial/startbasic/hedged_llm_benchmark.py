@@ -0,0 +1,249 @@
+# =============================================================================
+# 헤지 요청 벤치마크: chatbot_node 의 꼬리 지연(p99)과 비용(요청 수) 비교
+# =============================================================================
+# - 2부~6부의 chatbot_node 와 같은 모양의 그래프(START → chatbot → END)를 만들고,
+#   꼬리 지연이 있는 가짜 Chat 모델(TailLatencyChatModel)로 여러 번 실행합니다. (API 키 불필요)
+#   · 대부분의 응답은 latency ~ latency + jitter 초, slow_rate 비율만 slow_latency 초가 걸립니다.
+# - 모드
+#   · plain       : llm.invoke 그대로
+#   · hedge-pXX   : HedgedRunnable(hedge_percentile=0.XX)
+#   · retry-only  : 헤지 없이 지연 예산 + 지터 재시도 (실패율 --failure-rate 에서 성공률 비교용)
+# - 지표: p50 / p95 / p99 / 최대 지연, 호출당 실제 요청 수(비용), 실패 수
+# - 마지막으로 장애(모든 요청 실패) 구간에서 서킷 브레이커가 보낸 요청 수를 비교합니다.
+#
+# 실행 예)
+#   python tutorial/startbasic/hedged_llm_benchmark.py --calls 2000 --concurrency 32 --slow-rate 0.02
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import Annotated, Any
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+from typing_extensions import TypedDict
+
+from hedged_llm import CircuitBreaker, CircuitOpenError, HedgedRunnable
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "model"))
+from bench_utils import percentile, write_json_report  # noqa: E402
+
+warnings.simplefilter("ignore")
+
+
+# =============================================================================
+# 1) 꼬리 지연이 있는 가짜 Chat 모델
+# =============================================================================
+class TailLatencyChatModel(BaseChatModel):
+    """slow_rate 확률로 slow_latency 초, 나머지는 latency ~ latency + jitter 초 뒤에 응답하는 모델"""
+
+    latency: float = 0.03
+    jitter: float = 0.02
+    slow_rate: float = 0.02
+    slow_latency: float = 1.0
+    failure_rate: float = 0.0
+    outage_until: float = 0.0   # time.monotonic() 이 이 값보다 작으면 모든 요청이 실패
+    requests: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "tail-latency-chat-model"
+
+    def _delay(self) -> float:
+        self.requests += 1
+        if time.monotonic() < self.outage_until or random.random() < self.failure_rate:
+            raise ConnectionError("가짜 LLM 요청 실패")
+        if random.random() < self.slow_rate:
+            return self.slow_latency
+        return self.latency + random.uniform(0, self.jitter)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        time.sleep(self._delay())
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="서울입니다."))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self._delay())
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="서울입니다."))])
+
+
+class State(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def build_graph(llm):
+    # 2부~6부의 chatbot_node 와 같은 구조
+    def chatbot_node(state: State) -> dict:
+        return {"messages": [llm.invoke(state["messages"])]}
+
+    async def achatbot_node(state: State) -> dict:
+        return {"messages": [await llm.ainvoke(state["messages"])]}
+
+    builder = StateGraph(State)
+    builder.add_node("chatbot", chatbot_node)
+    builder.add_edge(START, "chatbot")
+    builder.add_edge("chatbot", END)
+    sync_graph = builder.compile()
+
+    builder = StateGraph(State)
+    builder.add_node("chatbot", achatbot_node)
+    builder.add_edge(START, "chatbot")
+    builder.add_edge("chatbot", END)
+    return sync_graph, builder.compile()
+
+
+# =============================================================================
+# 2) 실행
+# =============================================================================
+def inputs(i: int) -> dict:
+    return {"messages": [{"role": "human", "content": f"{i}번째 질문: 한국의 수도는?"}]}
+
+
+async def run_async(graph, calls: int, concurrency: int) -> tuple[list[float], int]:
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = 0
+
+    async def one(i: int) -> float | None:
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await graph.ainvoke(inputs(i))
+            except Exception:
+                failures += 1
+                return None
+            return time.perf_counter() - start
+
+    latencies = await asyncio.gather(*(one(i) for i in range(calls)))
+    return [s for s in latencies if s is not None], failures
+
+
+def run_sync(graph, calls: int, concurrency: int) -> tuple[list[float], int]:
+    def one(i: int) -> float | None:
+        start = time.perf_counter()
+        try:
+            graph.invoke(inputs(i))
+        except Exception:
+            return None
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(one, range(calls)))
+    return [s for s in latencies if s is not None], latencies.count(None)
+
+
+def make_llm(mode: str, model: TailLatencyChatModel, args):
+    if mode == "plain":
+        return model
+    if mode == "retry-only":
+        return HedgedRunnable(model, hedge_percentile=None, budget=args.budget, max_retries=2,
+                              backoff_base=0.01, breaker=CircuitBreaker(failure_threshold=10**9))
+    q = int(mode.removeprefix("hedge-p")) / 100
+    return HedgedRunnable(model, hedge_percentile=q, max_hedge_ratio=args.max_hedge_ratio, budget=args.budget,
+                          max_retries=2, backoff_base=0.01, breaker=CircuitBreaker(failure_threshold=10**9),
+                          max_workers=args.concurrency * 2)
+
+
+def bench(mode: str, api: str, args) -> dict:
+    model = TailLatencyChatModel(latency=args.latency, jitter=args.jitter, slow_rate=args.slow_rate,
+                                 slow_latency=args.slow_latency, failure_rate=args.failure_rate)
+    llm = make_llm(mode, model, args)
+    sync_graph, async_graph = build_graph(llm)
+    if api == "async":
+        latencies, failures = asyncio.run(run_async(async_graph, args.calls, args.concurrency))
+    else:
+        latencies, failures = run_sync(sync_graph, args.calls, args.concurrency)
+    return {
+        "mode": mode,
+        "api": api,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": max(latencies, default=0.0) * 1000,
+        "requests_per_call": model.requests / args.calls,
+        "failures": failures,
+    }
+
+
+def bench_outage(args) -> list[dict]:
+    """outage 초 동안 모든 요청이 실패할 때, 서킷 브레이커 유무에 따른 요청 수와 실패 지연"""
+    results = []
+    for name, breaker in [("no-breaker", CircuitBreaker(failure_threshold=10**9)),
+                          ("breaker", CircuitBreaker(failure_threshold=5, reset_timeout=0.5))]:
+        model = TailLatencyChatModel(latency=args.latency, slow_rate=0.0, outage_until=time.monotonic() + args.outage)
+        llm = HedgedRunnable(model, hedge_percentile=None, max_retries=2, backoff_base=0.01, breaker=breaker)
+        _, async_graph = build_graph(llm)
+
+        async def drive() -> tuple[int, int, list[float]]:
+            failed = short = 0
+            fail_latency = []
+            end = time.monotonic() + args.outage
+            while time.monotonic() < end:
+                start = time.perf_counter()
+                try:
+                    await async_graph.ainvoke(inputs(0))
+                except CircuitOpenError:
+                    short += 1
+                except Exception:
+                    failed += 1
+                fail_latency.append(time.perf_counter() - start)
+                await asyncio.sleep(0.005)
+            return failed, short, fail_latency
+
+        failed, short, fail_latency = asyncio.run(drive())
+        results.append({"mode": name, "upstream_requests": model.requests, "failed": failed,
+                        "short_circuited": short, "fail_p50_ms": percentile(fail_latency, 0.5) * 1000})
+    return results
+
+
+# =============================================================================
+# 3) main
+# =============================================================================
+def main():
+    parser = argparse.ArgumentParser(description="헤지 요청 · 재시도 · 서킷 브레이커 벤치마크 (가짜 LLM)")
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.03)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--slow-rate", type=float, default=0.02)
+    parser.add_argument("--slow-latency", type=float, default=1.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--budget", type=float, default=None, help="호출당 지연 예산(초)")
+    parser.add_argument("--max-hedge-ratio", type=float, default=0.1)
+    parser.add_argument("--modes", nargs="+", default=["plain", "hedge-p95", "hedge-p90", "retry-only"])
+    parser.add_argument("--apis", nargs="+", choices=["async", "sync"], default=["async", "sync"])
+    parser.add_argument("--outage", type=float, default=1.0, help="서킷 브레이커 비교용 장애 구간(초), 0 이면 생략")
+    parser.add_argument("--output", default=None, help="JSON 결과 경로")
+    args = parser.parse_args()
+
+    print(f"호출 {args.calls}건, 동시성 {args.concurrency}, 응답 {args.latency * 1000:.0f}~"
+          f"{(args.latency + args.jitter) * 1000:.0f}ms, 느린 응답 {args.slow_rate:.0%} × {args.slow_latency * 1000:.0f}ms")
+    print(f"{'mode':<11} {'api':<6} {'p50':>7} {'p95':>7} {'p99':>7} {'max':>7} {'요청/호출':>9} {'실패':>5}")
+    results = []
+    for api in args.apis:
+        for mode in args.modes:
+            r = bench(mode, api, args)
+            results.append(r)
+            print(f"{mode:<11} {api:<6} {r['p50_ms']:>7.1f} {r['p95_ms']:>7.1f} {r['p99_ms']:>7.1f} "
+                  f"{r['max_ms']:>7.1f} {r['requests_per_call']:>9.3f} {r['failures']:>5}")
+
+    if args.outage > 0:
+        print(f"\n장애 {args.outage:.1f}초 동안 연속 호출 (재시도 2회)")
+        for r in bench_outage(args):
+            results.append({"section": "outage", **r})
+            print(f"  {r['mode']:<11} 실제 요청 {r['upstream_requests']:>5}, 실패 {r['failed']:>4}, "
+                  f"즉시 거절 {r['short_circuited']:>4}, 실패 응답 p50 {r['fail_p50_ms']:.1f}ms")
+
+    if args.output:
+        write_json_report(args.output, "hedged_llm_benchmark", vars(args), results)
+        print("JSON 결과:", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+# =============================================================================
+# 샘플링 디버그 트레이스: stream_mode="debug" 를 운영 중에도 켜 둘 수 있게
+# =============================================================================
+# - stream.py 의 main() 처럼 모든 실행을 stream_mode="debug" 로 돌리고 청크마다 print 하면
+#   · langgraph 가 스텝마다 태스크 입력 · 결과 청크를 만들고,
+#   · print 가 그 안의 상태 전체를 repr 해서 stdout 에 쓸 때까지 그래프가 기다립니다.
+# - DebugTracer 는 이 비용을 일부 실행에만 냅니다.
+#   · sample_every=N : N 번째 실행마다 한 번만 "debug" 청크를 함께 받아 기록합니다. 나머지 실행은 원래 stream_mode 그대로.
+#   · slow_step_ms   : 샘플이 아닌 실행에서는 청크 사이(스텝 하나)에 그래프가 일한 시간을 재고 임계값을 넘은 스텝만
+#                      기록합니다. 호출한 쪽이 청크를 처리하는 시간은 빼고 잽니다.
+#                      stream_mode 가 "values" / "updates" 면 그 청크로 재고, 다른 모드면 "updates" 를 함께 받습니다.
+#   · 기록은 TraceRecord(참조만 보관)로 RingBuffer 에 넣고, 문자열로 바꾸는 일(repr)은 읽을 때 합니다.
+# - RingBuffer 는 deque(maxlen) 라 넣는 쪽이 막히지 않고, 가득 차면 가장 오래된 기록을 버리고 dropped 를 셉니다.
+#   TraceWriter 를 붙이면 백그라운드 스레드가 주기적으로 꺼내 포맷하고 sink(print, 로거, 파일 write)에 씁니다.
+# - 주의: 기록은 청크 객체의 참조를 들고 있으므로 capacity 만큼의 청크가 메모리에 남습니다.
+#
+# 사용 예)
+#   tracer = DebugTracer(sample_every=100, slow_step_ms=500, writer=TraceWriter(print))
+#   for chunk in tracer.stream(graph, inputs, stream_mode="values"):
+#       ...
+#   tracer.close()
+import itertools
+import reprlib
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterator
+from dataclasses import dataclass
+from typing import Any
+
+_repr = reprlib.Repr()
+_repr.maxstring = 200
+_repr.maxother = 200
+_repr.maxlevel = 4
+
+
+# =============================================================================
+# 1) 기록 · 링 버퍼
+# =============================================================================
+@dataclass(slots=True)
+class TraceRecord:
+    """트레이스 기록 하나. payload 는 참조만 들고 있다가 format() 할 때 문자열로 바꿉니다."""
+    run: int
+    kind: str          # "debug" | "slow_step"
+    at: float          # time.time()
+    elapsed: float     # 직전 청크 이후 그래프가 일한 시간(초)
+    payload: Any
+
+    def format(self) -> str:
+        stamp = time.strftime("%H:%M:%S", time.localtime(self.at))
+        return f"{stamp} [run {self.run}] {self.kind} {self.elapsed * 1000:.1f}ms {_repr.repr(self.payload)}"
+
+
+class RingBuffer:
+    """넣는 쪽이 막히지 않는 고정 크기 버퍼. 가득 차면 가장 오래된 기록을 버립니다."""
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self._items: deque[TraceRecord] = deque(maxlen=capacity)
+        self.dropped = 0
+
+    def put(self, record: TraceRecord) -> None:
+        # deque.append 는 GIL 안에서 원자적이라 락 없이 여러 스레드 · 코루틴에서 넣어도 됩니다.
+        # (dropped 는 검사와 추가 사이에 끼어드는 경우가 있어 근사값입니다)
+        if len(self._items) == self._items.maxlen:
+            self.dropped += 1
+        self._items.append(record)
+
+    def drain(self) -> list[TraceRecord]:
+        records = []
+        while True:
+            try:
+                records.append(self._items.popleft())
+            except IndexError:
+                return records
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class TraceWriter:
+    """백그라운드 스레드에서 interval 초마다 버퍼를 비우고 포맷한 줄을 sink 로 보냅니다."""
+
+    def __init__(self, sink: Callable[[str], Any] = print, interval: float = 0.5) -> None:
+        self.sink = sink
+        self.interval = interval
+        self._buffer: RingBuffer | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.cpu_seconds = 0.0   # writer 스레드가 쓴 CPU 시간 (close 뒤에 확정)
+
+    def start(self, buffer: RingBuffer) -> None:
+        self._buffer = buffer
+        self._thread = threading.Thread(target=self._run, name="debug-trace-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush()
+        self.flush()
+        self.cpu_seconds = time.thread_time()
+
+    def flush(self) -> None:
+        for record in self._buffer.drain():
+            self.sink(record.format())
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+# =============================================================================
+# 2) 샘플링 트레이서
+# =============================================================================
+class DebugTracer:
+    """
+    graph.stream / graph.astream 을 감싸 일부 실행만 debug 청크를 기록합니다.
+    - sample_every: N 번째 실행마다 debug 청크 전체를 기록 (0 이면 끔, 1 이면 모든 실행)
+    - slow_step_ms: 그 밖의 실행에서 이 시간보다 오래 걸린 노드 결과만 기록 (None 이면 끔)
+    - stream_mode 는 문자열 하나만 받습니다. 호출한 쪽은 원래 모드의 청크만 받습니다.
+    """
+
+    def __init__(self, sample_every: int = 100, slow_step_ms: float | None = None, capacity: int = 1024,
+                 writer: TraceWriter | None = None) -> None:
+        self.sample_every = sample_every
+        self.slow_step = None if slow_step_ms is None else slow_step_ms / 1000
+        self.buffer = RingBuffer(capacity)
+        self.writer = writer
+        self._runs = itertools.count()
+        if writer is not None:
+            writer.start(self.buffer)
+
+    def _plan(self, stream_mode: str) -> tuple[int, str | None]:
+        run = next(self._runs)   # itertools.count 는 스레드 사이에서도 번호가 겹치지 않습니다.
+        if self.sample_every and run % self.sample_every == 0:
+            return run, "debug"
+        if self.slow_step is not None:
+            # values / updates 청크는 스텝(노드)이 끝날 때마다 오므로 그 사이 시간을 그대로 재면 됩니다.
+            return run, stream_mode if stream_mode in ("values", "updates") else "updates"
+        return run, None
+
+    def _record(self, run: int, kind: str, elapsed: float, payload: Any) -> None:
+        self.buffer.put(TraceRecord(run, kind, time.time(), elapsed, payload))
+
+    def _observe(self, run: int, watch: str, mode: str, chunk: Any, elapsed: float) -> None:
+        if mode != watch:
+            return
+        if watch == "debug":
+            self._record(run, "debug", elapsed, chunk)
+        elif elapsed >= self.slow_step:
+            self._record(run, "slow_step", elapsed, chunk)
+
+    def stream(self, graph, inputs: Any, config: dict | None = None, *, stream_mode: str = "values",
+               **kwargs: Any) -> Iterator[Any]:
+        run, watch = self._plan(stream_mode)
+        if watch is None:
+            yield from graph.stream(inputs, config, stream_mode=stream_mode, **kwargs)
+            return
+        modes = stream_mode if watch == stream_mode else [stream_mode, watch]
+        resumed = time.perf_counter()
+        for item in graph.stream(inputs, config, stream_mode=modes, **kwargs):
+            mode, chunk = (stream_mode, item) if modes is stream_mode else item
+            self._observe(run, watch, mode, chunk, time.perf_counter() - resumed)
+            if mode == stream_mode:
+                yield chunk
+            resumed = time.perf_counter()
+
+    async def astream(self, graph, inputs: Any, config: dict | None = None, *, stream_mode: str = "values",
+                      **kwargs: Any) -> AsyncIterator[Any]:
+        run, watch = self._plan(stream_mode)
+        if watch is None:
+            async for chunk in graph.astream(inputs, config, stream_mode=stream_mode, **kwargs):
+                yield chunk
+            return
+        modes = stream_mode if watch == stream_mode else [stream_mode, watch]
+        resumed = time.perf_counter()
+        async for item in graph.astream(inputs, config, stream_mode=modes, **kwargs):
+            mode, chunk = (stream_mode, item) if modes is stream_mode else item
+            self._observe(run, watch, mode, chunk, time.perf_counter() - resumed)
+            if mode == stream_mode:
+                yield chunk
+            resumed = time.perf_counter()
+
+    def invoke(self, graph, inputs: Any, config: dict | None = None, **kwargs: Any) -> Any:
+        """graph.invoke 와 같은 결과(마지막 values)를 돌려주며 트레이스만 더합니다."""
+        result = None
+        for result in self.stream(graph, inputs, config, stream_mode="values", **kwargs):
+            pass
+        return result
+
+    def format_pending(self) -> list[str]:
+        """writer 없이 쓸 때: 버퍼에 쌓인 기록을 꺼내 문자열로 바꿉니다."""
+        return [record.format() for record in self.buffer.drain()]
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+
+
+# =============================================================================
+# 3) 간단 실행 예제
+# =============================================================================
+if __name__ == "__main__":
+    from stream import build_graph
+
+    graph = build_graph()
+    tracer = DebugTracer(sample_every=10, writer=TraceWriter(print, interval=0.1))
+    for i in range(20):
+        tracer.invoke(graph, {"messages": [{"role": "human", "content": f"{i}번째 안녕?"}]})
+    tracer.close()
+    print("버린 기록:", tracer.buffer.dropped)
@@ -0,0 +1,144 @@
+# =============================================================================
+# 샘플링 디버그 트레이스 오버헤드 벤치마크 (stream.py 의 build_graph)
+# =============================================================================
+# - 같은 그래프를 모드마다 --runs 번 실행하고 실행당 평균 CPU 시간을 비교합니다.
+#   · 실행 하나마다 모드를 번갈아 돌리므로 머신 잡음은 모든 모드에 고르게 섞입니다.
+#   · 그래프를 돌린 스레드의 CPU(time.thread_time) + 그 모드 TraceWriter 스레드의 CPU 를 더합니다.
+#     (writer 스레드가 다른 모드 실행 중에 돌아도 제 모드에 계산되도록)
+# - 모드
+#   · plain        : graph.stream(stream_mode="values") 만 (기준)
+#   · debug-print  : stream.py 의 main() 처럼 stream_mode="debug" 청크를 모두 print (stdout 대신 StringIO)
+#   · trace-all    : DebugTracer(sample_every=1) + TraceWriter (모든 실행 기록, 포맷은 백그라운드)
+#   · sample-N     : DebugTracer(sample_every=N) + TraceWriter
+#   · sample-N+slow: 위 + slow_step_ms (샘플이 아닌 실행은 "updates" 로 느린 노드만 기록)
+# - --history 로 입력 대화 길이를 늘리면 debug 청크(태스크 입력 = 상태 전체)를 repr 하는 비용이 커집니다.
+# - --output JSON 은 model/bench_utils.py 형식이라 환경 정보(파이썬 · langgraph · langchain-core 버전, git 커밋)가 함께 남습니다.
+#
+# 실행 예)
+#   python tutorial/stream/debug_trace_benchmark.py --runs 2000 --history 0 50 --sample-every 100
+import argparse
+import asyncio
+import gc
+import io
+import os
+import sys
+import time
+import warnings
+
+from debug_trace import DebugTracer, TraceWriter
+from stream import build_graph
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "model"))
+from bench_utils import environment_info, write_json_report  # noqa: E402
+
+warnings.simplefilter("ignore")
+
+
+def inputs(i: int, history: int) -> dict:
+    past = [{"role": "human" if j % 2 == 0 else "ai", "content": f"{j}번째 메시지"} for j in range(history)]
+    return {"messages": past + [{"role": "human", "content": f"{i}번째 안녕?"}]}
+
+
+# =============================================================================
+# 1) 모드별 실행
+# =============================================================================
+def make_tracer(mode: str, args) -> DebugTracer | None:
+    sink = io.StringIO().write
+    if mode == "trace-all":
+        return DebugTracer(sample_every=1, writer=TraceWriter(sink))
+    if mode.startswith("sample"):
+        slow = args.slow_step_ms if mode.endswith("+slow") else None
+        return DebugTracer(sample_every=args.sample_every, slow_step_ms=slow, writer=TraceWriter(sink))
+    return None
+
+
+def run_sync(graph, mode: str, tracer: DebugTracer | None, payload: dict, out: io.StringIO) -> None:
+    if mode == "debug-print":
+        for chunk in graph.stream(payload, stream_mode="debug"):
+            print("DEBUG CHUNK:", chunk, file=out)
+    elif tracer is not None:
+        for _ in tracer.stream(graph, payload, stream_mode="values"):
+            pass
+    else:
+        for _ in graph.stream(payload, stream_mode="values"):
+            pass
+
+
+async def run_async(graph, mode: str, tracer: DebugTracer | None, payload: dict, out: io.StringIO) -> None:
+    if mode == "debug-print":
+        async for chunk in graph.astream(payload, stream_mode="debug"):
+            print("DEBUG CHUNK:", chunk, file=out)
+    elif tracer is not None:
+        async for _ in tracer.astream(graph, payload, stream_mode="values"):
+            pass
+    else:
+        async for _ in graph.astream(payload, stream_mode="values"):
+            pass
+
+
+async def interleave(graph, modes: list[str], api: str, history: int, args) -> dict[str, float]:
+    tracers = {mode: make_tracer(mode, args) for mode in modes}
+    totals = dict.fromkeys(modes, 0.0)
+    out = io.StringIO()
+    # 앞 모드가 남긴 순환 쓰레기를 다음 모드 실행 중에 치우지 않도록, 측정 중에는 GC 를 끄고 바퀴마다 한 번 모읍니다.
+    gc.disable()
+    for i in range(args.runs):
+        payload = inputs(i, history)
+        # 바퀴마다 시작 모드를 돌려 gc.collect 직후 실행의 불이익도 고르게 나눕니다.
+        for mode in modes[i % len(modes):] + modes[:i % len(modes)]:
+            start = time.thread_time()
+            if api == "async":
+                await run_async(graph, mode, tracers[mode], payload, out)
+            else:
+                run_sync(graph, mode, tracers[mode], payload, out)
+            totals[mode] += time.thread_time() - start
+        out.seek(0)
+        out.truncate()
+        gc.collect()
+    gc.enable()
+    for mode, tracer in tracers.items():
+        if tracer is not None:
+            tracer.close()   # 남은 기록 포맷까지 포함해서 잽니다.
+            totals[mode] += tracer.writer.cpu_seconds
+    return totals
+
+
+def bench(modes: list[str], api: str, history: int, args) -> list[dict]:
+    totals = asyncio.run(interleave(build_graph(), modes, api, history, args))
+    baseline = totals[modes[0]]
+    return [{"mode": mode, "api": api, "history": history, "us_per_run": totals[mode] / args.runs * 1e6,
+             "overhead_pct": (totals[mode] / baseline - 1) * 100} for mode in modes]
+
+
+# =============================================================================
+# 2) main
+# =============================================================================
+def main():
+    parser = argparse.ArgumentParser(description="샘플링 디버그 트레이스 오버헤드 벤치마크")
+    parser.add_argument("--runs", type=int, default=2000, help="모드별 그래프 실행 수")
+    parser.add_argument("--history", type=int, nargs="+", default=[0, 50], help="입력 대화의 이전 메시지 수")
+    parser.add_argument("--sample-every", type=int, default=100)
+    parser.add_argument("--slow-step-ms", type=float, default=50.0)
+    parser.add_argument("--apis", nargs="+", choices=["sync", "async"], default=["sync", "async"])
+    parser.add_argument("--output", default=None, help="JSON 결과 경로")
+    args = parser.parse_args()
+
+    sample = f"sample-{args.sample_every}"
+    modes = ["plain", "debug-print", "trace-all", sample, f"{sample}+slow"]
+    print(f"모드별 실행 {args.runs}회, 느린 스텝 기준 {args.slow_step_ms:.0f}ms")
+    print(f"{'api':<6} {'history':>7} {'mode':<16} {'us/run':>9} {'overhead':>9}")
+    results = []
+    for api in args.apis:
+        for history in args.history:
+            for r in bench(modes, api, history, args):
+                results.append(r)
+                print(f"{api:<6} {history:>7} {r['mode']:<16} {r['us_per_run']:>9.1f} {r['overhead_pct']:>8.1f}%")
+
+    if args.output:
+        write_json_report(args.output, "debug_trace_benchmark", vars(args), results,
+                          environment=environment_info(("langgraph", "langchain-core")))
+        print("JSON 결과:", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+# =============================================================================
+# 델타 스트리밍: graph.stream 의 "values" 대신 바뀐 메시지 · 채널만 보내기
+# =============================================================================
+# - stream_mode="values" 는 스텝마다 상태 전체를, "debug" 는 태스크 입력(=상태 전체)과 결과를 다시 보냅니다.
+#   메시지가 n 개인 대화를 k 스텝 돌리면 보내는 양이 O(n·k) 라 긴 스레드에서는 사실상 제곱으로 늘어납니다.
+# - stream_deltas(graph, inputs) 는 같은 프로세스 안에서 "values" 를 받아 직전 값과 비교하고,
+#   바뀐 채널만 아래 모양의 이벤트로 돌려줍니다.
+#     {"step": 1, "channels": {"messages": {"append": [...], "replace": [[위치, 메시지], ...]}, "count": {"set": 3}}}
+#   · 같은 프로세스 안의 "values" 는 채널 값을 복사하지 않고 그대로 넘기므로, 바뀌지 않은 메시지는 같은 객체입니다.
+#     그래서 비교는 직렬화 없이 객체 동일성(is)만 봅니다.
+#   · list 채널(add_messages, operator.add 등): 기존 길이 안에서 다른 객체가 된 위치는 replace, 늘어난 부분은 append
+#   · MessageLog 채널(message_log.add_messages_shared): 공유 노드를 건너뛰는 changed_since 로 바뀐 위치만 찾습니다.
+#   · 길이가 줄었거나(RemoveMessage) 절반 이상 바뀌었거나 list 가 아닌 값이 바뀌면 {"set": 전체 값}
+#   · 첫 이벤트(step 0)는 모든 채널의 set 입니다.
+#   · 노드가 채널 값을 제자리에서 고쳐 같은 객체를 돌려줘도 놓치지 않도록, 직전 값은 참조가 아니라 스냅숏으로 기억합니다.
+#     list 는 얕은 복사, 그 밖의 값은 JSON 으로 인코딩한 문자열(내용 지문)로 비교합니다. (MessageLog 는 불변이라 참조 그대로)
+#     단, list 안의 메시지 객체를 제자리에서 고치는 경우는 감지하지 않습니다. (add_messages 는 새 객체로 바꿔 넣습니다)
+# - 받는 쪽은 StateReassembler 로 이벤트를 순서대로 apply 하면 "values" 의 마지막 값과 같은 상태가 됩니다.
+# - 네트워크로 보낼 때는 encode_event / decode_event (JSON, 메시지는 message_to_dict 형식)를 씁니다.
+#
+# 사용 예)
+#   for event in stream_deltas(graph, inputs):
+#       send(encode_event(event))
+#   # 클라이언트
+#   state = StateReassembler()
+#   for raw in receive():
+#       state.apply(decode_event(raw))
+import json
+from collections.abc import AsyncIterator, Iterator
+from typing import Any
+
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+
+from message_log import MessageLog
+
+SET_RATIO = 0.5   # 기존 항목의 이 비율 이상이 바뀌면 위치별 교체 대신 전체 값을 보냅니다.
+
+
+# =============================================================================
+# 1) 채널 값 비교
+# =============================================================================
+def _changed_positions(old: Any, new: Any) -> list[int] | None:
+    if isinstance(old, MessageLog) and isinstance(new, MessageLog):
+        return new.changed_since(old)
+    if isinstance(old, (list, MessageLog)) and isinstance(new, (list, MessageLog)):
+        if len(new) < len(old):
+            return None
+        return [i for i, (a, b) in enumerate(zip(old, new)) if a is not b]
+    return None
+
+
+def diff_channel(old: Any, new: Any) -> dict | None:
+    """채널 하나의 델타. 바뀐 것이 없으면 None"""
+    if new is old:
+        return None
+    positions = _changed_positions(old, new)
+    if positions is None:
+        try:
+            if new == old:
+                return None
+        except Exception:   # 비교할 수 없는 값은 바뀐 것으로 봅니다.
+            pass
+        return {"set": new}
+    if old and len(positions) >= len(old) * SET_RATIO:
+        return {"set": new}
+    delta = {}
+    if positions:
+        delta["replace"] = [[i, new[i]] for i in positions]
+    if len(new) > len(old):
+        delta["append"] = new[len(old):]
+    return delta or None
+
+
+_UNCOMPARABLE = object()   # JSON 으로 인코딩할 수 없는 값의 지문: 매 스텝 바뀐 것으로 봅니다.
+
+
+def _snapshot(value: Any) -> Any:
+    if isinstance(value, MessageLog):
+        return value
+    if isinstance(value, list):
+        return list(value)
+    try:
+        return json.dumps(value, default=to_wire, sort_keys=True, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return _UNCOMPARABLE
+
+
+class DeltaTracker:
+    """
+    직전 상태를 기억했다가 다음 상태와의 차이를 이벤트로 만듭니다.
+    - previous: 채널별 스냅숏 (list 는 얕은 복사, MessageLog 는 참조, 그 밖의 값은 JSON 지문)
+    """
+
+    def __init__(self) -> None:
+        self.previous: dict[str, Any] | None = None
+        self.step = 0
+
+    def update(self, values: dict[str, Any]) -> dict | None:
+        channels = {}
+        snapshots = {}
+        for name, value in values.items():
+            snapshot = snapshots[name] = _snapshot(value)
+            if self.previous is None or name not in self.previous:
+                delta = {"set": value}
+            elif isinstance(snapshot, (list, MessageLog)) and isinstance(self.previous[name], (list, MessageLog)):
+                delta = diff_channel(self.previous[name], value)
+            elif snapshot is not _UNCOMPARABLE and snapshot == self.previous[name]:
+                delta = None
+            else:
+                delta = {"set": value}
+            if delta is not None:
+                channels[name] = delta
+        self.previous = snapshots
+        if not channels:
+            return None
+        event = {"step": self.step, "channels": channels}
+        self.step += 1
+        return event
+
+
+# =============================================================================
+# 2) 그래프 스트림 어댑터
+# =============================================================================
+def stream_deltas(graph, inputs: Any, config: dict | None = None, **kwargs: Any) -> Iterator[dict]:
+    """graph.stream(stream_mode="values") 를 델타 이벤트로 바꿉니다. (kwargs 는 graph.stream 에 그대로 전달)"""
+    tracker = DeltaTracker()
+    for values in graph.stream(inputs, config, stream_mode="values", **kwargs):
+        event = tracker.update(values)
+        if event is not None:
+            yield event
+
+
+async def astream_deltas(graph, inputs: Any, config: dict | None = None, **kwargs: Any) -> AsyncIterator[dict]:
+    """stream_deltas 의 비동기 버전 (graph.astream)"""
+    tracker = DeltaTracker()
+    async for values in graph.astream(inputs, config, stream_mode="values", **kwargs):
+        event = tracker.update(values)
+        if event is not None:
+            yield event
+
+
+# =============================================================================
+# 3) 직렬화
+# =============================================================================
+def to_wire(value: Any) -> Any:
+    if isinstance(value, BaseMessage):
+        return message_to_dict(value)
+    if isinstance(value, MessageLog):
+        return list(value)
+    raise TypeError(f"직렬화할 수 없는 값: {type(value).__name__}")
+
+
+def _is_message_dict(value: Any) -> bool:
+    return isinstance(value, dict) and value.keys() == {"type", "data"}
+
+
+def from_wire(value: Any) -> Any:
+    if _is_message_dict(value):
+        return messages_from_dict([value])[0]
+    if isinstance(value, list):
+        if value and all(_is_message_dict(v) for v in value):
+            return messages_from_dict(value)
+        return [from_wire(v) for v in value]
+    return value
+
+
+def encode_event(event: dict) -> bytes:
+    """델타 이벤트 → JSON bytes (다른 stream_mode 청크에도 같은 방식으로 쓸 수 있습니다)"""
+    return json.dumps(event, default=to_wire, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def decode_event(raw: bytes) -> dict:
+    event = json.loads(raw)
+    for delta in event["channels"].values():
+        if "set" in delta:
+            delta["set"] = from_wire(delta["set"])
+        if "append" in delta:
+            delta["append"] = from_wire(delta["append"])
+        if "replace" in delta:
+            delta["replace"] = [[i, from_wire(v)] for i, v in delta["replace"]]
+    return event
+
+
+# =============================================================================
+# 4) 클라이언트 쪽 재조립
+# =============================================================================
+class StateReassembler:
+    """델타 이벤트를 순서대로 적용해 서버의 "values" 와 같은 상태를 만듭니다. (list 채널은 list 로 복원)"""
+
+    def __init__(self) -> None:
+        self.state: dict[str, Any] = {}
+        self.step = -1
+
+    def apply(self, event: dict) -> dict[str, Any]:
+        if event["step"] != self.step + 1:
+            raise ValueError(f"이벤트 순서가 맞지 않습니다: {self.step} 다음에 {event['step']}")
+        for name, delta in event["channels"].items():
+            if "set" in delta:
+                value = delta["set"]
+                # 같은 프로세스에서 디코딩 없이 받아도 서버 쪽 목록을 건드리지 않도록 복사해 둡니다.
+                self.state[name] = list(value) if isinstance(value, (list, MessageLog)) else value
+                continue
+            current = self.state[name]
+            for i, value in delta.get("replace", ()):
+                current[i] = value
+            current.extend(delta.get("append", ()))
+        self.step = event["step"]
+        return self.state
+
+
+# =============================================================================
+# 5) 간단 실행 예제
+# =============================================================================
+if __name__ == "__main__":
+    from stream import build_graph
+
+    graph = build_graph()
+    client = StateReassembler()
+    for event in stream_deltas(graph, {"messages": [{"role": "human", "content": "안녕?"}]}):
+        raw = encode_event(event)
+        print(f"DELTA {len(raw):>4} bytes:", raw.decode())
+        client.apply(decode_event(raw))
+    print("재조립한 메시지:", [m.content for m in client.state["messages"]])
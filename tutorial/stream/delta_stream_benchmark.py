@@ -0,0 +1,166 @@
+# =============================================================================
+# 델타 스트리밍 벤치마크: stream_mode "values" / "debug" vs stream_deltas (스텝당 바이트 · CPU)
+# =============================================================================
+# - 메시지 n 개가 쌓인 대화에서 노드가 스텝마다 AI 메시지 1개를 더하는 그래프를 --steps 번 스트리밍합니다.
+#   (stream.py 의 build_graph 도 같은 방식으로 --sizes 0 일 때 1회 측정)
+# - 모든 모드의 청크를 같은 JSON 인코더(메시지는 message_to_dict)로 직렬화해 전송량을 잽니다.
+# - 지표 (스텝당)
+#   · bytes      : 직렬화한 청크 크기 (첫 프레임 포함 합계 / 스텝 수)
+#   · tail bytes : 첫 프레임(입력 상태 전체)을 뺀 나머지 프레임의 평균 크기 = 대화가 길어질 때 스텝마다 더 보내는 양
+#   · server_ms  : 그래프 실행 + 델타 계산 + 직렬화 CPU 시간 (time.process_time)
+#   · client_ms  : 역직렬화 + 메시지 복원(+ 델타 재조립) CPU 시간
+#   · 델타 모드는 재조립한 마지막 상태가 "values" 의 마지막 상태와 같은지 확인합니다.
+# - --output JSON 은 model/bench_utils.py 형식이라 환경 정보(파이썬 · langgraph · langchain-core 버전, git 커밋)가 함께 남습니다.
+#
+# 실행 예)
+#   python tutorial/stream/delta_stream_benchmark.py --sizes 0 100 1000 --steps 50
+import argparse
+import json
+import os
+import sys
+import time
+import warnings
+from typing import Annotated, Any
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+from typing_extensions import TypedDict
+
+from delta_stream import StateReassembler, decode_event, encode_event, from_wire, stream_deltas, to_wire
+from message_log import MessageLog, SharedState
+from stream import build_graph
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "model"))
+from bench_utils import environment_info, write_json_report  # noqa: E402
+
+warnings.simplefilter("ignore")
+
+
+class State(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def history(n: int) -> list:
+    return [(HumanMessage if i % 2 == 0 else AIMessage)(f"{i}번째 메시지", id=f"m{i}") for i in range(n)]
+
+
+def build_loop_graph(state_schema: type, stop_at: int):
+    def turn(state) -> dict:
+        return {"messages": [AIMessage(f"답변 {len(state['messages'])}")]}
+
+    def route(state) -> str:
+        return END if len(state["messages"]) >= stop_at else "turn"
+
+    builder = StateGraph(state_schema)
+    builder.add_node("turn", turn)
+    builder.add_edge(START, "turn")
+    builder.add_conditional_edges("turn", route, {"turn": "turn", END: END})
+    return builder.compile()
+
+
+# =============================================================================
+# 1) 모드별 서버 · 클라이언트
+# =============================================================================
+def encode_chunk(chunk: Any) -> bytes:
+    # debug 청크에는 메시지 외의 객체(태스크 트리거 등)도 있으므로 모르는 값은 문자열로 보냅니다.
+    def default(value: Any) -> Any:
+        try:
+            return to_wire(value)
+        except TypeError:
+            return str(value)
+    return json.dumps(chunk, default=default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def serve(mode: str, graph, inputs: dict, config: dict) -> list[bytes]:
+    if mode.startswith("deltas"):
+        return [encode_event(event) for event in stream_deltas(graph, inputs, config)]
+    return [encode_chunk(chunk) for chunk in graph.stream(inputs, config, stream_mode=mode)]
+
+
+def receive(mode: str, frames: list[bytes]) -> dict | None:
+    if mode.startswith("deltas"):
+        client = StateReassembler()
+        for raw in frames:
+            client.apply(decode_event(raw))
+        return client.state
+    state = None
+    for raw in frames:
+        chunk = json.loads(raw)
+        if mode == "values":
+            state = {name: from_wire(value) for name, value in chunk.items()}
+    return state
+
+
+# =============================================================================
+# 2) 측정
+# =============================================================================
+def bench(n: int, steps: int, modes: list[str]) -> list[dict]:
+    results = []
+    expected = None
+    for mode in modes:
+        schema = SharedState if mode == "deltas-shared" else State
+        if n == 0:
+            graph, inputs, config = build_graph(schema), {"messages": [{"role": "human", "content": "안녕?"}]}, {}
+            graph_steps = 2
+        else:
+            start_value = MessageLog(history(n)) if schema is SharedState else history(n)
+            graph, inputs = build_loop_graph(schema, n + steps), {"messages": start_value}
+            config, graph_steps = {"recursion_limit": steps + 10}, steps
+
+        cpu = time.process_time()
+        frames = serve(mode, graph, inputs, config)
+        server_s = time.process_time() - cpu
+
+        cpu = time.process_time()
+        state = receive(mode, frames)
+        client_s = time.process_time() - cpu
+
+        if mode == "values":
+            expected = [(m.id, m.content) for m in state["messages"]]
+        elif state is not None and expected is not None:
+            # 노드가 돌려준 메시지의 id 는 실행마다 새로 붙으므로 내용과 길이만 비교합니다.
+            assert [m.content for m in state["messages"]] == [c for _, c in expected], mode
+        total_bytes = sum(len(f) for f in frames)
+        results.append({
+            "n": n, "mode": mode, "frames": len(frames),
+            "bytes_per_step": total_bytes / graph_steps,
+            "tail_bytes_per_frame": sum(len(f) for f in frames[1:]) / max(1, len(frames) - 1),
+            "total_kb": total_bytes / 1024,
+            "server_ms_per_step": server_s / graph_steps * 1000,
+            "client_ms_per_step": client_s / graph_steps * 1000,
+        })
+    return results
+
+
+# =============================================================================
+# 3) main
+# =============================================================================
+def main():
+    parser = argparse.ArgumentParser(description="델타 스트리밍 vs values / debug 전송량 · CPU 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 100, 1000, 5000],
+                        help="시작 대화의 메시지 수 (0 은 stream.py 의 build_graph)")
+    parser.add_argument("--steps", type=int, default=50, help="스트리밍할 슈퍼스텝 수")
+    parser.add_argument("--modes", nargs="+", default=["values", "debug", "deltas", "deltas-shared"],
+                        choices=["values", "debug", "deltas", "deltas-shared"])
+    parser.add_argument("--output", default=None, help="JSON 결과 경로")
+    args = parser.parse_args()
+
+    print(f"{'n':>6} {'mode':<14} {'frames':>6} {'bytes/step':>11} {'tail bytes':>11} {'total KB':>10} "
+          f"{'server ms':>10} {'client ms':>10}")
+    results = []
+    for n in args.sizes:
+        for r in bench(n, args.steps, args.modes):
+            results.append(r)
+            print(f"{r['n']:>6} {r['mode']:<14} {r['frames']:>6} {r['bytes_per_step']:>11.0f} "
+                  f"{r['tail_bytes_per_frame']:>11.0f} {r['total_kb']:>10.1f} "
+                  f"{r['server_ms_per_step']:>10.3f} {r['client_ms_per_step']:>10.3f}")
+
+    if args.output:
+        write_json_report(args.output, "delta_stream_benchmark", vars(args), results,
+                          environment=environment_info(("langgraph", "langchain-core")))
+        print("JSON 결과:", args.output)
+
+
+if __name__ == "__main__":
+    main()
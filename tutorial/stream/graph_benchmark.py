@@ -0,0 +1,271 @@
+# =============================================================================
+# 그래프 실행 마이크로 벤치마크 (stream.py 의 build_graph + 파라미터 변형)
+# =============================================================================
+# - LLM 없이 langgraph 자체 비용만 잽니다. 케이스
+#   · fixture     : stream.py 의 build_graph() 그대로 (START → greeting → farewell → END)
+#   · chain-N     : 아무 일도 안 하는 노드 N 개를 일렬로 (슈퍼스텝 N 개)
+#   · fanout-W    : START → 노드 W 개 동시 실행 → join → END (슈퍼스텝 2개, 태스크 W+1 개)
+#   · state-S     : fixture 에 이전 메시지 S 개를 넣고 시작 (상태 크기)
+# - 케이스마다
+#   · compile_ms  : StateGraph 만들기 + compile 시간 (가장 빠른 값)
+#   · invoke / stream(values) / ainvoke / astream 지연 p50 · p95 (ms)
+#     --rounds 라운드 동안 지표를 번갈아 재고, p50 은 라운드별 중앙값 중 최솟값(잡음이 가장 적었던 라운드)입니다.
+#   · step_us     : invoke p50 ÷ 슈퍼스텝 수 (슈퍼스텝당 오버헤드)
+#   · peak_kb     : invoke / ainvoke 한 번의 tracemalloc 최대 할당
+# - 버전끼리 비교할 수 있도록 JSON 에 환경 정보(파이썬 · langgraph · langchain-core 버전, CPU 수, git 커밋)를 함께 남기고,
+#   (분위수 · 환경 정보 · JSON 형식은 model/bench_utils.py 를 그대로 씁니다)
+#   --baseline 으로 이전 JSON 을 주면 케이스 · 지표별 비율을 출력하고 --tolerance 보다 느려진 항목을 표시합니다.
+#   · 같은 머신 · 같은 환경에서 잰 결과끼리 비교하세요. 공유 VM 처럼 잡음이 큰 곳에서는 --rounds 와 --tolerance 를 키웁니다.
+#
+# 실행 예)
+#   python tutorial/stream/graph_benchmark.py --output before.json
+#   (langgraph 업그레이드 후)
+#   python tutorial/stream/graph_benchmark.py --output after.json --baseline before.json
+import argparse
+import asyncio
+import json
+import operator
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+from collections.abc import Callable
+from typing import Annotated, Any
+
+from langgraph.graph import END, START, StateGraph
+from typing_extensions import TypedDict
+
+from stream import build_graph
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "model"))
+from bench_utils import environment_info, percentile, write_json_report  # noqa: E402
+
+warnings.simplefilter("ignore")
+
+LATENCY_METRICS = ["invoke", "stream", "ainvoke", "astream"]
+
+
+class CounterState(TypedDict):
+    count: Annotated[int, operator.add]
+
+
+# =============================================================================
+# 1) 케이스
+# =============================================================================
+def chain_graph(n: int):
+    def step(state: CounterState) -> dict:
+        return {"count": 1}
+
+    builder = StateGraph(CounterState)
+    previous = START
+    for i in range(n):
+        builder.add_node(f"step_{i}", step)
+        builder.add_edge(previous, f"step_{i}")
+        previous = f"step_{i}"
+    builder.add_edge(previous, END)
+    return builder.compile()
+
+
+def fanout_graph(width: int):
+    def branch(state: CounterState) -> dict:
+        return {"count": 1}
+
+    def join(state: CounterState) -> dict:
+        return {"count": 0}
+
+    builder = StateGraph(CounterState)
+    builder.add_node("join", join)
+    for i in range(width):
+        builder.add_node(f"branch_{i}", branch)
+        builder.add_edge(START, f"branch_{i}")
+    builder.add_edge([f"branch_{i}" for i in range(width)], "join")
+    builder.add_edge("join", END)
+    return builder.compile()
+
+
+def chat_input(history: int) -> dict:
+    past = [{"role": "human" if i % 2 == 0 else "ai", "content": f"{i}번째 메시지"} for i in range(history)]
+    return {"messages": past + [{"role": "human", "content": "안녕?"}]}
+
+
+def make_cases(args) -> list[dict]:
+    """케이스: name, build(그래프를 만드는 함수), input, steps(슈퍼스텝 수)"""
+    cases = [{"name": "fixture", "build": build_graph, "input": chat_input(0), "steps": 2}]
+    cases += [{"name": f"chain-{n}", "build": lambda n=n: chain_graph(n), "input": {"count": 0}, "steps": n}
+              for n in args.chain]
+    cases += [{"name": f"fanout-{w}", "build": lambda w=w: fanout_graph(w), "input": {"count": 0}, "steps": 2}
+              for w in args.fanout]
+    cases += [{"name": f"state-{s}", "build": build_graph, "input": chat_input(s), "steps": 2}
+              for s in args.state]
+    return cases
+
+
+# =============================================================================
+# 2) 측정
+# =============================================================================
+def summarize(rounds: list[list[float]]) -> dict[str, float]:
+    # p50 은 라운드별 중앙값 중 가장 작은 값(머신 잡음이 적었던 라운드), p95 는 전체 샘플에서 구합니다.
+    samples = [s for r in rounds for s in r]
+    return {"p50_ms": min(percentile(r, 0.50) for r in rounds) * 1000, "p95_ms": percentile(samples, 0.95) * 1000}
+
+
+def time_sync(call: Callable[[], Any], repeat: int, warmup: int) -> list[float]:
+    for _ in range(warmup):
+        call()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def time_async(call: Callable[[], Any], repeat: int, warmup: int) -> list[float]:
+    for _ in range(warmup):
+        await call()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await call()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def peak_kb(call: Callable[[], Any]) -> float:
+    tracemalloc.start()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+async def apeak_kb(call: Callable[[], Any]) -> float:
+    tracemalloc.start()
+    await call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def bench_case(case: dict, args) -> dict:
+    compile_s = time_sync(case["build"], args.compile_repeat, warmup=1)
+    graph, payload = case["build"](), case["input"]
+    config = {"recursion_limit": case["steps"] + 10}
+
+    def stream() -> None:
+        for _ in graph.stream(payload, config, stream_mode="values"):
+            pass
+
+    async def astream() -> None:
+        async for _ in graph.astream(payload, config, stream_mode="values"):
+            pass
+
+    latency: dict[str, list[list[float]]] = {metric: [] for metric in LATENCY_METRICS}
+
+    async def run_async() -> None:
+        latency["ainvoke"].append(await time_async(lambda: graph.ainvoke(payload, config), args.repeat, args.warmup))
+        latency["astream"].append(await time_async(astream, args.repeat, args.warmup))
+
+    # 지표를 라운드마다 번갈아 재서 잡음이 한 지표에 몰리지 않게 합니다.
+    for _ in range(args.rounds):
+        latency["invoke"].append(time_sync(lambda: graph.invoke(payload, config), args.repeat, args.warmup))
+        latency["stream"].append(time_sync(stream, args.repeat, args.warmup))
+        asyncio.run(run_async())
+
+    summary = {metric: summarize(latency[metric]) for metric in LATENCY_METRICS}
+    return {
+        "case": case["name"],
+        "steps": case["steps"],
+        "compile_ms": min(compile_s) * 1000,
+        **summary,
+        "step_us": summary["invoke"]["p50_ms"] / case["steps"] * 1000,
+        "invoke_peak_kb": peak_kb(lambda: graph.invoke(payload, config)),
+        "ainvoke_peak_kb": asyncio.run(apeak_kb(lambda: graph.ainvoke(payload, config))),
+    }
+
+
+# =============================================================================
+# 3) 기준 비교
+# =============================================================================
+def flatten(result: dict) -> dict[str, float]:
+    """비교용 지표: compile_ms, step_us, peak, 그리고 지연 지표별 p50 / p95"""
+    metrics = {key: result[key] for key in ("compile_ms", "step_us", "invoke_peak_kb", "ainvoke_peak_kb")}
+    for metric in LATENCY_METRICS:
+        metrics[f"{metric}_p50_ms"] = result[metric]["p50_ms"]
+        metrics[f"{metric}_p95_ms"] = result[metric]["p95_ms"]
+    return metrics
+
+
+def compare(results: list[dict], baseline: dict, tolerance: float) -> list[dict]:
+    """케이스 · 지표별 현재/기준 비율. 기준에 없는 케이스는 건너뜁니다."""
+    previous = {r["case"]: flatten(r) for r in baseline["results"]}
+    rows = []
+    for result in results:
+        if result["case"] not in previous:
+            continue
+        for metric, value in flatten(result).items():
+            before = previous[result["case"]].get(metric)
+            if not before:
+                continue
+            ratio = value / before
+            rows.append({"case": result["case"], "metric": metric, "baseline": before, "current": value,
+                         "ratio": ratio, "regression": ratio > 1 + tolerance})
+    return rows
+
+
+# =============================================================================
+# 4) main
+# =============================================================================
+def main():
+    parser = argparse.ArgumentParser(description="langgraph 그래프 실행 마이크로 벤치마크 (LLM 없음)")
+    parser.add_argument("--chain", type=int, nargs="*", default=[1, 10, 50], help="chain-N 의 노드 수")
+    parser.add_argument("--fanout", type=int, nargs="*", default=[4, 16, 64], help="fanout-W 의 동시 노드 수")
+    parser.add_argument("--state", type=int, nargs="*", default=[100, 1000, 10000], help="state-S 의 이전 메시지 수")
+    parser.add_argument("--repeat", type=int, default=50, help="라운드당 지연 측정 반복 수")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--compile-repeat", type=int, default=20)
+    parser.add_argument("--output", default=None, help="JSON 결과 경로")
+    parser.add_argument("--baseline", default=None, help="비교할 이전 JSON 결과")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="이 비율 넘게 커지면 회귀로 표시")
+    args = parser.parse_args()
+
+    env = environment_info(("langgraph", "langchain-core"))
+    print(" · ".join(f"{key} {value}" for key, value in {**env, **env["packages"]}.items()
+                     if key not in ("timestamp", "packages")))
+    print(f"{'case':<12} {'compile':>8} {'step us':>8} {'invoke':>8} {'p95':>8} {'stream':>8} "
+          f"{'ainvoke':>8} {'astream':>8} {'peak KB':>8} {'apeak KB':>8}")
+    results = []
+    for case in make_cases(args):
+        r = bench_case(case, args)
+        results.append(r)
+        print(f"{r['case']:<12} {r['compile_ms']:>8.2f} {r['step_us']:>8.0f} {r['invoke']['p50_ms']:>8.2f} "
+              f"{r['invoke']['p95_ms']:>8.2f} {r['stream']['p50_ms']:>8.2f} {r['ainvoke']['p50_ms']:>8.2f} "
+              f"{r['astream']['p50_ms']:>8.2f} {r['invoke_peak_kb']:>8.0f} {r['ainvoke_peak_kb']:>8.0f}")
+
+    comparison = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        before = baseline.get("environment", {})
+        packages = before.get("packages", {})
+        print(f"\n기준: {args.baseline} (langgraph {packages.get('langgraph')}, "
+              f"langchain-core {packages.get('langchain-core')}, commit {before.get('git_commit')})")
+        comparison = compare(results, baseline, args.tolerance)
+        for row in comparison:
+            if row["metric"].endswith("_p95_ms") and not row["regression"]:
+                continue   # p95 는 잡음이 커서 회귀일 때만 보여 줍니다.
+            mark = "  ← 회귀" if row["regression"] else ""
+            print(f"  {row['case']:<12} {row['metric']:<18} {row['baseline']:>10.2f} → {row['current']:>10.2f} "
+                  f"({row['ratio']:.2f}x){mark}")
+        print(f"회귀 {sum(row['regression'] for row in comparison)}건 (허용 {args.tolerance:.0%})")
+
+    if args.output:
+        params = {k: v for k, v in vars(args).items() if k not in ("output", "baseline")}
+        write_json_report(args.output, "graph_benchmark", params, results, environment=env, comparison=comparison)
+        print("JSON 결과:", args.output)
+
+
+if __name__ == "__main__":
+    main()
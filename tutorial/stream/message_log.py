@@ -0,0 +1,273 @@
+# =============================================================================
+# 구조 공유(structural sharing) 메시지 시퀀스 + add_messages 대체 리듀서
+# =============================================================================
+# - add_messages 리듀서는 스텝마다
+#   · 기존 메시지 목록 전체를 convert_to_messages 로 다시 변환하고,
+#   · left.copy() 로 목록을 복사하고, {id: 위치} 사전을 처음부터 다시 만듭니다.
+#   메시지가 수천 개인 대화에서는 새 메시지 하나를 더할 때마다 O(n) 시간과 메모리가 듭니다.
+# - MessageLog 는 한 번 만들면 바뀌지 않는(persistent) 시퀀스입니다.
+#   · 32칸 노드로 된 트리 + 꼬리(tail) 구조(Clojure 의 persistent vector 와 같은 방식)라
+#     appended() 는 평균 O(1), replaced() 는 O(log32 n) 으로 새 버전을 만들고 나머지 노드는 이전 버전과 공유합니다.
+#   · 메시지 id → 위치 색인도 모든 파생 버전이 함께 씁니다. 색인은 위치 후보만 기록하고
+#     찾을 때 그 자리에 실제로 그 id 가 있는지 확인하므로, 옛 버전에서 갈라져 나와도 다시 만들 필요가 없습니다.
+#     (langgraph 는 조건부 엣지를 읽을 때 같은 버전에 리듀서를 한 번 더 적용하므로 분기가 매 스텝 생깁니다)
+#   · list 처럼 len / 인덱싱 / 슬라이싱 / 반복을 지원하므로 llm.invoke(state["messages"]) 에 그대로 넘길 수 있습니다.
+# - add_messages_shared 는 add_messages 와 같은 규칙(id 로 교체, 없으면 추가, RemoveMessage 삭제)을 따르는 리듀서입니다.
+#   · 들어온 메시지만 변환하고 기존 목록은 건드리지 않습니다.
+#   · RemoveMessage 가 있으면 add_messages 로 목록을 다시 만듭니다. (드문 경로라 O(n) 허용)
+#
+# 사용 예)
+#   class State(TypedDict):
+#       messages: Annotated[MessageLog, add_messages_shared]
+#   노드는 새 메시지만 돌려주세요: return {"messages": [ai_message]}
+#   (state["messages"] 전체를 돌려주면 모든 메시지를 id 로 다시 찾느라 O(n) 이 됩니다)
+import uuid
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Annotated, Any
+
+from langchain_core.messages import BaseMessage, RemoveMessage, convert_to_messages, message_chunk_to_message
+from langgraph.graph.message import REMOVE_ALL_MESSAGES, add_messages
+from typing_extensions import TypedDict
+
+_BITS = 5
+_WIDTH = 1 << _BITS
+_MASK = _WIDTH - 1
+
+
+def _record(positions: dict, message_id: str, i: int) -> None:
+    # 한 id 가 버전마다 다른 위치에 놓일 수 있으므로(분기) 위치가 둘 이상이면 튜플로 모아 둡니다.
+    current = positions.get(message_id)
+    if current is None:
+        positions[message_id] = i
+    elif isinstance(current, int):
+        if current != i:
+            positions[message_id] = (current, i)
+    elif i not in current:
+        positions[message_id] = current + (i,)
+
+
+def _diff_nodes(old: tuple, new: tuple, level: int, base: int, out: list) -> None:
+    # 같은 노드 객체면 그 아래 메시지도 모두 같습니다.
+    if old is new:
+        return
+    if level == 0:
+        out.extend(base + j for j in range(len(old)) if old[j] is not new[j])
+        return
+    for j in range(len(old)):
+        _diff_nodes(old[j], new[j], level - _BITS, base + (j << level), out)
+
+
+# =============================================================================
+# 1) MessageLog (persistent vector)
+# =============================================================================
+class MessageLog(Sequence):
+    """
+    appended / replaced 로 새 버전을 만드는 변경 불가능한 메시지 시퀀스
+
+    - MessageLog(messages): 처음 한 번 O(n) 으로 만듭니다.
+    - appended(message) → 새 MessageLog (평균 O(1))
+    - replaced(index, message) → 새 MessageLog (O(log32 n))
+    - position(id) → 그 id 메시지의 위치 또는 None (O(1))
+    """
+
+    __slots__ = ("_count", "_shift", "_root", "_tail", "_positions")
+
+    def __init__(self, messages: Iterable[BaseMessage] = ()) -> None:
+        self._count, self._shift, self._root, self._tail = 0, _BITS, (), ()
+        self._positions: dict[str, int | tuple[int, ...]] = {}
+        # 새로 만드는 객체는 아직 아무와도 공유하지 않으므로 제자리에서 채웁니다.
+        leaf: list = []
+        for message in messages:
+            if len(leaf) == _WIDTH:
+                self._root, self._shift = self._push_leaf(tuple(leaf))
+                leaf = []
+            if getattr(message, "id", None) is not None:
+                _record(self._positions, message.id, self._count)
+            leaf.append(message)
+            self._count += 1
+        self._tail = tuple(leaf)
+
+    @classmethod
+    def _derive(cls, base: "MessageLog", count: int, shift: int, root: tuple, tail: tuple) -> "MessageLog":
+        new = cls.__new__(cls)
+        new._count, new._shift, new._root, new._tail = count, shift, root, tail
+        new._positions = base._positions
+        return new
+
+    # -------------------------------------------------------------------------
+    # 1-1) 트리 내부
+    # -------------------------------------------------------------------------
+    def _tail_offset(self) -> int:
+        return self._count - len(self._tail)
+
+    def _leaf_for(self, i: int) -> tuple:
+        if i >= self._tail_offset():
+            return self._tail
+        node, level = self._root, self._shift
+        while level > 0:
+            node = node[(i >> level) & _MASK]
+            level -= _BITS
+        return node
+
+    @staticmethod
+    def _new_path(level: int, node: tuple) -> tuple:
+        while level > 0:
+            node = (node,)
+            level -= _BITS
+        return node
+
+    def _push_tail(self, level: int, parent: tuple, leaf: tuple) -> tuple:
+        # 꽉 찬 꼬리를 트리에 붙이며 지나는 경로의 노드만 복사합니다.
+        sub = ((self._count - 1) >> level) & _MASK
+        if level == _BITS:
+            child = leaf
+        elif sub < len(parent):
+            child = self._push_tail(level - _BITS, parent[sub], leaf)
+        else:
+            child = self._new_path(level - _BITS, leaf)
+        return parent[:sub] + (child,) + parent[sub + 1:]
+
+    def _push_leaf(self, leaf: tuple) -> tuple[tuple, int]:
+        # self._count 는 leaf 까지 포함한 개수여야 합니다. 반환: (새 root, 새 shift)
+        if (self._count >> _BITS) > (1 << self._shift):
+            return (self._root, self._new_path(self._shift, leaf)), self._shift + _BITS
+        return self._push_tail(self._shift, self._root, leaf), self._shift
+
+    def _assoc(self, level: int, node: tuple, i: int, value: Any) -> tuple:
+        sub = (i >> level) & _MASK
+        child = value if level == 0 else self._assoc(level - _BITS, node[sub], i, value)
+        return node[:sub] + (child,) + node[sub + 1:]
+
+    # -------------------------------------------------------------------------
+    # 1-2) 새 버전 만들기
+    # -------------------------------------------------------------------------
+    def appended(self, message: BaseMessage) -> "MessageLog":
+        if len(self._tail) < _WIDTH:
+            new = self._derive(self, self._count + 1, self._shift, self._root, self._tail + (message,))
+        else:
+            root, shift = self._push_leaf(self._tail)
+            new = self._derive(self, self._count + 1, shift, root, (message,))
+        if message.id is not None:
+            _record(new._positions, message.id, self._count)
+        return new
+
+    def replaced(self, index: int, message: BaseMessage) -> "MessageLog":
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        offset = self._tail_offset()
+        if index >= offset:
+            tail = self._tail[:index - offset] + (message,) + self._tail[index - offset + 1:]
+            new = self._derive(self, self._count, self._shift, self._root, tail)
+        else:
+            new = self._derive(self, self._count, self._shift, self._assoc(self._shift, self._root, index, message), self._tail)
+        if message.id is not None:
+            _record(new._positions, message.id, index)
+        return new
+
+    def position(self, message_id: str) -> int | None:
+        candidates = self._positions.get(message_id)
+        if candidates is None:
+            return None
+        # 공유 색인에는 다른 버전의 위치도 있으므로 이 버전의 그 자리에 실제로 그 id 가 있는지 확인합니다.
+        for i in (candidates,) if isinstance(candidates, int) else candidates:
+            if i < self._count and self[i].id == message_id:
+                return i
+        return None
+
+    def changed_since(self, old: "MessageLog") -> list[int] | None:
+        """
+        old 에서 파생된 이 버전에서 old 와 다른 객체가 놓인 위치 목록 (old 길이 안쪽만, 뒤에 붙은 메시지는 제외)
+        - 두 버전이 같은 노드를 공유하는 부분은 건너뛰므로 바뀐 경로 수 × log32 n 에 비례합니다.
+        - 길이가 줄었으면(삭제) 비교할 수 없으므로 None
+        """
+        if old._count > self._count:
+            return None
+        root, shift = self._root, self._shift
+        while shift > old._shift:   # 트리가 한 단계 높아졌으면 옛 root 는 새 root 의 첫 자식입니다.
+            root, shift = (root[0] if root else ()), shift - _BITS
+        changed: list[int] = []
+        _diff_nodes(old._root, root, shift, 0, changed)
+        changed.extend(i for i in range(old._tail_offset(), old._count) if self[i] is not old[i])
+        return changed
+
+    # -------------------------------------------------------------------------
+    # 1-3) Sequence 인터페이스
+    # -------------------------------------------------------------------------
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._count))]
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        return self._leaf_for(i)[i & _MASK]
+
+    def __iter__(self) -> Iterator[BaseMessage]:
+        for start in range(0, self._tail_offset(), _WIDTH):
+            yield from self._leaf_for(start)
+        yield from self._tail
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (MessageLog, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"MessageLog({list(self)!r})"
+
+    def __reduce__(self):
+        return MessageLog, (list(self),)
+
+    def _asdict(self) -> dict:
+        # langgraph 체크포인트 serde(JsonPlusSerializer)는 _asdict 가 있는 객체를 MessageLog(**kwargs) 로 복원합니다.
+        return {"messages": list(self)}
+
+
+# =============================================================================
+# 2) 리듀서
+# =============================================================================
+def add_messages_shared(left: Any, right: Any) -> MessageLog:
+    """add_messages 와 같은 병합 규칙을 MessageLog 위에서 들어온 메시지 수에 비례하는 시간으로 처리합니다."""
+    if not isinstance(left, MessageLog):
+        left = MessageLog(add_messages([], left if isinstance(left, list) else [left]) if left else ())
+    if not isinstance(right, (list, tuple, MessageLog)):
+        right = [right]
+    incoming = [message_chunk_to_message(m) for m in convert_to_messages(right)]
+
+    for i, message in enumerate(incoming):
+        if isinstance(message, RemoveMessage):
+            if message.id == REMOVE_ALL_MESSAGES:
+                return add_messages_shared(MessageLog(), incoming[i + 1:])
+            # 삭제는 위치가 당겨지므로 목록을 다시 만듭니다.
+            return MessageLog(add_messages(list(left), incoming))
+
+    log = left
+    for message in incoming:
+        if message.id is None:
+            message.id = str(uuid.uuid4())   # add_messages 와 같은 방식
+        position = log.position(message.id)
+        log = log.appended(message) if position is None else log.replaced(position, message)
+    return log
+
+
+class SharedState(TypedDict):
+    """stream.py 의 State 와 같고 리듀서만 add_messages_shared 인 상태"""
+    messages: Annotated[MessageLog, add_messages_shared]
+
+
+# =============================================================================
+# 3) 간단 실행 예제
+# =============================================================================
+if __name__ == "__main__":
+    from langchain_core.messages import AIMessage, HumanMessage
+
+    history = MessageLog(HumanMessage(f"질문 {i}", id=f"h{i}") for i in range(10_000))
+    longer = add_messages_shared(history, [AIMessage("새 답변", id="a0")])
+    edited = add_messages_shared(longer, [HumanMessage("고친 질문", id="h42")])
+    print(len(history), len(longer), len(edited), edited[42].content, history[42].content)
+    print("트리 노드 공유:", longer._root is history._root, "/ 교체 후 다른 잎은 그대로:", edited._leaf_for(0) is history._leaf_for(0))
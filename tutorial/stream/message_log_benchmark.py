@@ -0,0 +1,137 @@
+# =============================================================================
+# add_messages vs add_messages_shared(MessageLog) 벤치마크 (메시지 1만 개 대화)
+# =============================================================================
+# - reducer : 리듀서 한 번의 시간과 메모리 할당(tracemalloc 최대치)
+#   · append  : 새 메시지 1개 추가
+#   · replace : 기존 id 메시지 1개 교체
+# - graph   : 메시지 n 개가 쌓인 대화에서 시작해 노드가 스텝마다 AI 메시지 1개를 더하는 그래프를 --steps 번 돌린
+#             슈퍼스텝당 시간 (stream.py 의 State vs message_log.SharedState)
+#   · --checkpointer 를 주면 MemorySaver 를 붙여 측정합니다. (체크포인트는 매 스텝 상태 전체를 직렬화하므로
+#     리듀서만 바꿔서는 O(n) 이 남습니다. 이 차이를 확인하는 용도)
+#
+# 실행 예)
+#   python tutorial/stream/message_log_benchmark.py --sizes 1000 10000 --steps 200
+import argparse
+import time
+import tracemalloc
+import warnings
+from typing import Annotated
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+from typing_extensions import TypedDict
+
+from message_log import MessageLog, SharedState, add_messages_shared
+
+warnings.simplefilter("ignore")
+
+
+class State(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def history(n: int) -> list:
+    return [(HumanMessage if i % 2 == 0 else AIMessage)(f"{i}번째 메시지", id=f"m{i}") for i in range(n)]
+
+
+# =============================================================================
+# 1) 리듀서 단독
+# =============================================================================
+def time_op(op, repeat: int) -> float:
+    start = time.perf_counter()
+    for i in range(repeat):
+        op(i)
+    return (time.perf_counter() - start) / repeat
+
+
+def peak_bytes(op) -> int:
+    tracemalloc.start()
+    op(0)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def bench_reducer(n: int, repeat: int) -> list[dict]:
+    base = history(n)
+    variants = {
+        "add_messages": (add_messages, base),
+        "add_messages_shared": (add_messages_shared, MessageLog(base)),
+    }
+    results = []
+    for name, (reducer, left) in variants.items():
+        ops = {
+            "append": lambda i: reducer(left, [AIMessage("새 답변", id=f"{name}-new{i}")]),
+            "replace": lambda i: reducer(left, [AIMessage("고친 답변", id=f"m{(i * 7919) % n}")]),
+        }
+        for op_name, op in ops.items():
+            results.append({
+                "n": n, "reducer": name, "op": op_name,
+                "us_per_op": time_op(op, repeat) * 1e6,
+                "peak_kb": peak_bytes(op) / 1024,
+            })
+    return results
+
+
+# =============================================================================
+# 2) 그래프 슈퍼스텝
+# =============================================================================
+def build_loop_graph(state_schema: type, stop_at: int, checkpointer=None):
+    def turn(state) -> dict:
+        return {"messages": [AIMessage(f"답변 {len(state['messages'])}")]}
+
+    def route(state) -> str:
+        return END if len(state["messages"]) >= stop_at else "turn"
+
+    builder = StateGraph(state_schema)
+    builder.add_node("turn", turn)
+    builder.add_edge(START, "turn")
+    builder.add_conditional_edges("turn", route, {"turn": "turn", END: END})
+    return builder.compile(checkpointer=checkpointer)
+
+
+def bench_graph(n: int, steps: int, use_checkpointer: bool) -> list[dict]:
+    results = []
+    for name, schema, start_value in [("add_messages", State, history(n)),
+                                      ("add_messages_shared", SharedState, MessageLog(history(n)))]:
+        checkpointer = MemorySaver() if use_checkpointer else None
+        graph = build_loop_graph(schema, n + steps, checkpointer)
+        config = {"recursion_limit": steps + 10, "configurable": {"thread_id": name}}
+        start = time.perf_counter()
+        out = graph.invoke({"messages": start_value}, config)
+        elapsed = time.perf_counter() - start
+        assert len(out["messages"]) == n + steps
+        results.append({
+            "n": n, "reducer": name, "checkpointer": use_checkpointer,
+            "ms_per_step": elapsed / steps * 1000,
+        })
+    return results
+
+
+# =============================================================================
+# 3) main
+# =============================================================================
+def main():
+    parser = argparse.ArgumentParser(description="구조 공유 메시지 리듀서 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=50, help="리듀서 측정 반복 수")
+    parser.add_argument("--steps", type=int, default=200, help="그래프 슈퍼스텝 수")
+    parser.add_argument("--checkpointer", action="store_true", help="MemorySaver 를 붙인 측정도 함께")
+    args = parser.parse_args()
+
+    print(f"[reducer] {'n':>6} {'reducer':<20} {'op':<8} {'us/op':>10} {'peak KB':>9}")
+    for n in args.sizes:
+        for r in bench_reducer(n, args.repeat):
+            print(f"          {r['n']:>6} {r['reducer']:<20} {r['op']:<8} {r['us_per_op']:>10.1f} {r['peak_kb']:>9.1f}")
+
+    print(f"\n[graph]   {'n':>6} {'reducer':<20} {'ckpt':<5} {'ms/step':>9}")
+    for n in args.sizes:
+        for use_checkpointer in ([False, True] if args.checkpointer else [False]):
+            for r in bench_graph(n, args.steps, use_checkpointer):
+                print(f"          {r['n']:>6} {r['reducer']:<20} {str(r['checkpointer']):<5} {r['ms_per_step']:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,10 +17,10 @@ def add_greeting(state: dict) -> dict:
     """
     - START → greeting 노드 실행
     - 역할: AI 인삿말 추가
+    - 새 메시지만 돌려주면 add_messages 가 기존 목록 뒤에 붙여 줍니다.
+      (state["messages"] 를 직접 append 해서 돌려주면 채널 값이 바뀌고, 리듀서가 모든 메시지를 id 로 다시 비교합니다)
     """
-    messages = state.get("messages", [])
-    messages.append({"role": "ai", "content": "안녕하세요! 무엇을 도와드릴까요?"})
-    return {"messages": messages}
+    return {"messages": [{"role": "ai", "content": "안녕하세요! 무엇을 도와드릴까요?"}]}
 
 
 def add_farewell(state: dict) -> dict:
@@ -28,20 +28,19 @@ def add_farewell(state: dict) -> dict:
     - greeting → farewell 노드 실행
     - 역할: AI 작별인사 추가
     """
-    messages = state["messages"]
-    messages.append({"role": "ai", "content": "안녕히 계세요!"})
-    return {"messages": messages}
+    return {"messages": [{"role": "ai", "content": "안녕히 계세요!"}]}
 
 
 # =============================================================================
 # 그래프 빌드 함수
 # =============================================================================
-def build_graph() -> StateGraph:
+def build_graph(state_schema: type = State) -> StateGraph:
     """
     StateGraph를 생성하고 START→greeting→farewell→END 순서로 노드를 연결한 후
     컴파일하여 반환합니다.
+    - state_schema: 메시지 리듀서를 바꿔 볼 때 사용 (예: message_log.SharedState)
     """
-    graph_builder = StateGraph(State)
+    graph_builder = StateGraph(state_schema)
     graph_builder.add_node("greeting", add_greeting)
     graph_builder.add_node("farewell", add_farewell)
     graph_builder.add_edge(START, "greeting")
@@ -65,6 +64,7 @@ def main():
     }
 
     # 3) stream_mode 변경하며 각 단계별 상태 출력
+    #    (요청마다 켜 두려면 debug_trace.DebugTracer 로 일부 실행만 기록하세요)
     for chunk in graph.stream(inputs, stream_mode="debug"):
         print("DEBUG CHUNK:", chunk)
 